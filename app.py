@@ -1,8 +1,17 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import os
 from datetime import datetime
-import random
+from html import escape
+
+from data import (ACCOUNTS_CSV, AVAILABILITY_CSV, ENGINEERS_CSV, INCIDENTS_JSONL, file_signature, load_accounts,
+                  load_availability, load_engineers)
+from diagnostics import StageTimer, TimingHistory, profile_report, profiled
+from plan_cache import PlanCache
+from planner import (DAYS_OF_WEEK, DEFAULT_BALANCE_BUDGET, DEFAULT_CANDIDATES, DEFAULT_WINDOW_DAYS, SPECIAL_TASKS,
+                     RollingLoads, active_accounts, active_engineers, assignment_accounts, availability_status, distribute_best_of,
+                     distribute_by_shift, distribute_with_special_tasks, fairness_offsets, input_fingerprint,
+                     plan_long_frame)
 
 # =========================
 # CONFIGURACIÓN DE PÁGINA
@@ -53,13 +62,36 @@ st.markdown("""
         box-shadow: 0 2px 8px rgba(0,0,0,0.1);
         border-left: 5px solid #3B82F6;
     }
+    
+    .engineer-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fill, minmax(260px, 1fr));
+        gap: 0 16px;
+    }
+    
+    .engineer-name {
+        color: #1E3A8A;
+        font-size: 1.2rem;
+        font-weight: 700;
+    }
+    
+    .engineer-stats {
+        color: #475569;
+        margin: 4px 0 8px 0;
+    }
+    
+    .account-list {
+        max-height: 220px;
+        overflow-y: auto;
+        margin: 0;
+        padding-left: 1.2rem;
+    }
 </style>
 """, unsafe_allow_html=True)
 
 # =========================
 # CONFIGURACIÓN
 # =========================
-DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 DAY_NAMES_ES = {
     "monday": "Lunes",
     "tuesday": "Martes",
@@ -79,10 +111,6 @@ DAY_SHORT_ES = {
     "sunday": "Dom"
 }
 
-# Tareas especiales que deben rotar
-SPECIAL_TASKS = ["EoS Report", "DCOSS Monitoring"]
-SPECIAL_TASK_INTENSITY = 2  # Intensidad fija para tareas especiales
-
 # =========================
 # SIDEBAR
 # =========================
@@ -105,218 +133,599 @@ with st.sidebar:
     with col2:
         randomize = st.checkbox("🎲 Orden aleatorio", value=False)
     
+    plan_whole_week = st.checkbox("🗓️ Planificar semana completa", value=False,
+                                  help="Calcula los 7 días de una vez; cambiar de día solo consulta el plan en caché")
+    
+    plan_by_shift = st.checkbox("🕐 Planificar por turno", value=False,
+                                help="Cada turno reparte solo las cuentas que cubre entre sus propios ingenieros")
+    
+    optimize_balance = st.checkbox("⚖️ Balance óptimo", value=False,
+                                   help="Mejora el reparto greedy con búsqueda local (mover/intercambiar cuentas)")
+    balance_budget_ms = st.slider("⏱️ Tiempo máximo (ms)", min_value=50, max_value=5000,
+                                  value=int(DEFAULT_BALANCE_BUDGET * 1000), step=50,
+                                  disabled=not optimize_balance)
+    
+    seeded_mode = st.checkbox("🎯 Mejor de N (con semilla)", value=False, disabled=plan_whole_week or plan_by_shift,
+                              help="Genera N planes con distintas semillas y se queda con el más balanceado y justo; "
+                                   "la semilla ganadora permite repetir el plan")
+    n_candidates = st.slider("Candidatos", min_value=1, max_value=32, value=DEFAULT_CANDIDATES,
+                             disabled=not seeded_mode)
+    seed_text = st.text_input("🌱 Semilla (vacío = nueva)", value="", disabled=not seeded_mode).strip()
+    plan_seed = int(seed_text) if seed_text.isdigit() else None
+    if seed_text and plan_seed is None:
+        st.warning("La semilla debe ser un entero no negativo; se usará una nueva")
+    
+    live_mode = st.checkbox("📡 Intensidad en vivo (incidentes)", value=False,
+                            help=f"Sigue {INCIDENTS_JSONL} y usa la tasa de incidentes de la última hora "
+                                 "como intensidad de cada cuenta")
+    live_refresh_s = st.slider("⏱️ Refresco del panel en vivo (s)", min_value=5, max_value=120, value=15, step=5,
+                               disabled=not live_mode)
+    
+    multi_day_fairness = st.checkbox("📈 Equidad multi-día", value=False,
+                                     help="Cada ingeniero arranca con la carga de más (o de menos) que acumuló "
+                                          "en los últimos días, para compensarla en el plan de hoy")
+    fairness_window = st.slider("Ventana (días)", min_value=1, max_value=90, value=DEFAULT_WINDOW_DAYS,
+                                disabled=not multi_day_fairness)
+    
+    fast_start = st.checkbox("⚡ Inicio rápido", value=True, key="fast_start",
+                             help="Muestra primero tareas especiales, métricas y asignaciones; disponibilidad, "
+                                  "detalle, historial, datos crudos y rebalanceo se calculan al abrirlos")
+    
     st.markdown("---")
     st.markdown("### 🔄 Rotación Tareas Especiales")
     
-    # Historial de asignaciones de tareas especiales
-    if 'special_task_history' not in st.session_state:
-        st.session_state.special_task_history = {}
+    # Historial compartido de tareas especiales (ventana = semana ISO actual)
+    from history_store import current_week
+    current_week_key = current_week()
+    st.caption(f"Semana {current_week_key}")
     
     st.info("**Tareas especiales:**")
     for task in SPECIAL_TASKS:
         st.markdown(f"• {task}")
+    
+    st.markdown("---")
+    st.markdown("### 🩺 Diagnóstico")
+    profile_run = st.checkbox("🔬 Perfilar esta ejecución (cProfile)", value=False,
+                              help="Captura un perfil completo de la siguiente ejecución; la hace más lenta")
 
 # =========================
 # FUNCIONES DE CARGA DE DATOS
 # =========================
-@st.cache_data
-def load_engineers_data():
+# La firma (mtime, tamaño) del CSV forma parte de la clave: si el archivo
+# cambia en disco, la caché se invalida sin reiniciar el servidor.
+@st.cache_data(max_entries=4)
+def load_engineers_data(signature=None):
     """Carga datos de ingenieros"""
     try:
-        if os.path.exists("engineers.csv"):
-            df = pd.read_csv("engineers.csv")
-        else:
-            df = pd.DataFrame({
-                'engineer_id': [1, 2, 3, 4],
-                'engineer_name': ['Sergio', 'Marvin', 'Christopher', 'Esteban'],
-                'shift': ['Afternoon', 'Afternoon', 'Afternoon', 'Afternoon'],
-                'active': ['yes', 'yes', 'yes', 'yes']
-            })
-        
-        df.columns = df.columns.str.strip()
-        df['engineer_name'] = df['engineer_name'].str.strip()
-        return df
+        return load_engineers(ENGINEERS_CSV)
     except Exception as e:
         st.error(f"❌ Error cargando engineers.csv: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_availability_data():
+@st.cache_data(max_entries=4)
+def load_availability_data(signature=None):
     """Carga datos de disponibilidad"""
     try:
-        if os.path.exists("availability.csv"):
-            df = pd.read_csv("availability.csv")
-        else:
-            data = []
-            for day in DAYS_OF_WEEK:
-                for engineer_id in [1, 2, 3, 4]:
-                    available = 'yes' if day != 'sunday' else 'no'
-                    data.append({'engineer_id': engineer_id, 'day': day, 'available': available})
-            df = pd.DataFrame(data)
-        
-        df.columns = df.columns.str.strip()
-        df['day'] = df['day'].str.lower().str.strip()
-        df['available'] = df['available'].str.lower().str.strip()
-        return df
+        return load_availability(AVAILABILITY_CSV)
     except Exception as e:
         st.error(f"❌ Error cargando availability.csv: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_accounts_data():
+@st.cache_data(max_entries=4)
+def load_accounts_data(signature=None):
     """Carga datos de cuentas"""
     try:
-        if os.path.exists("accounts.csv"):
-            df = pd.read_csv("accounts.csv")
-        else:
-            accounts_data = {
-                'account': [
-                    'CMF', 'BGR', 'ITAU', 'Pich Ecuador', 'Pich Peru', 'Arauco', 'CCA', 'Cermaq',
-                    'Claro Peru', 'CMA (HNN)', 'CMP', 'DIGICEL', 'Forum', 'INS', 'Lima Exp',
-                    'Philips', 'Produbanco', 'Qualitas', 'Recipharm', 'RENIEC', 'Registro Civil',
-                    'Suzano', 'Chedraui', 'Walmart', 'EoS Report', 'DCOSS Monitoring'
-                ],
-                'intensity': [2, 1, 5, 5, 3, 5, 4, 2, 4, 3, 3, 3, 4, 4, 1, 2, 2, 1, 3, 3, 4, 4, 2, 4, 2, 2]
-            }
-            df = pd.DataFrame(accounts_data)
-        
-        df.columns = df.columns.str.strip()
-        
-        # Buscar columna de intensidad
-        intensity_cols = [col for col in df.columns if 'intensity' in col.lower()]
-        if intensity_cols:
-            df = df.rename(columns={intensity_cols[0]: 'intensity'})
-        else:
-            df['intensity'] = 1
-        
-        # Buscar columna de account
-        account_cols = [col for col in df.columns if 'account' in col.lower() or 'name' in col.lower()]
-        if account_cols and 'account' not in df.columns:
-            df = df.rename(columns={account_cols[0]: 'account'})
-        
-        df['intensity'] = pd.to_numeric(df['intensity'], errors='coerce').fillna(2).astype(int)
-        return df[['account', 'intensity']].dropna()
+        return load_accounts(ACCOUNTS_CSV)
     except Exception as e:
         st.error(f"❌ Error cargando accounts.csv: {e}")
         return pd.DataFrame()
 
+@st.cache_data
+def load_availability_status(engineers_df, availability_df):
+    """Matriz ingenieros × días precalculada (1 sí, 0 no, -1 sin dato)"""
+    return availability_status(engineers_df, availability_df)
+
+@st.cache_resource(max_entries=4)
+def data_fingerprint(signatures, _engineers_df, _availability_df, _accounts_df):
+    """Huella de los datos de entrada, calculada una vez por versión de los CSV"""
+    return input_fingerprint(_engineers_df, _availability_df, _accounts_df)
+
+@st.cache_resource(max_entries=16)
+def compute_week_plan(fingerprint, _accounts_df, _engineer_names, _availability_matrix, weighted, randomize,
+                      balance_budget, _engineer_shifts=None, _load_offsets=None, _engineer_skills=None,
+                      _previous_owners=None, _rotation=None):
+    """Plan de toda la semana (WeekBaseline), cacheado por la huella de los datos de entrada
+
+    Parte de la rotación guardada (_rotation): los días que ya tienen
+    responsables de tareas especiales los conservan, como en el modo por día.
+    """
+    from scenarios import WeekBaseline  # solo en el modo semana y en escenarios
+    return WeekBaseline(_accounts_df, _engineer_names, _availability_matrix, weighted, randomize, balance_budget,
+                        rotation=_rotation, engineer_shifts=_engineer_shifts, load_offsets=_load_offsets,
+                        engineer_skills=_engineer_skills, previous_owners=_previous_owners, keep_recorded=True)
+
+def week_plan_key(fingerprint, balance_budget, load_offsets, previous_owners, rotation):
+    """Huella de la semana completa: datos de entrada, parámetros de la barra lateral y rotación guardada"""
+    return input_fingerprint(fingerprint=fingerprint, weighted=use_weighted, randomize=randomize,
+                             balance_budget=balance_budget, by_shift=plan_by_shift,
+                             load_offsets=(load_offsets.key() if isinstance(load_offsets, RollingLoads)
+                                           else sorted(load_offsets.items())),
+                             previous_owners=hash(frozenset(previous_owners.items())),
+                             rotation=rotation.state_key())
+
+def week_baseline(fingerprint, week, accounts_df, engineers_df, availability_matrix, balance_budget, load_offsets,
+                  engineer_skills, previous_owners):
+    """Semana completa con los parámetros de la barra lateral; la calcula una vez por combinación
+
+    Devuelve (clave de la semana, WeekBaseline).
+    """
+    stored_rotation, _ = get_history_store().load_rotation(week)
+    key = week_plan_key(fingerprint, balance_budget, load_offsets, previous_owners, stored_rotation)
+    return key, compute_week_plan(
+        key, accounts_df, engineers_df['engineer_name'].tolist(), availability_matrix,
+        use_weighted, randomize, balance_budget,
+        engineers_df['shift'].tolist() if plan_by_shift else None,
+        load_offsets, engineer_skills, previous_owners, stored_rotation
+    )
+
+def rolling_offsets(week, day):
+    """Carga de arranque por ingeniero según los días previos a day (vacío sin equidad multi-día)"""
+    if not multi_day_fairness:
+        return {}
+    from workload_store import plan_date
+    return fairness_offsets(get_workload_store().rolling_load(plan_date(week, day), fairness_window))
+
+def week_offsets(week):
+    """Carga de arranque de la semana completa: RollingLoads que suma cada día planificado (vacío sin equidad)"""
+    if not multi_day_fairness:
+        return {}
+    return RollingLoads(get_workload_store().week_history(week, fairness_window), fairness_window)
+
+def sticky_owners(history_store, accounts_df, week, day):
+    """Dueño del día anterior de cada cuenta, solo si hay cuentas sticky"""
+    if not (accounts_df['sticky'] == 'yes').any():
+        return {}
+    return history_store.previous_owners(week, day)
+
+@st.cache_resource
+def get_history_store():
+    """Historial persistente compartido por todas las sesiones"""
+    from history_store import HistoryStore
+    return HistoryStore()
+
+@st.cache_resource
+def get_plan_cache():
+    """Planes diarios ya calculados, compartidos por todas las sesiones"""
+    return PlanCache()
+
+@st.cache_resource
+def get_export_cache():
+    """Exportaciones ya generadas (bytes por huella del plan), compartidas por todas las sesiones"""
+    from export import ExportCache
+    return ExportCache()
+
+@st.cache_resource
+def get_scenario_cache():
+    """Escenarios ya replanificados por (semana base, cambios), compartidos por todas las sesiones"""
+    return PlanCache()
+
+@st.cache_resource
+def get_workload_store():
+    """Carga diaria por ingeniero (columnar), compartida por todas las sesiones
+
+    Se abre una vez por proceso: ahí se compactan los lotes reemplazados si ya son muchos.
+    """
+    from workload_store import WorkloadStore
+    store = WorkloadStore()
+    store.compact_if_stale()
+    return store
+
 # =========================
-# ALGORITMO CON ROTACIÓN DE TAREAS ESPECIALES
+# REBALANCEO INCREMENTAL
 # =========================
-def distribute_with_special_tasks(accounts_df, engineers_list, selected_day, weighted=True, randomize=False):
-    """Distribuye cuentas con rotación de tareas especiales"""
-    if not engineers_list or accounts_df.empty:
-        return pd.DataFrame()
+REBALANCE_CHANGES = {
+    'intensity': "📈 Cambio de intensidad",
+    'engineer_out': "🚪 Sale un ingeniero",
+    'engineer_in': "🙋 Entra un ingeniero",
+    'account_in': "➕ Cuenta nueva",
+    'account_out': "➖ Cuenta retirada",
+}
+
+# =========================
+# CARGA EN VIVO (FEED DE INCIDENTES)
+# =========================
+@st.cache_resource
+def get_incident_feed():
+    """Un solo hilo sigue el archivo de incidentes para todas las sesiones"""
+    from incident_feed import FeedTailer  # solo con la intensidad en vivo
+    feed = FeedTailer(INCIDENTS_JSONL)
+    feed.poll()  # lo que ya está en el archivo cuenta desde la primera ejecución
+    feed.start()
+    return feed
+
+def render_live_load(assignments_df, csv_accounts_df, feed):
+    """Carga del plan vigente con las intensidades en vivo (se refresca sola como fragmento)"""
+    from incident_feed import live_intensity
+    rates = feed.rates.rates()
+    live_accounts = assignment_accounts(assignments_df, live_intensity(csv_accounts_df, rates))
+    live_loads = live_accounts.groupby('Ingeniero', sort=False)['Intensidad'].sum()
+    loads_df = pd.DataFrame({
+        'Ingeniero': assignments_df['Ingeniero'].to_numpy(),
+        'Plan': assignments_df['Intensidad Total'].to_numpy(),
+        'En vivo': live_loads.reindex(assignments_df['Ingeniero']).fillna(0).astype(int).to_numpy(),
+    })
+    loads_df['Δ'] = loads_df['En vivo'] - loads_df['Plan']
+    plan_gap = int(loads_df['Plan'].max() - loads_df['Plan'].min())
+    live_gap = int(loads_df['En vivo'].max() - loads_df['En vivo'].min())
     
-    # Separar tareas especiales del resto
-    regular_accounts = accounts_df[~accounts_df['account'].isin(SPECIAL_TASKS)].copy()
-    special_accounts = accounts_df[accounts_df['account'].isin(SPECIAL_TASKS)].copy()
+    last_event = datetime.fromtimestamp(feed.rates.last_event).strftime("%H:%M:%S") if feed.rates.last_event else "-"
+    st.caption(
+        f"{feed.lines} eventos leídos ({feed.errors} inválidos) · {len(rates)} cuentas con actividad · "
+        f"último evento {last_event} · actualizado {datetime.now().strftime('%H:%M:%S')}"
+    )
     
-    # Inicializar historial si no existe
-    if selected_day not in st.session_state.special_task_history:
-        st.session_state.special_task_history[selected_day] = {}
+    live_cols = st.columns([2, 1])
+    with live_cols[0]:
+        st.dataframe(loads_df.sort_values('Δ', ascending=False), use_container_width=True, hide_index=True,
+                     height=250)
+    with live_cols[1]:
+        st.metric("Brecha en vivo", live_gap, delta=live_gap - plan_gap, delta_color="inverse")
+        top_rates = sorted(rates.items(), key=lambda item: item[1], reverse=True)[:10]
+        if top_rates:
+            st.markdown("**🔥 Cuentas más activas (incidentes/h):**")
+            st.markdown("\n".join(f"- {escape(account)}: {rate:.1f}" for account, rate in top_rates))
+        if live_gap > plan_gap and st.button("🔄 Replanificar con intensidades en vivo", use_container_width=True):
+            st.rerun(scope="app")
+
+def render_incremental_rebalance(assignments_df, accounts_df, engineers_df, selected_day):
+    """Aplica cambios puntuales sobre el plan del día sin redistribuir todo"""
+    from rebalance import IncrementalBalancer  # solo se usa al abrir la sección
     
-    # 1. ASIGNAR TAREAS ESPECIALES (una por ingeniero, diferentes días)
-    special_assignments = {}
+    if 'Turno' in assignments_df.columns:
+        st.info("El rebalanceo incremental no está disponible para planes por turno.")
+        return
     
-    # Obtener historial de la semana
-    week_history = {}
-    for day in DAYS_OF_WEEK:
-        if day in st.session_state.special_task_history:
-            week_history.update(st.session_state.special_task_history[day])
+    # El plan vivo se reinicia cuando cambia el plan base
+    plan_key = input_fingerprint(assignments_df[['Ingeniero', 'Cuentas Asignadas']], day=selected_day)
+    live = st.session_state.setdefault('live_plan', {})
+    if live.get('key') != plan_key:
+        live.clear()
+        live.update(key=plan_key, balancer=IncrementalBalancer.from_plan(assignments_df, accounts_df), moves=[])
+    balancer = live['balancer']
     
-    # Para cada tarea especial, encontrar ingeniero que no la haya tenido
-    available_engineers = engineers_list.copy()
+    spike_accounts = accounts_df.loc[accounts_df['current spike'] == 'yes', 'account'].tolist()
+    if spike_accounts:
+        st.caption("⚡ Cuentas en spike: " + ", ".join(spike_accounts))
     
-    for task in SPECIAL_TASKS:
-        # Filtrar ingenieros que NO han tenido esta tarea esta semana
-        engineers_without_task = [
-            eng for eng in available_engineers 
-            if not any(h.get('task') == task for h in week_history.values() 
-                      if h.get('engineer') == eng)
-        ]
-        
-        if engineers_without_task:
-            # Elegir ingeniero con menos tareas especiales esta semana
-            task_counts = {}
-            for eng in engineers_without_task:
-                task_counts[eng] = sum(1 for h in week_history.values() 
-                                     if h.get('engineer') == eng)
-            
-            # Elegir ingeniero con menos tareas especiales
-            chosen_engineer = min(task_counts.items(), key=lambda x: x[1])[0]
+    change = st.selectbox("Tipo de cambio", options=list(REBALANCE_CHANGES), format_func=REBALANCE_CHANGES.get)
+    regular_accounts = sorted((a for a in balancer.owner if a not in balancer.pinned),
+                              key=lambda a: (a not in spike_accounts, a))
+    
+    with st.form("incremental_rebalance"):
+        if change == 'intensity':
+            account = st.selectbox("Cuenta", regular_accounts)
+            intensity = st.number_input("Nueva intensidad", min_value=1, max_value=50,
+                                        value=int(balancer.intensity.get(account, 1)) + 1)
+        elif change == 'engineer_out':
+            engineer = st.selectbox("Ingeniero", list(balancer.loads))
+        elif change == 'engineer_in':
+            candidates = [name for name in engineers_df['engineer_name'] if name not in balancer.loads]
+            engineer = st.selectbox("Ingeniero", candidates) if candidates else st.text_input("Ingeniero")
+        elif change == 'account_in':
+            account = st.text_input("Cuenta")
+            intensity = st.number_input("Intensidad", min_value=1, max_value=50, value=2)
         else:
-            # Si todos ya tuvieron esta tarea, reiniciar ciclo
-            chosen_engineer = random.choice(available_engineers)
-        
-        # Asignar tarea especial
-        special_assignments[chosen_engineer] = task
-        available_engineers = [eng for eng in available_engineers if eng != chosen_engineer]
+            account = st.selectbox("Cuenta", regular_accounts)
+        submitted = st.form_submit_button("Aplicar cambio", use_container_width=True)
+    
+    if submitted:
+        if change == 'intensity' and account:
+            moves = balancer.set_intensity(account, intensity)
+        elif change == 'engineer_out' and len(balancer.loads) > 1:
+            moves = balancer.remove_engineer(engineer)
+        elif change == 'engineer_in' and engineer and engineer not in balancer.loads:
+            moves = balancer.add_engineer(engineer)
+        elif change == 'account_in' and account and account not in balancer.owner:
+            moves = balancer.add_account(account, intensity)
+        elif change == 'account_out' and account:
+            moves = balancer.remove_account(account)
+        else:
+            moves = None
+            st.warning("⚠️ Cambio no válido para el plan actual")
+        if moves is not None:
+            live['moves'].extend(moves)
+            st.success(f"✅ {len(moves)} cuentas movidas · brecha max-min actual: {balancer.gap()}")
+    
+    col_loads, col_moves = st.columns(2)
+    with col_loads:
+        st.markdown("**Carga actual**")
+        st.dataframe(pd.DataFrame({
+            'Ingeniero': list(balancer.loads),
+            'Intensidad Total': list(balancer.loads.values()),
+            'Cuentas': [", ".join(balancer.accounts_of(engineer)) for engineer in balancer.loads]
+        }), use_container_width=True, hide_index=True)
+    with col_moves:
+        st.markdown("**Cuentas movidas**")
+        if live['moves']:
+            st.dataframe(pd.DataFrame(live['moves']), use_container_width=True, hide_index=True)
+        else:
+            st.info("Sin cambios aplicados.")
+
+# =========================
+# ESCENARIOS WHAT-IF
+# =========================
+@st.fragment
+def render_scenarios(fingerprint, accounts_df, engineers_df, availability_matrix, balance_budget, engineer_skills,
+                     history_store, week):
+    """Compara escenarios (diffs de disponibilidad e intensidad) con la semana base
+
+    Es un fragmento: editar y comparar escenarios vuelve a ejecutar solo esta
+    sección. Cada escenario replanifica solo sus días afectados y queda en
+    caché, así que agregar uno no recalcula los demás.
+    """
+    from scenarios import (ALL_DAYS, BASELINE_NAME, CHANGE_COLUMNS, CHANGE_TYPES, compare_scenarios, run_scenarios,
+                           scenario_labels, scenarios_from_changes)  # solo al abrir la sección
+    st.caption("Cada fila es un cambio sobre los CSV; las filas con el mismo escenario (o sin nombre, debajo de "
+               "otra) se aplican juntas. Disponibilidad: sí/no de un ingeniero un día o toda la semana. "
+               "Intensidad: nuevo valor de una cuenta para toda la semana.")
+    with st.form("scenarios"):
+        changes_df = st.data_editor(
+            pd.DataFrame(columns=CHANGE_COLUMNS), num_rows="dynamic", key="scenario_changes",
+            use_container_width=True, hide_index=True,
+            column_config={
+                'Tipo': st.column_config.SelectboxColumn(options=list(CHANGE_TYPES), format_func=CHANGE_TYPES.get),
+                'Objetivo': st.column_config.TextColumn(help="Ingeniero (disponibilidad) o cuenta (intensidad)"),
+                'Día': st.column_config.SelectboxColumn(
+                    options=[ALL_DAYS] + DAYS_OF_WEEK,
+                    format_func=lambda day: "Toda la semana" if day == ALL_DAYS else DAY_NAMES_ES[day]
+                ),
+                'Valor': st.column_config.TextColumn(help="sí/no (disponibilidad) o un entero (intensidad)"),
+            }
+        )
+        st.form_submit_button("🧪 Comparar escenarios", use_container_width=True)
+
+    scenarios, errors = scenarios_from_changes(changes_df, engineers_df['engineer_name'], accounts_df['account'])
+    for error in errors:
+        st.warning(f"⚠️ {error}")
+    if not scenarios:
+        st.info("Sin escenarios: agrega cambios y compara contra la semana base.")
+        return
+
+    # La base es el plan de la semana completa (la misma que en modo semana, si ya está calculada)
+    load_offsets = week_offsets(week)
+    previous_owners = sticky_owners(history_store, accounts_df, week, DAYS_OF_WEEK[0])
+    week_key, baseline = week_baseline(fingerprint, week, accounts_df, engineers_df, availability_matrix,
+                                       balance_budget, load_offsets, engineer_skills, previous_owners)
+    with st.spinner(f"🧪 Replanificando {len(scenarios)} escenarios..."):
+        results = run_scenarios(baseline, scenarios, cache=get_scenario_cache(), cache_key=week_key)
+    summary_df, loads_df, rotation_df = compare_scenarios(baseline, results)
+
+    st.markdown("**Dispersión de carga de la semana**")
+    st.dataframe(summary_df, use_container_width=True, hide_index=True)
+    col_loads, col_rotation = st.columns(2)
+    with col_loads:
+        st.markdown("**Intensidad semanal por ingeniero**")
+        st.dataframe(loads_df, use_container_width=True, hide_index=True)
+    with col_rotation:
+        st.markdown("**Rotación de tareas especiales**")
+        rotation_df['Día'] = rotation_df['Día'].map(DAY_NAMES_ES)
+        # En negrita, los responsables que cambian respecto de la base
+        changed = rotation_df[scenario_labels(results)].ne(rotation_df[BASELINE_NAME], axis=0)
+        styles = changed.reindex(columns=rotation_df.columns, fill_value=False).replace(
+            {True: "font-weight: bold", False: ""}
+        )
+        st.dataframe(rotation_df.style.apply(lambda _: styles, axis=None), use_container_width=True,
+                     hide_index=True)
+
+# =========================
+# DETALLE POR INGENIERO (paginado)
+# =========================
+DETAIL_PAGE_SIZES = [12, 24, 48, 96]
+DETAIL_FILTERS = ["Todos", "Con tarea especial", "Sin tarea especial"]
+
+def engineer_card_html(row, accounts):
+    """Tarjeta HTML de un ingeniero a partir de sus filas en la vista normalizada"""
+    is_special = accounts['Especial'].to_numpy()
+    names = accounts['Cuenta'].tolist()
+    special_html = "".join(
+        f"<div class='special-task'>⭐ {escape(name)}</div>" for name, flag in zip(names, is_special) if flag
+    )
+    regular_html = "".join(f"<li>{escape(name)}</li>" for name, flag in zip(names, is_special) if not flag)
+    return (
+        f"<div class='engineer-card'>"
+        f"<div class='engineer-name'>{escape(str(row['Ingeniero']))}</div>"
+        f"<div class='engineer-stats'>Intensidad <b>{row['Intensidad Total']}</b> · "
+        f"Cuentas <b>{row['Total Cuentas']}</b></div>"
+        f"{special_html}<ul class='account-list'>{regular_html}</ul></div>"
+    )
+
+def render_engineer_detail(assignments_df, accounts_df):
+    """Detalle por ingeniero con búsqueda, filtros y paginación; cada página se dibuja en un solo bloque HTML
+
+    La vista normalizada ingeniero → cuenta se arma solo para la página visible
+    (y para todo el plan únicamente si hay búsqueda), así que el costo no crece
+    con el tamaño del roster.
+    """
+    has_shift = 'Turno' in assignments_df.columns
+    filter_cols = st.columns([3, 2, 2, 1] if has_shift else [3, 2, 1])
+    with filter_cols[0]:
+        query = st.text_input("🔎 Buscar ingeniero o cuenta", key="detail_query").strip()
+    with filter_cols[1]:
+        task_filter = st.selectbox("Tareas especiales", DETAIL_FILTERS, key="detail_filter")
+    if has_shift:
+        with filter_cols[2]:
+            shift_filter = st.selectbox("Turno", ["Todos"] + sorted(assignments_df['Turno'].unique()),
+                                        key="detail_shift")
+    with filter_cols[-1]:
+        page_size = st.selectbox("Por página", DETAIL_PAGE_SIZES, key="detail_page_size")
+    
+    # Filtros vectorizados sobre el resumen y la vista normalizada
+    mask = np.ones(len(assignments_df), dtype=bool)
+    if task_filter != "Todos":
+        mask &= assignments_df['Tiene Tarea Especial'].to_numpy() == (task_filter == "Con tarea especial")
+    if has_shift and shift_filter != "Todos":
+        mask &= (assignments_df['Turno'] == shift_filter).to_numpy()
+    if query:
+        accounts_long = assignment_accounts(assignments_df, accounts_df)
+        matches_account = accounts_long['Cuenta'].str.contains(query, case=False, regex=False)
+        engineers = assignments_df['Ingeniero']
+        mask &= (engineers.str.contains(query, case=False, regex=False)
+                 | engineers.isin(accounts_long.loc[matches_account, 'Ingeniero'])).to_numpy()
+    filtered = assignments_df[mask]
+    
+    if filtered.empty:
+        st.info("Ningún ingeniero coincide con la búsqueda.")
+        return
+    
+    n_pages = -(-len(filtered) // page_size)
+    if st.session_state.get('detail_page', 1) > n_pages:
+        st.session_state['detail_page'] = 1
+    page = st.number_input("Página", min_value=1, max_value=n_pages, step=1, key="detail_page")
+    st.caption(f"{len(filtered)} de {len(assignments_df)} ingenieros · página {page} de {n_pages}")
+    
+    page_rows = filtered.iloc[(page - 1) * page_size:page * page_size]
+    page_accounts = assignment_accounts(page_rows, accounts_df)
+    accounts_by_engineer = dict(tuple(page_accounts.groupby('Ingeniero', sort=False)))
+    empty = page_accounts.iloc[:0]
+    cards = "".join(
+        engineer_card_html(row, accounts_by_engineer.get(row['Ingeniero'], empty))
+        for _, row in page_rows.iterrows()
+    )
+    st.markdown(f"<div class='engineer-grid'>{cards}</div>", unsafe_allow_html=True)
+
+# =========================
+# EXPORTACIÓN
+# =========================
+def render_export(selected_day, week, assignments_df, week_plans, accounts_df, data_key, history_store):
+    """Descargas del plan en formato largo (día o semana); el archivo se genera al hacer clic y queda en caché"""
+    from export import (EXPORT_FORMATS, ExportCache, available_formats, file_name, plan_fingerprint, rows_fingerprint,
+                        rows_long_frame)
+    export_cache = get_export_cache()
+    fmt = st.selectbox("📥 Exportar asignaciones", available_formats(), key="export_format",
+                       format_func=lambda f: EXPORT_FORMATS[f]['label'])
+
+    def day_file():
+        plans = {selected_day: assignments_df}
+        key = ExportCache.key((plan_fingerprint(plans), data_key), selected_day, fmt)
+        return export_cache.spool(key, lambda: plan_long_frame(plans, accounts_df), fmt)
+
+    def week_file():
+        if week_plans is not None:
+            key = ExportCache.key((plan_fingerprint(week_plans), data_key), week, fmt)
+            return export_cache.spool(key, lambda: plan_long_frame(week_plans, accounts_df), fmt)
+        # Planificando día a día, la semana son los días ya guardados en el historial
+        _, versions = history_store.load_rotation(week)
+        rows_by_day = {day: history_store.day_assignments(week, day) for day in DAYS_OF_WEEK if versions.get(day)}
+        key = ExportCache.key((rows_fingerprint(rows_by_day), data_key), week, fmt)
+        return export_cache.spool(key, lambda: rows_long_frame(rows_by_day, accounts_df), fmt)
+
+    mime = EXPORT_FORMATS[fmt]['mime']
+    st.download_button(f"Descargar {DAY_NAMES_ES[selected_day]}", data=day_file, mime=mime,
+                       file_name=file_name(fmt, week, selected_day), on_click="ignore", use_container_width=True)
+    st.download_button("Descargar semana", data=week_file, mime=mime, file_name=file_name(fmt, week),
+                       on_click="ignore", use_container_width=True)
+
+# =========================
+# SECCIONES SECUNDARIAS
+# =========================
+def render_availability(engineers_df, availability_codes, available_names, selected_day):
+    """Tabla de disponibilidad de la semana y resumen del día"""
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        # Tabla de disponibilidad (leída de la matriz precalculada)
+        availability_symbols = np.array(['-', '❌', '✅'], dtype=object)[availability_codes + 1]
+        availability_table = pd.DataFrame(availability_symbols, columns=[DAY_SHORT_ES[day] for day in DAYS_OF_WEEK])
+        availability_table.insert(0, 'Ingeniero', engineers_df['engineer_name'].to_numpy())
         
-        # Guardar en historial
-        st.session_state.special_task_history[selected_day][task] = {
-            'engineer': chosen_engineer,
-            'task': task,
-            'day': selected_day
-        }
-    
-    # 2. DISTRIBUIR CUENTAS REGULARES
-    if weighted:
-        regular_accounts = regular_accounts.sort_values('intensity', ascending=False)
-    
-    if randomize:
-        regular_accounts = regular_accounts.sample(frac=1, random_state=42).reset_index(drop=True)
-    
-    # Inicializar estructura
-    engineers = {eng: {'accounts': [], 'intensity_sum': 0, 'count': 0} for eng in engineers_list}
-    
-    # Asignar tareas especiales primero
-    for engineer, task in special_assignments.items():
-        engineers[engineer]['accounts'].append(f"**{task}**")
-        engineers[engineer]['intensity_sum'] += SPECIAL_TASK_INTENSITY
-        engineers[engineer]['count'] += 1
-    
-    # Distribuir cuentas regulares
-    for _, row in regular_accounts.iterrows():
-        # Encontrar ingeniero con menor carga
-        min_engineer = min(engineers.items(), key=lambda x: (x[1]['intensity_sum'], x[1]['count']))
+        st.dataframe(availability_table, use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.markdown(f"### 📊 {DAY_NAMES_ES[selected_day]}")
+        st.metric("Ingenieros Disponibles", len(available_names))
         
-        engineers[min_engineer[0]]['accounts'].append(row['account'])
-        engineers[min_engineer[0]]['intensity_sum'] += row['intensity']
-        engineers[min_engineer[0]]['count'] += 1
-    
-    # 3. PREPARAR RESULTADOS
-    assignments = []
-    for engineer, data in engineers.items():
-        if data['count'] > 0:
-            # Separar tareas especiales (con **) de las regulares
-            special_tasks = [acc for acc in data['accounts'] if acc.startswith('**')]
-            regular_tasks = [acc for acc in data['accounts'] if not acc.startswith('**')]
-            
-            # Formatear para mostrar
-            accounts_display = []
-            if special_tasks:
-                accounts_display.extend(special_tasks)
-            if regular_tasks:
-                accounts_display.extend(regular_tasks)
-            
-            assignments.append({
-                'Ingeniero': engineer,
-                'Cuentas Asignadas': ", ".join(accounts_display),
-                'Lista Cuentas': data['accounts'],
-                'Tiene Tarea Especial': len(special_tasks) > 0,
-                'Tarea Especial': special_tasks[0] if special_tasks else "Ninguna",
-                'Total Cuentas': data['count'],
-                'Intensidad Total': data['intensity_sum'],
-                'Intensidad Promedio': round(data['intensity_sum'] / data['count'], 1)
+        st.markdown("**👥 Disponibles hoy:**")
+        st.markdown("\n".join(f"- {name}" for name in available_names))
+
+def render_history(rotation):
+    """Tareas especiales registradas en la semana"""
+    history_data = []
+    for day in DAYS_OF_WEEK:
+        for task, engineer in rotation.assignments.get(day, {}).items():
+            history_data.append({
+                'Día': DAY_NAMES_ES[day],
+                'Tarea': task,
+                'Ingeniero': engineer
             })
     
-    return pd.DataFrame(assignments)
+    if history_data:
+        history_df = pd.DataFrame(history_data)
+        st.dataframe(history_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("Aún no hay historial de tareas especiales esta semana.")
+
+def render_raw_data(accounts_df):
+    st.dataframe(accounts_df, use_container_width=True)
+
+@st.fragment
+def lazy_section(key, label, render, *args):
+    """Sección que se calcula y dibuja solo cuando se activa
+
+    Como fragmento, activarla o interactuar con ella vuelve a ejecutar solo la
+    sección y no toda la app.
+    """
+    if st.toggle(label, key=f"lazy_{key}"):
+        render(*args)
+
+def render_section(key, render, *args, label="Mostrar"):
+    """Dibuja la sección ya (modo completo) o bajo demanda (inicio rápido)"""
+    if fast_start:
+        lazy_section(key, label, render, *args)
+    else:
+        render(*args)
+
+# =========================
+# GUARDADO DEL PLAN
+# =========================
+def persist_plan(timer, history_store, rotation, day_versions, assignments_df, cached_plan):
+    """Guarda el plan del día en el historial y registra su carga en el almacén de equidad
+
+    Falla si otro usuario guardó este día después de leerlo. Un plan de la
+    caché ya guardado, con el día sin cambios en disco, no vuelve a escribirse;
+    la carga solo se registra cuando el guardado creó una versión nueva.
+    """
+    from history_store import HistoryConflictError, assignment_rows
+    from workload_store import plan_date
+    stored_version = day_versions.get(selected_day, 0)
+    if cached_plan is not None and cached_plan['version'] == stored_version:
+        return
+    with timer.stage('save_history'):
+        try:
+            saved_version = history_store.save_day(
+                current_week_key,
+                selected_day,
+                rotation.assignments.get(selected_day, {}),
+                assignment_rows(assignments_df),
+                expected_version=stored_version
+            )
+        except HistoryConflictError:
+            st.toast("🔄 Otro usuario actualizó este día; recargando la rotación")
+            st.rerun()
+        if cached_plan is not None:
+            cached_plan['version'] = saved_version
+    if saved_version != stored_version:
+        # Se registra siempre (aunque la equidad esté apagada) para que la ventana ya tenga datos al activarla;
+        # el último plan guardado de cada fecha es el que cuenta
+        with timer.stage('record_workload'):
+            get_workload_store().record_day(
+                plan_date(current_week_key, selected_day),
+                assignments_df.groupby('Ingeniero')['Intensidad Total'].sum().to_dict()
+            )
 
 # =========================
 # INTERFAZ PRINCIPAL
 # =========================
-def main():
+def main(timer):
     # TÍTULO PRINCIPAL
     st.markdown('<h1 class="main-title">⚡ INCIDENT LOAD BALANCER</h1>', unsafe_allow_html=True)
     st.markdown("### Sistema con Rotación de Tareas Especiales")
@@ -336,40 +745,150 @@ def main():
         """)
     
     # CARGAR DATOS
+    signatures = tuple(file_signature(path) for path in (ENGINEERS_CSV, AVAILABILITY_CSV, ACCOUNTS_CSV))
     with st.spinner("🔄 Cargando datos del sistema..."):
-        engineers_df = load_engineers_data()
-        availability_df = load_availability_data()
-        accounts_df = load_accounts_data()
+        with timer.stage('load_engineers'):
+            engineers_df = load_engineers_data(signatures[0])
+        with timer.stage('load_availability'):
+            availability_df = load_availability_data(signatures[1])
+        with timer.stage('load_accounts'):
+            # Las cuentas inactivas no se planifican
+            accounts_df = active_accounts(load_accounts_data(signatures[2]))
+        timer.note(day=selected_day, engineers=len(engineers_df), accounts=len(accounts_df))
+    
+    # INTENSIDAD EN VIVO: el plan usa la tasa de incidentes en lugar de la intensidad del CSV
+    csv_accounts_df = accounts_df
+    if live_mode and not accounts_df.empty:
+        with timer.stage('live_intensity'):
+            from incident_feed import live_intensity
+            incident_feed = get_incident_feed()
+            accounts_df = live_intensity(accounts_df, incident_feed.rates.rates())
     
     # VERIFICAR DATOS
     if engineers_df.empty or availability_df.empty or accounts_df.empty:
         st.error("❌ Error crítico: No se pudieron cargar todos los datos necesarios")
         return
     
-    # FILTRAR INGENIEROS DISPONIBLES
-    day_availability = availability_df[availability_df['day'] == selected_day]
-    available_engineers = day_availability[day_availability['available'] == 'yes']
+    # FILTRAR INGENIEROS DISPONIBLES (y activos)
+    with timer.stage('availability_filter'):
+        availability_codes = load_availability_status(engineers_df, availability_df)
+        availability_matrix = (availability_codes == 1) & active_engineers(engineers_df)[:, None]
+        available_mask = availability_matrix[:, DAYS_OF_WEEK.index(selected_day)]
     
-    if available_engineers.empty:
+    if not available_mask.any():
         st.warning(f"⚠️ No hay ingenieros disponibles para el {DAY_NAMES_ES[selected_day]}")
         return
     
-    available_ids = available_engineers['engineer_id'].tolist()
-    available_names = engineers_df[engineers_df['engineer_id'].isin(available_ids)]['engineer_name'].tolist()
+    available_names = engineers_df.loc[available_mask, 'engineer_name'].tolist()
+    available_shifts = engineers_df.loc[available_mask, 'shift'].tolist() if plan_by_shift else None
+    
+    # CARGAR ROTACIÓN DE LA SEMANA (solo la ventana actual)
+    with timer.stage('load_rotation'):
+        history_store = get_history_store()
+        rotation, day_versions = history_store.load_rotation(current_week_key)
+    
+    # CARGA ACUMULADA DE LOS ÚLTIMOS DÍAS (la semana completa se mide desde el lunes)
+    plan_start = DAYS_OF_WEEK[0] if plan_whole_week else selected_day
+    load_offsets = {}
+    if multi_day_fairness:
+        with timer.stage('load_workload'):
+            load_offsets = week_offsets(current_week_key) if plan_whole_week else rolling_offsets(current_week_key,
+                                                                                                  selected_day)
+    
+    # HABILIDADES Y CONTINUIDAD (cuentas sticky: el dueño de ayer según el historial)
+    with timer.stage('load_constraints'):
+        engineer_skills = dict(zip(engineers_df['engineer_name'], engineers_df['skills']))
+        previous_owners = sticky_owners(history_store, accounts_df, current_week_key, plan_start)
     
     # DISTRIBUIR CUENTAS CON TAREAS ESPECIALES
-    assignments_df = distribute_with_special_tasks(
-        accounts_df, 
-        available_names,
-        selected_day,
-        weighted=use_weighted,
-        randomize=randomize
-    )
+    with timer.stage('distribute'):
+        balance_budget = balance_budget_ms / 1000 if optimize_balance else None
+        fingerprint = data_fingerprint(signatures, engineers_df, availability_df, csv_accounts_df)
+        if live_mode:
+            fingerprint = input_fingerprint(accounts_df[['intensity']], csv=fingerprint)
+        if plan_whole_week:
+            # La semana se calcula una vez por conjunto de datos; cambiar de día es una consulta
+            _, baseline = week_baseline(fingerprint, current_week_key, accounts_df, engineers_df, availability_matrix,
+                                        balance_budget, load_offsets, engineer_skills, previous_owners)
+            week_plans, rotation = baseline.plans, baseline.rotation
+            assignments_df = week_plans[selected_day]
+            load_offsets = baseline.entry_offsets[selected_day] or {}
+            cached_plan = None
+        else:
+            week_plans = None
+            # Reruns sin cambios en datos, día, parámetros ni rotación reutilizan el plan
+            plan_cache = get_plan_cache()
+            cache_key = PlanCache.key(
+                fingerprint, selected_day, rotation.state_key(exclude_period=selected_day),
+                weighted=use_weighted, randomize=randomize, balance_budget=balance_budget, by_shift=plan_by_shift,
+                seeded=seeded_mode, n_candidates=n_candidates, seed=plan_seed,
+                load_offsets=tuple(sorted(load_offsets.items())),
+                previous_owners=hash(frozenset(previous_owners.items()))
+            )
+            cached_plan = plan_cache.get(cache_key)
+            timer.note(plan_cache='hit' if cached_plan is not None else 'miss')
+            if cached_plan is not None:
+                assignments_df = cached_plan['plan']
+                rotation.clear_period(selected_day)
+                for task, engineer in cached_plan['special_tasks'].items():
+                    rotation.record(selected_day, task, engineer)
+            else:
+                if plan_by_shift:
+                    assignments_df = distribute_by_shift(
+                        accounts_df,
+                        available_names,
+                        available_shifts,
+                        selected_day,
+                        rotation,
+                        weighted=use_weighted,
+                        randomize=randomize,
+                        balance_budget=balance_budget,
+                        load_offsets=load_offsets,
+                        engineer_skills=engineer_skills,
+                        previous_owners=previous_owners
+                    )
+                elif seeded_mode:
+                    assignments_df = distribute_best_of(
+                        accounts_df,
+                        available_names,
+                        selected_day,
+                        rotation,
+                        n_candidates=n_candidates,
+                        seed=plan_seed,
+                        weighted=use_weighted,
+                        balance_budget=balance_budget,
+                        load_offsets=load_offsets,
+                        engineer_skills=engineer_skills,
+                        previous_owners=previous_owners
+                    )
+                else:
+                    assignments_df = distribute_with_special_tasks(
+                        accounts_df, 
+                        available_names,
+                        selected_day,
+                        rotation,
+                        weighted=use_weighted,
+                        randomize=randomize,
+                        balance_budget=balance_budget,
+                        load_offsets=load_offsets,
+                        engineer_skills=engineer_skills,
+                        previous_owners=previous_owners
+                    )
+                cached_plan = {
+                    'plan': assignments_df,
+                    'special_tasks': dict(rotation.assignments.get(selected_day, {})),
+                    'version': None,  # versión del día en el historial tras guardar este plan
+                }
+                plan_cache.put(cache_key, cached_plan)
     
     if assignments_df.empty:
         st.warning("⚠️ No se pudieron generar asignaciones")
         return
     
+    # GUARDAR PLAN (con inicio rápido, después de dibujar lo principal)
+    if not fast_start:
+        persist_plan(timer, history_store, rotation, day_versions, assignments_df, cached_plan)
+    
     # =========================
     # RESUMEN DE TAREAS ESPECIALES
     # =========================
@@ -377,58 +896,34 @@ def main():
     st.markdown('<h3 class="section-title">📌 ASIGNACIÓN DE TAREAS ESPECIALES HOY</h3>', unsafe_allow_html=True)
     
     # Filtrar ingenieros con tareas especiales
-    special_assignments = assignments_df[assignments_df['Tiene Tarea Especial']]
-    
-    if not special_assignments.empty:
-        cols = st.columns(len(special_assignments))
-        for idx, (_, row) in enumerate(special_assignments.iterrows()):
-            with cols[idx]:
-                st.markdown(f"""
-                <div style='background-color: #FEF3C7; padding: 15px; border-radius: 10px; 
-                            border: 2px solid #F59E0B; text-align: center;'>
-                    <div style='font-size: 1.2rem; font-weight: 700; color: #92400E;'>
-                        {row['Ingeniero']}
-                    </div>
-                    <div style='font-size: 1rem; color: #92400E; margin-top: 5px;'>
-                        {row['Tarea Especial'].replace('**', '')}
+    with timer.stage('render_special_tasks'):
+        special_assignments = assignments_df[assignments_df['Tiene Tarea Especial']]
+        
+        if not special_assignments.empty:
+            cols = st.columns(len(special_assignments))
+            for idx, (_, row) in enumerate(special_assignments.iterrows()):
+                with cols[idx]:
+                    st.markdown(f"""
+                    <div style='background-color: #FEF3C7; padding: 15px; border-radius: 10px; 
+                                border: 2px solid #F59E0B; text-align: center;'>
+                        <div style='font-size: 1.2rem; font-weight: 700; color: #92400E;'>
+                            {row['Ingeniero']}
+                        </div>
+                        <div style='font-size: 1rem; color: #92400E; margin-top: 5px;'>
+                            {row['Tarea Especial'].replace('**', '')}
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
     
     # =========================
-    # DISPONIBILIDAD
+    # DISPONIBILIDAD (con inicio rápido, más abajo y bajo demanda)
     # =========================
-    st.markdown("---")
-    st.markdown('<h3 class="section-title">📅 DISPONIBILIDAD</h3>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        # Tabla de disponibilidad
-        availability_table = []
-        for _, engineer in engineers_df.iterrows():
-            row = {'Ingeniero': engineer['engineer_name']}
-            for day in DAYS_OF_WEEK:
-                available = availability_df[
-                    (availability_df['engineer_id'] == engineer['engineer_id']) & 
-                    (availability_df['day'] == day)
-                ]
-                if not available.empty:
-                    status = available.iloc[0]['available']
-                    row[DAY_SHORT_ES[day]] = '✅' if status == 'yes' else '❌'
-                else:
-                    row[DAY_SHORT_ES[day]] = '-'
-            availability_table.append(row)
+    if not fast_start:
+        st.markdown("---")
+        st.markdown('<h3 class="section-title">📅 DISPONIBILIDAD</h3>', unsafe_allow_html=True)
         
-        st.dataframe(pd.DataFrame(availability_table), use_container_width=True, hide_index=True)
-    
-    with col2:
-        st.markdown(f"### 📊 {DAY_NAMES_ES[selected_day]}")
-        st.metric("Ingenieros Disponibles", len(available_names))
-        
-        st.markdown("**👥 Disponibles hoy:**")
-        for name in available_names:
-            st.markdown(f"• {name}")
+        with timer.stage('render_availability'):
+            render_availability(engineers_df, availability_codes, available_names, selected_day)
     
     # =========================
     # MÉTRICAS
@@ -436,23 +931,67 @@ def main():
     st.markdown("---")
     st.markdown('<h3 class="section-title">📊 MÉTRICAS DE DISTRIBUCIÓN</h3>', unsafe_allow_html=True)
     
-    metrics_cols = st.columns(4)
-    
-    with metrics_cols[0]:
-        total_intensity = assignments_df['Intensidad Total'].sum()
-        st.metric("Intensidad Total", total_intensity)
-    
-    with metrics_cols[1]:
-        avg_per_engineer = assignments_df['Intensidad Total'].mean()
-        st.metric("Promedio x Ing.", f"{avg_per_engineer:.1f}")
+    with timer.stage('render_metrics'):
+        metrics_cols = st.columns(4)
+        
+        with metrics_cols[0]:
+            total_intensity = assignments_df['Intensidad Total'].sum()
+            st.metric("Intensidad Total", total_intensity)
+        
+        with metrics_cols[1]:
+            avg_per_engineer = assignments_df['Intensidad Total'].mean()
+            st.metric("Promedio x Ing.", f"{avg_per_engineer:.1f}")
+        
+        with metrics_cols[2]:
+            special_count = assignments_df['Tiene Tarea Especial'].sum()
+            st.metric("Tareas Especiales", special_count)
+        
+        with metrics_cols[3]:
+            total_accounts = assignments_df['Total Cuentas'].sum()
+            st.metric("Cuentas Totales", total_accounts)
+        
+        balance = assignments_df.attrs.get('balance')
+        if balance:
+            st.success(
+                f"⚖️ Balance óptimo: brecha max-min {balance['gap_before']} → {balance['gap_after']} "
+                f"({balance['moves']} cuentas movidas)"
+            )
+        
+        winning_seed = assignments_df.attrs.get('seed')
+        if winning_seed is not None:
+            gap, spread, repeats = assignments_df.attrs['score']
+            st.info(
+                f"🎯 Mejor de {len(assignments_df.attrs['candidates'])} candidatos: semilla **{winning_seed}** "
+                f"(brecha {gap}, dispersión de tareas especiales {spread}, repeticiones {repeats})"
+            )
+
+        constraints = assignments_df.attrs.get('constraints')
+        if constraints:
+            if constraints['sticky_total']:
+                st.info(f"🔗 Continuidad: {constraints['sticky_kept']} de {constraints['sticky_total']} cuentas sticky "
+                        "siguen con el ingeniero de ayer")
+            if constraints['unmet_skills']:
+                st.warning(f"🧩 Nadie disponible tiene las habilidades de {len(constraints['unmet_skills'])} cuenta(s); "
+                           f"se asignaron al menos cargado: {', '.join(constraints['unmet_skills'][:10])}")
+        
+        if load_offsets:
+            with st.expander(f"📈 Carga inicial por equidad multi-día ({fairness_window} días)"):
+                offsets_table = pd.DataFrame(sorted(load_offsets.items(), key=lambda item: -item[1]),
+                                             columns=['Ingeniero', 'Carga inicial'])
+                st.dataframe(offsets_table, use_container_width=True, hide_index=True)
     
-    with metrics_cols[2]:
-        special_count = assignments_df['Tiene Tarea Especial'].sum()
-        st.metric("Tareas Especiales", special_count)
+    timer.mark('first_paint')
     
-    with metrics_cols[3]:
-        total_accounts = assignments_df['Total Cuentas'].sum()
-        st.metric("Cuentas Totales", total_accounts)
+    # =========================
+    # CARGA EN VIVO
+    # =========================
+    if live_mode:
+        st.markdown("---")
+        st.markdown('<h3 class="section-title">📡 CARGA EN VIVO</h3>', unsafe_allow_html=True)
+        
+        # Solo este fragmento se vuelve a ejecutar con el temporizador
+        with timer.stage('render_live'):
+            st.fragment(run_every=live_refresh_s)(render_live_load)(assignments_df, csv_accounts_df, incident_feed)
     
     # =========================
     # ASIGNACIONES DETALLADAS
@@ -461,20 +1000,31 @@ def main():
     st.markdown('<h3 class="section-title">📋 ASIGNACIONES COMPLETAS</h3>', unsafe_allow_html=True)
     
     # Preparar datos para mostrar
-    display_df = assignments_df[['Ingeniero', 'Cuentas Asignadas', 'Total Cuentas', 'Intensidad Total']].copy()
-    
-    # Resaltar tareas especiales en la tabla
-    def highlight_special_tasks(text):
-        if '**EoS Report**' in text or '**DCOSS Monitoring**' in text:
-            return 'background-color: #FEF3C7;'
-        return ''
-    
-    # Mostrar tabla
-    st.dataframe(
-        display_df.style.applymap(highlight_special_tasks, subset=['Cuentas Asignadas']),
-        use_container_width=True,
-        height=300
-    )
+    with timer.stage('render_assignments'):
+        # Preparar datos para mostrar (la tarea especial va en su propia columna, sin estilos por celda)
+        display_columns = ['Ingeniero', 'Tarea Especial', 'Total Cuentas', 'Intensidad Total', 'Cuentas Asignadas']
+        if 'Turno' in assignments_df.columns:
+            display_columns.insert(0, 'Turno')
+        display_df = assignments_df[display_columns].copy()
+        special_names = display_df['Tarea Especial'].str.replace('**', '', regex=False)
+        display_df['Tarea Especial'] = np.where(assignments_df['Tiene Tarea Especial'], '⭐ ' + special_names, '')
+        
+        # Mostrar tabla
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            hide_index=True,
+            height=300
+        )
+    
+    if fast_start:
+        persist_plan(timer, history_store, rotation, day_versions, assignments_df, cached_plan)
+        
+        st.markdown("---")
+        st.markdown('<h3 class="section-title">📅 DISPONIBILIDAD</h3>', unsafe_allow_html=True)
+        with timer.stage('render_availability'):
+            render_section('availability', render_availability, engineers_df, availability_codes, available_names,
+                           selected_day)
     
     # =========================
     # DETALLE POR INGENIERO
@@ -482,36 +1032,8 @@ def main():
     st.markdown("---")
     st.markdown('<h3 class="section-title">👨‍💻 DETALLE POR INGENIERO</h3>', unsafe_allow_html=True)
     
-    cols = st.columns(min(len(assignments_df), 4))
-    
-    for idx, (_, row) in enumerate(assignments_df.iterrows()):
-        if idx < len(cols):
-            with cols[idx]:
-                st.markdown(f"### {row['Ingeniero']}")
-                
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    st.metric("Intensidad", row['Intensidad Total'])
-                with col_b:
-                    st.metric("Cuentas", row['Total Cuentas'])
-                
-                # Mostrar tarea especial primero si tiene
-                special_tasks = [acc for acc in row['Lista Cuentas'] if acc.startswith('**')]
-                regular_tasks = [acc for acc in row['Lista Cuentas'] if not acc.startswith('**')]
-                
-                st.markdown("**📋 Cuentas asignadas:**")
-                
-                # Tareas especiales
-                for task in special_tasks:
-                    st.markdown(f"""
-                    <div class="special-task">
-                        ⭐ {task.replace('**', '')}
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Cuentas regulares
-                for account in regular_tasks:
-                    st.markdown(f"• {account}")
+    with timer.stage('render_detail'):
+        render_section('detail', render_engineer_detail, assignments_df, accounts_df)
     
     # =========================
     # HISTORIAL DE TAREAS ESPECIALES
@@ -520,21 +1042,8 @@ def main():
     st.markdown('<h3 class="section-title">📅 HISTORIAL DE TAREAS ESPECIALES</h3>', unsafe_allow_html=True)
     
     # Mostrar historial de la semana
-    history_data = []
-    for day in DAYS_OF_WEEK:
-        if day in st.session_state.special_task_history:
-            for task, info in st.session_state.special_task_history[day].items():
-                history_data.append({
-                    'Día': DAY_NAMES_ES[day],
-                    'Tarea': task,
-                    'Ingeniero': info['engineer']
-                })
-    
-    if history_data:
-        history_df = pd.DataFrame(history_data)
-        st.dataframe(history_df, use_container_width=True, hide_index=True)
-    else:
-        st.info("Aún no hay historial de tareas especiales esta semana.")
+    with timer.stage('render_history'):
+        render_section('history', render_history, rotation)
     
     # =========================
     # HERRAMIENTAS
@@ -545,33 +1054,85 @@ def main():
     tool_cols = st.columns(3)
     
     with tool_cols[0]:
-        if st.button("📥 Exportar Asignaciones", use_container_width=True):
-            export_df = assignments_df.copy()
-            export_df['Día'] = DAY_NAMES_ES[selected_day]
-            export_df['Fecha'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            csv = export_df.to_csv(index=False, encoding='utf-8-sig')
-            
-            st.download_button(
-                label="Descargar CSV",
-                data=csv,
-                file_name=f"asignaciones_{selected_day}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+        render_export(selected_day, current_week_key, assignments_df, week_plans, accounts_df, fingerprint,
+                      history_store)
     
     with tool_cols[1]:
         if st.button("🔄 Reiniciar Semana", use_container_width=True):
-            st.session_state.special_task_history = {}
+            history_store.clear_week(current_week_key)
             st.rerun()
     
     with tool_cols[2]:
-        if st.button("📊 Ver Datos", use_container_width=True):
+        if fast_start:
+            lazy_section('raw_data', "📊 Ver Datos", render_raw_data, accounts_df)
+        elif st.button("📊 Ver Datos", use_container_width=True):
             with st.expander("Datos Crudos", expanded=False):
-                st.dataframe(accounts_df, use_container_width=True)
+                render_raw_data(accounts_df)
+    
+    # =========================
+    # REBALANCEO INCREMENTAL
+    # =========================
+    with st.expander("⚡ Rebalanceo incremental (spikes y cambios en el turno)", expanded=False):
+        with timer.stage('render_rebalance'):
+            render_section('rebalance', render_incremental_rebalance, assignments_df, accounts_df, engineers_df,
+                           selected_day, label="Activar rebalanceo")
+    
+    # =========================
+    # ESCENARIOS WHAT-IF
+    # =========================
+    with st.expander("🧪 Escenarios what-if (vacaciones, cambios de intensidad)", expanded=False):
+        with timer.stage('render_scenarios'):
+            render_section('scenarios', render_scenarios, fingerprint, accounts_df, engineers_df, availability_matrix,
+                           balance_budget, engineer_skills, history_store, current_week_key,
+                           label="Activar escenarios")
+
+def render_diagnostics(timer, profile=None):
+    """Panel con los tiempos de la ejecución actual y el historial de la sesión"""
+    history = st.session_state.setdefault('timing_history', TimingHistory())
+    record = timer.record()
+    history.add(record)
+    if profile is not None:
+        st.session_state['last_profile'] = profile
+    
+    first_paint = f" · primera pintura {record['first_paint'] * 1000:.0f} ms" if 'first_paint' in record else ""
+    with st.expander(f"🩺 Diagnóstico de rendimiento ({record['total_s'] * 1000:.0f} ms{first_paint})", expanded=False):
+        stages_df = pd.DataFrame(
+            [{'Etapa': stage, 'ms': seconds * 1000} for stage, seconds in record['stages'].items()]
+        )
+        if not stages_df.empty:
+            stages_df['%'] = (stages_df['ms'] / (record['total_s'] * 1000) * 100).round(1)
+            st.dataframe(stages_df.sort_values('ms', ascending=False).round({'ms': 2}),
+                         use_container_width=True, hide_index=True)
+        
+        cache_stats = get_plan_cache().stats()
+        st.caption(
+            f"Caché de planes: {cache_stats['hits']} aciertos · {cache_stats['misses']} fallos "
+            f"({cache_stats['hit_rate']:.0%}) · {cache_stats['size']}/{cache_stats['max_entries']} planes · "
+            f"{cache_stats['evictions']} desalojados"
+        )
+        
+        st.markdown(f"**Historial ({len(history.runs)} ejecuciones en memoria)**")
+        history_df = pd.DataFrame(history.stage_rows())
+        if not history_df.empty:
+            st.line_chart(history_df.pivot_table(index='run', columns='stage', values='ms', aggfunc='sum'))
+        
+        diag_cols = st.columns(2)
+        with diag_cols[0]:
+            st.download_button("📥 Exportar tiempos (JSON)", data=history.to_json(),
+                               file_name="timings.json", mime="application/json", use_container_width=True)
+        with diag_cols[1]:
+            if st.button("🧹 Limpiar historial", use_container_width=True):
+                history.clear()
+        
+        if 'last_profile' in st.session_state:
+            st.markdown("**Perfil cProfile (última captura)**")
+            st.code(st.session_state['last_profile'], language=None)
 
 # =========================
 # EJECUCIÓN
 # =========================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_timer = StageTimer()
+    with profiled(profile_run) as profiler:
+        main(run_timer)
+    render_diagnostics(run_timer, profile_report(profiler) if profiler else None)
\ No newline at end of file
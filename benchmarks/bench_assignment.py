@@ -0,0 +1,45 @@
+"""Compara el greedy lineal contra la cola de prioridad y muestra el punto de cruce.
+
+Uso: python benchmarks/bench_assignment.py [--accounts 20000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import assign_heap, assign_linear
+
+ENGINEER_SIZES = [2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    intensities = [rng.randint(1, 5) for _ in range(args.accounts)]
+
+    crossover = None
+    print(f"{'ingenieros':>10} {'lineal (s)':>12} {'heap (s)':>12} {'speedup':>8}")
+    for n_engineers in ENGINEER_SIZES:
+        sums = [0] * n_engineers
+        counts = [0] * n_engineers
+        assert assign_linear(intensities, sums, counts) == assign_heap(intensities, sums, counts)
+
+        linear = min(timeit.repeat(lambda: assign_linear(intensities, sums, counts), number=1, repeat=args.repeat))
+        heap = min(timeit.repeat(lambda: assign_heap(intensities, sums, counts), number=1, repeat=args.repeat))
+        if crossover is None and heap < linear:
+            crossover = n_engineers
+        print(f"{n_engineers:>10} {linear:>12.4f} {heap:>12.4f} {linear / heap:>7.1f}x")
+
+    if crossover is None:
+        print("La cola de prioridad no superó al greedy lineal en los tamaños probados")
+    else:
+        print(f"Punto de cruce: la cola de prioridad gana desde {crossover} ingenieros")
+
+if __name__ == "__main__":
+    main()
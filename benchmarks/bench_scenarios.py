@@ -0,0 +1,83 @@
+"""Compara N escenarios what-if replanificando la semana completa contra replanificar solo los días afectados.
+
+Uso: python benchmarks/bench_scenarios.py [--accounts 5000] [--engineers 50] [--scenarios 10] [--workers N]
+
+Los escenarios son vacaciones de un ingeniero en días al azar (afectan desde
+el primero de esos días) y cambios de intensidad (afectan toda la semana).
+"Semana completa" es plan_week con los datos del escenario, uno tras otro;
+"días afectados" es run_scenarios en secuencia y en procesos.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data import read_accounts, read_availability, read_engineers
+from planner import DAYS_OF_WEEK, encode_availability, plan_week
+from scenarios import Scenario, WeekBaseline, run_scenarios
+from synthetic import write_roster
+
+def make_scenarios(engineer_names, account_names, n_scenarios, seed=0):
+    """Mitad vacaciones (1 a 3 días de un ingeniero), mitad cambios de intensidad de una cuenta"""
+    rng = random.Random(seed)
+    scenarios = []
+    for idx in range(n_scenarios):
+        if idx % 2 == 0:
+            engineer = rng.choice(engineer_names)
+            days = rng.sample(DAYS_OF_WEEK, rng.randint(1, 3))
+            scenarios.append(Scenario(f"vacaciones {idx}", availability={(engineer, day): False for day in days}))
+        else:
+            scenarios.append(Scenario(f"intensidad {idx}", intensity={rng.choice(account_names): rng.randint(5, 20)}))
+    return scenarios
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=5000)
+    parser.add_argument("--engineers", type=int, default=50)
+    parser.add_argument("--scenarios", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para run_scenarios en paralelo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = write_roster(workdir, args.accounts, args.engineers)
+        engineers_df = read_engineers(paths['engineers'])
+        availability_df = read_availability(paths['availability'])
+        accounts_df = read_accounts(paths['accounts'])
+    engineer_names = engineers_df['engineer_name'].tolist()
+    availability = encode_availability(engineers_df, availability_df)
+    scenarios = make_scenarios(engineer_names, accounts_df['account'].tolist()[:-2], args.scenarios)
+
+    start = time.perf_counter()
+    baseline = WeekBaseline(accounts_df, engineer_names, availability)
+    base_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for scenario in scenarios:
+        plan_week(scenario.apply_intensity(accounts_df), engineer_names,
+                  scenario.apply_availability(engineer_names, availability))
+    full_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = run_scenarios(baseline, scenarios, max_workers=1)
+    affected_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_scenarios(baseline, scenarios, max_workers=args.workers)
+    parallel_s = time.perf_counter() - start
+
+    replanned = sum(len(result.replanned) for result in results)
+    print(f"{args.accounts} cuentas, {args.engineers} ingenieros, {len(scenarios)} escenarios "
+          f"(semana base: {base_s:.2f}s)")
+    print(f"{'modo':>22} {'total (s)':>10} {'por escenario (ms)':>19} {'días planificados':>18}")
+    for label, seconds, days in (("semana completa", full_s, len(scenarios) * len(DAYS_OF_WEEK)),
+                                 ("días afectados", affected_s, replanned),
+                                 ("días afectados (proc.)", parallel_s, replanned)):
+        print(f"{label:>22} {seconds:>10.2f} {seconds / len(scenarios) * 1000:>19.1f} {days:>18}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Mide el arranque en frío y los reruns en caliente de app.py, con y sin inicio rápido.
+
+Uso: python benchmarks/bench_startup.py [--sizes 100 2000 20000] [--reruns 5]
+
+Cada medición corre en un proceso nuevo (streamlit.testing.AppTest) sobre un
+roster sintético: en frío cuenta desde antes de importar Streamlit hasta el
+final de la primera ejecución; en caliente, la mediana de los reruns
+siguientes. "Primera pintura" es el momento en que la app terminó de dibujar
+tareas especiales y métricas (StageTimer.mark).
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import write_roster
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_MODULES = ["app.py", "data.py", "diagnostics.py", "export.py", "history_store.py", "incident_feed.py",
+               "plan_cache.py", "planner.py", "rebalance.py", "scenarios.py", "workload_store.py"]
+
+# Se ejecuta en el proceso hijo: imprime un JSON con los tiempos
+CHILD = r"""
+import json, os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+workdir, fast_start, reruns = sys.argv[1], sys.argv[2] == "1", int(sys.argv[3])
+os.chdir(workdir)
+at = AppTest.from_file(os.path.join(workdir, "app.py"), default_timeout=300)
+at.session_state["fast_start"] = fast_start
+at.run()
+cold = time.perf_counter() - start
+assert not at.exception, at.exception
+warm, first_paint = [], []
+for _ in range(reruns):
+    t = time.perf_counter()
+    at.run()
+    warm.append(time.perf_counter() - t)
+    first_paint.append(at.session_state['timing_history'].runs[-1].get('first_paint'))
+print(json.dumps({'cold_s': cold, 'warm_s': warm, 'first_paint_s': first_paint}))
+"""
+
+def measure(workdir, fast_start, reruns):
+    for stale in ("history.db", "history.db-wal", "history.db-shm", ".snapshots"):
+        path = os.path.join(workdir, stale)
+        shutil.rmtree(path) if os.path.isdir(path) else os.path.exists(path) and os.remove(path)
+    result = subprocess.run([sys.executable, "-c", CHILD, workdir, "1" if fast_start else "0", str(reruns)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 2000, 20000], help="Número de cuentas")
+    parser.add_argument("--accounts-per-engineer", type=int, default=25)
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'cuentas':>8} {'modo':>8} {'frío (s)':>9} {'rerun (ms)':>11} {'1ª pintura (ms)':>16}")
+    for n_accounts in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            for module in APP_MODULES:
+                shutil.copy(os.path.join(ROOT, module), workdir)
+            write_roster(workdir, n_accounts, max(4, n_accounts // args.accounts_per_engineer))
+            for fast_start in (False, True):
+                timings = measure(workdir, fast_start, args.reruns)
+                paints = [value for value in timings['first_paint_s'] if value is not None]
+                paint = f"{statistics.median(paints) * 1000:>16.1f}" if paints else f"{'-':>16}"
+                print(f"{n_accounts:>8} {'rápido' if fast_start else 'completo':>8} {timings['cold_s']:>9.2f} "
+                      f"{statistics.median(timings['warm_s']) * 1000:>11.1f} {paint}")
+
+if __name__ == "__main__":
+    main()
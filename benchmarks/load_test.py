@@ -0,0 +1,127 @@
+"""Prueba de carga del servicio HTTP: latencia p50/p99 de /owner con peticiones concurrentes.
+
+Uso: python benchmarks/load_test.py [--url http://127.0.0.1:8502] [--requests 5000] [--concurrency 32]
+                                    [--accounts 1000] [--engineers 20] [--workers 16]
+
+Sin --url levanta service.py en un subproceso sobre un roster sintético (y un
+historial temporal), así que cliente y servidor no compiten por el mismo GIL.
+Si hoy todavía no tiene plan, se crea con POST /plan antes de medir.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import write_roster
+
+SERVICE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "service.py")
+STARTUP_TIMEOUT_S = 60
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _get(url, method="GET"):
+    """(código HTTP, cuerpo JSON) de un GET (o del método dado)"""
+    try:
+        with urlopen(Request(url, method=method), timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+def start_service(workdir, n_accounts, n_engineers, workers):
+    """Levanta service.py sobre un roster sintético; devuelve (proceso, url base)"""
+    write_roster(workdir, n_accounts, n_engineers, unavailable_rate=0.0)
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, SERVICE, workdir, "--port", str(port), "--workers", str(workers),
+         "--db", os.path.join(workdir, "history.db")],
+        cwd=workdir, stdout=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"service.py terminó con código {process.returncode}")
+        try:
+            if _get(f"{url}/health")[0] == 200:
+                return process, url
+        except (URLError, ConnectionError):
+            pass
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"service.py no respondió en {STARTUP_TIMEOUT_S}s")
+
+def run_load(url, accounts, n_requests, concurrency, seed=0):
+    """Lanza n_requests consultas /owner repartidas en concurrency clientes; devuelve (latencias s, errores, s)"""
+    rng = random.Random(seed)
+    targets = [f"{url}/owner?account={quote(rng.choice(accounts))}" for _ in range(n_requests)]
+
+    def timed(target):
+        start = time.perf_counter()
+        try:
+            status, _ = _get(target)
+        except (URLError, ConnectionError, OSError):
+            status = None
+        return time.perf_counter() - start, status == 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, targets))
+    elapsed = time.perf_counter() - start
+    latencies = np.array([latency for latency, _ in results])
+    errors = sum(not ok for _, ok in results)
+    return latencies, errors, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Servicio ya levantado (por defecto, uno sintético)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--engineers", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=16, help="Hilos del servicio sintético")
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        url = args.url
+        if url is None:
+            process, url = start_service(workdir, args.accounts, args.engineers, args.workers)
+        try:
+            status, plan = _get(f"{url}/plan")
+            if status == 404:
+                status, plan = _get(f"{url}/plan", method="POST")
+            if status != 200:
+                parser.error(f"{url}/plan respondió {status}: {plan.get('error')}")
+            accounts = [row['account'] for row in plan['assignments']]
+            print(f"Plan {plan['week']}/{plan['day']}: {len(accounts)} cuentas")
+
+            run_load(url, accounts, min(200, args.requests), 4)  # calentamiento
+            print(f"{'clientes':>8} {'req/s':>9} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} {'máx (ms)':>9} {'errores':>8}")
+            for concurrency in args.concurrency:
+                latencies, errors, elapsed = run_load(url, accounts, args.requests, concurrency)
+                p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+                print(f"{concurrency:>8} {len(latencies) / elapsed:>9.0f} {p50:>9.2f} {p90:>9.2f} {p99:>9.2f} "
+                      f"{latencies.max() * 1000:>9.2f} {errors:>8}")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+if __name__ == "__main__":
+    main()
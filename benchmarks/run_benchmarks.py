@@ -0,0 +1,129 @@
+"""Mide las etapas del planificador sobre rosters sintéticos y guarda los tiempos en JSON.
+
+Uso: python benchmarks/run_benchmarks.py [--sizes 10 100 1000 10000 100000] [--output bench_results.json]
+
+Cada resultado registra tamaño, distribución, etapa y tiempos (mejor y mediana),
+así que dos archivos de distintas versiones se pueden comparar fila a fila.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data import load_with_snapshot, read_accounts, read_availability, read_engineers
+from planner import (DAYS_OF_WEEK, RotationIndex, SPECIAL_TASKS, availability_status, distribute_with_special_tasks,
+                     select_special_owners)
+from synthetic import write_roster
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+def _timed(func, repeat):
+    """Ejecuta func repeat veces y devuelve los tiempos en segundos"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_size(n_accounts, n_engineers, distribution, repeat, workdir):
+    """Tiempos de cada etapa para un tamaño de roster"""
+    paths = write_roster(workdir, n_accounts, n_engineers, distribution=distribution)
+    snapshot_dir = os.path.join(workdir, ".snapshots")
+
+    engineers_df = read_engineers(paths['engineers'])
+    availability_df = read_availability(paths['availability'])
+    accounts_df = read_accounts(paths['accounts'])
+    availability = availability_status(engineers_df, availability_df) == 1
+    names = engineers_df['engineer_name'].tolist()
+    monday = engineers_df.loc[availability[:, 0], 'engineer_name'].tolist()
+
+    # Rotación con el resto de la semana ya registrada
+    rotation = RotationIndex()
+    for day_idx, day in enumerate(DAYS_OF_WEEK[1:], start=1):
+        for task, engineer in zip(SPECIAL_TASKS, np.array(names, dtype=object)[availability[:, day_idx]]):
+            rotation.record(day, task, engineer)
+    candidates = np.flatnonzero(availability[:, 0])
+
+    load_with_snapshot(paths['accounts'], read_accounts, snapshot_dir)  # deja el snapshot escrito
+
+    stages = {
+        'load_csv': lambda: (read_engineers(paths['engineers']), read_availability(paths['availability']),
+                             read_accounts(paths['accounts'])),
+        'load_snapshot_accounts': lambda: load_with_snapshot(paths['accounts'], read_accounts, snapshot_dir),
+        'availability_grid': lambda: availability_status(engineers_df, availability_df),
+        'special_task_selection': lambda: select_special_owners(candidates, names, DAYS_OF_WEEK[0], rotation),
+        'distribute_with_special_tasks': lambda: distribute_with_special_tasks(
+            accounts_df, monday, DAYS_OF_WEEK[0], RotationIndex()
+        ),
+    }
+
+    results = []
+    for stage, func in stages.items():
+        times = _timed(func, repeat)
+        results.append({
+            'accounts': n_accounts,
+            'engineers': n_engineers,
+            'distribution': distribution,
+            'stage': stage,
+            'repeat': repeat,
+            'best_s': min(times),
+            'median_s': statistics.median(times),
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Número de cuentas")
+    parser.add_argument("--accounts-per-engineer", type=int, default=100)
+    parser.add_argument("--max-engineers", type=int, default=500)
+    parser.add_argument("--distribution", choices=["uniform", "zipf", "bimodal"], default="uniform")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = []
+    for n_accounts in args.sizes:
+        n_engineers = min(max(4, n_accounts // args.accounts_per_engineer), args.max_engineers)
+        with tempfile.TemporaryDirectory() as workdir:
+            size_results = bench_size(n_accounts, n_engineers, args.distribution, args.repeat, workdir)
+        for row in size_results:
+            print(f"{row['accounts']:>7} cuentas {row['engineers']:>4} ing.  {row['stage']:<30} {row['best_s'] * 1000:>10.2f} ms")
+        results.extend(size_results)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Generador de rosters sintéticos con los esquemas de engineers.csv, availability.csv y accounts.csv.
+
+Uso: python benchmarks/synthetic.py DIRECTORIO --accounts 5000 --engineers 60 [--distribution zipf]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import DAYS_OF_WEEK, SPECIAL_TASKS
+
+SHIFTS = ["Morning", "Afternoon", "Night"]
+MAX_INTENSITY = 5
+
+def _intensities(rng, n_accounts, distribution):
+    """Intensidades enteras 1..MAX_INTENSITY según la distribución pedida"""
+    if distribution == "uniform":
+        return rng.integers(1, MAX_INTENSITY + 1, n_accounts)
+    if distribution == "zipf":
+        # Muchas cuentas tranquilas y unas pocas muy pesadas
+        return np.minimum(rng.zipf(2.0, n_accounts), MAX_INTENSITY)
+    if distribution == "bimodal":
+        heavy = rng.random(n_accounts) < 0.2
+        return np.where(heavy, rng.integers(4, MAX_INTENSITY + 1, n_accounts), rng.integers(1, 3, n_accounts))
+    raise ValueError(f"Distribución desconocida: {distribution}")
+
+def generate_roster(n_accounts, n_engineers, distribution="uniform", unavailable_rate=0.2, spike_rate=0.1,
+                    seed=0):
+    """Devuelve (engineers_df, availability_df, accounts_df) con los esquemas de los CSV reales"""
+    rng = np.random.default_rng(seed)
+    engineer_ids = np.arange(1, n_engineers + 1)
+
+    engineers_df = pd.DataFrame({
+        'engineer_id': engineer_ids,
+        'engineer_name': [f"Engineer {i}" for i in engineer_ids],
+        'shift': rng.choice(SHIFTS, n_engineers),
+        'active': 'yes'
+    })
+
+    availability_df = pd.DataFrame({
+        'engineer_id': np.tile(engineer_ids, len(DAYS_OF_WEEK)),
+        'day': np.repeat(DAYS_OF_WEEK, n_engineers),
+        'available': np.where(rng.random(n_engineers * len(DAYS_OF_WEEK)) < unavailable_rate, 'no', 'yes')
+    })
+
+    regular = pd.DataFrame({
+        'account': [f"Account {i}" for i in range(1, n_accounts + 1)],
+        'intensity': _intensities(rng, n_accounts, distribution),
+        'current spike': np.where(rng.random(n_accounts) < spike_rate, 'Yes', 'no'),
+        'active': 'yes'
+    })
+    special = pd.DataFrame({'account': SPECIAL_TASKS})
+    accounts_df = pd.concat([regular, special], ignore_index=True)
+    accounts_df.insert(0, 'account_id', np.arange(1, len(accounts_df) + 1))
+    accounts_df['intensity'] = accounts_df['intensity'].astype('Int64')
+    return engineers_df, availability_df, accounts_df
+
+def write_roster(directory, n_accounts, n_engineers, **kwargs):
+    """Escribe los tres CSV en directory y devuelve sus rutas"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, df in zip(("engineers", "availability", "accounts"), generate_roster(n_accounts, n_engineers, **kwargs)):
+        paths[name] = os.path.join(directory, f"{name}.csv")
+        df.to_csv(paths[name], index=False)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--engineers", type=int, default=20)
+    parser.add_argument("--distribution", choices=["uniform", "zipf", "bimodal"], default="uniform")
+    parser.add_argument("--unavailable-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_roster(args.directory, args.accounts, args.engineers, distribution=args.distribution,
+                         unavailable_rate=args.unavailable_rate, seed=args.seed)
+    for path in paths.values():
+        print(path)
+
+if __name__ == "__main__":
+    main()
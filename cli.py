@@ -0,0 +1,166 @@
+"""Planificación por lotes sin Streamlit: una semana por equipo, equipos en paralelo.
+
+Uso: python cli.py EQUIPOS... [-o plans] [--format csv|parquet|xlsx] [--workers N] [--by-shift]
+
+Cada EQUIPO es un directorio con engineers.csv, availability.csv y
+accounts.csv, o un directorio cuyos subdirectorios lo son (un equipo o turno
+por subdirectorio). El archivo de cada equipo lleva el nombre de su
+directorio, o su ruta (p. ej. east-ops y west-ops) si dos se llaman igual.
+Cada equipo planifica sus siete días en orden, para
+arrastrar la rotación de tareas especiales; los equipos se reparten entre
+procesos. El resultado de cada equipo se escribe en formato largo
+(día, ingeniero, cuenta).
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from data import ACCOUNTS_CSV, AVAILABILITY_CSV, ENGINEERS_CSV, load_accounts, load_availability, load_engineers
+from export import EXPORT_FORMATS, available_formats, write_export
+from planner import active_accounts, encode_availability, load_gap, plan_long_frame, plan_week
+
+# =========================
+# DESCUBRIMIENTO DE EQUIPOS
+# =========================
+def _is_team_dir(path):
+    return all(os.path.exists(os.path.join(path, name)) for name in (ENGINEERS_CSV, AVAILABILITY_CSV, ACCOUNTS_CSV))
+
+def find_team_dirs(paths):
+    """Directorios de equipo a partir de las rutas dadas (el directorio o sus subdirectorios)"""
+    teams = []
+    for path in paths:
+        if _is_team_dir(path):
+            teams.append(path)
+        elif os.path.isdir(path):
+            teams.extend(
+                os.path.join(path, entry) for entry in sorted(os.listdir(path))
+                if _is_team_dir(os.path.join(path, entry))
+            )
+    # Un mismo directorio dado dos veces (o por dos rutas) se planifica una vez
+    unique = {}
+    for team_dir in teams:
+        unique.setdefault(os.path.abspath(team_dir), team_dir)
+    return list(unique.values())
+
+def team_names(team_dirs):
+    """{directorio: nombre del equipo}: el del directorio, o su ruta desde la raíz común si otro se llama igual
+
+    Falla con ValueError si aun así dos equipos quedan con el mismo nombre
+    (escribirían el mismo archivo de salida).
+    """
+    paths = [os.path.abspath(team_dir) for team_dir in team_dirs]
+    bases = [os.path.basename(path) for path in paths]
+    names = {}
+    for team_dir, path, base in zip(team_dirs, paths, bases):
+        same = [other for other, other_base in zip(paths, bases) if other_base == base]
+        if len(same) == 1:
+            names[team_dir] = base
+        else:
+            names[team_dir] = os.path.relpath(path, os.path.commonpath(same)).replace(os.sep, "-")
+    repeated = sorted({name for name in names.values() if list(names.values()).count(name) > 1})
+    if repeated:
+        raise ValueError(f"Equipos con el mismo nombre de salida: {', '.join(repeated)}")
+    return names
+
+# =========================
+# PLANIFICACIÓN DE UN EQUIPO (se ejecuta en un proceso del pool)
+# =========================
+def plan_team(team_dir, weighted=True, randomize=False, balance_budget=None, by_shift=False, max_workers=None,
+              team=None):
+    """Planifica la semana de un equipo y devuelve (equipo, plan en formato largo, resumen)
+
+    team es el nombre del equipo (por defecto, el del directorio; ver
+    team_names). Dentro de un proceso del pool va max_workers=1: los turnos se
+    reparten en el mismo proceso en lugar de abrir otro pool por equipo.
+    """
+    start = time.perf_counter()
+    team = team or os.path.basename(os.path.normpath(team_dir))
+    engineers_df = load_engineers(os.path.join(team_dir, ENGINEERS_CSV))
+    availability_df = load_availability(os.path.join(team_dir, AVAILABILITY_CSV))
+    accounts_df = active_accounts(load_accounts(os.path.join(team_dir, ACCOUNTS_CSV)))
+
+    plans, _ = plan_week(accounts_df, engineers_df['engineer_name'].tolist(),
+                         encode_availability(engineers_df, availability_df), weighted, randomize, balance_budget,
+                         engineer_shifts=engineers_df['shift'].tolist() if by_shift else None,
+                         engineer_skills=dict(zip(engineers_df['engineer_name'], engineers_df['skills'])),
+                         max_workers=max_workers)
+    long_df = plan_long_frame(plans, accounts_df)
+    long_df.insert(0, 'Equipo', team)
+
+    summary = {
+        'team': team,
+        'days': sum(not df.empty for df in plans.values()),
+        'rows': len(long_df),
+        'max_gap': max((_day_gap(df) for df in plans.values() if not df.empty), default=0),
+        'seconds': time.perf_counter() - start,
+    }
+    return team, long_df, summary
+
+def _day_gap(assignments_df):
+    """Brecha max-min del día; en planes por turno, la peor brecha dentro de un turno"""
+    if 'Turno' not in assignments_df.columns:
+        return load_gap(assignments_df['Intensidad Total'].tolist())
+    return max(load_gap(loads.tolist()) for _, loads in assignments_df.groupby('Turno')['Intensidad Total'])
+
+def write_plan(long_df, output_dir, team, fmt):
+    path = os.path.join(output_dir, f"{team}.{fmt}")
+    write_export(long_df, path, fmt)
+    return path
+
+# =========================
+# EJECUCIÓN
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("teams", nargs="+", help="Directorios de equipo o directorios que los contienen")
+    parser.add_argument("-o", "--output", default="plans", help="Directorio de salida")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos en paralelo")
+    parser.add_argument("--weighted", action=argparse.BooleanOptionalAction, default=True,
+                        help="Ordenar por intensidad antes de repartir")
+    parser.add_argument("--randomize", action="store_true", help="Orden aleatorio")
+    parser.add_argument("--balance-budget", type=float, default=None,
+                        help="Segundos de búsqueda local por día (modo balance óptimo)")
+    parser.add_argument("--by-shift", action="store_true",
+                        help="Repartir cada turno por separado según la columna shift")
+    args = parser.parse_args(argv)
+
+    if args.format not in available_formats():
+        requirement = "pyarrow" if args.format == "parquet" else "xlsxwriter u openpyxl"
+        parser.error(f"--format {args.format} requiere {requirement}")
+
+    team_dirs = find_team_dirs(args.teams)
+    if not team_dirs:
+        parser.error("No se encontraron directorios con engineers.csv, availability.csv y accounts.csv")
+    try:
+        names = team_names(team_dirs)
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(args.output, exist_ok=True)
+
+    failures = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(plan_team, team_dir, args.weighted, args.randomize, args.balance_budget,
+                        args.by_shift, max_workers=1, team=names[team_dir]): team_dir
+            for team_dir in team_dirs
+        }
+        for future in as_completed(futures):
+            try:
+                team, long_df, summary = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {futures[future]}: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            path = write_plan(long_df, args.output, team, args.format)
+            print(f"✅ {team}: {summary['days']} días, {summary['rows']} filas, "
+                  f"brecha máx. {summary['max_gap']}, {summary['seconds']:.2f}s -> {path}")
+
+    print(f"{len(team_dirs) - failures}/{len(team_dirs)} equipos planificados en {time.perf_counter() - start:.2f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import glob
+import hashlib
+import importlib.util
+import os
+
+import pandas as pd
+
+from planner import DAYS_OF_WEEK, DEFAULT_SHIFT, normalize_shift
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+ENGINEERS_CSV = "engineers.csv"
+AVAILABILITY_CSV = "availability.csv"
+ACCOUNTS_CSV = "accounts.csv"
+INCIDENTS_JSONL = "incidents.jsonl"
+
+# pyarrow es opcional: parser multihilo y snapshots en Parquet si está instalado
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+CSV_ENGINE = "pyarrow" if HAS_PYARROW else "c"
+SNAPSHOT_DIR = ".snapshots"
+SNAPSHOT_EXT = "parquet" if HAS_PYARROW else "pkl"
+SNAPSHOT_VERSION = 6  # Subir cuando cambie la normalización: invalida los snapshots viejos
+
+# Tipos explícitos: evitan que pandas infiera columna por columna. Texto como 'string' para que las
+# celdas vacías lleguen como nulo (con str el motor pyarrow las convierte en 'None')
+ENGINEERS_DTYPES = {'engineer_id': 'int64', 'engineer_name': 'string', 'shift': 'string', 'active': 'string',
+                    'skills': 'string'}
+AVAILABILITY_DTYPES = {'engineer_id': 'int64', 'day': 'string', 'available': 'string'}
+ACCOUNTS_DTYPES = {'account': 'string', 'current spike': 'string', 'active': 'string', 'shift': 'string',
+                   'skills': 'string', 'sticky': 'string'}
+
+# =========================
+# LECTURA Y NORMALIZACIÓN DE DATOS
+# =========================
+# Estas funciones no dependen de Streamlit: lanzan la excepción original y
+# la interfaz decide cómo mostrarla.
+
+def _read_csv(path, dtype):
+    return pd.read_csv(path, dtype=dtype, engine=CSV_ENGINE)
+
+def account_columns(columns):
+    """{encabezado del CSV: nombre canónico} de las columnas de cuentas con otro nombre
+
+    La primera columna que contiene 'intensity' es intensity; si no hay
+    'account', la primera que contiene 'account' o 'name' es account.
+    """
+    stripped = [str(col).strip() for col in columns]
+    renames = {}
+    intensity_cols = [raw for raw, col in zip(columns, stripped) if 'intensity' in col.lower()]
+    if intensity_cols:
+        renames[intensity_cols[0]] = 'intensity'
+    account_cols = [raw for raw, col in zip(columns, stripped)
+                    if ('account' in col.lower() or 'name' in col.lower()) and raw not in renames]
+    if account_cols and 'account' not in stripped:
+        renames[account_cols[0]] = 'account'
+    return renames
+
+def _read_accounts_csv(path):
+    """Lee accounts.csv con los tipos de ACCOUNTS_DTYPES aplicados a los encabezados tal como vienen"""
+    columns = pd.read_csv(path, nrows=0).columns
+    renames = account_columns(columns)
+    canonical = {raw: renames.get(raw, str(raw).strip()) for raw in columns}
+    dtype = {raw: ACCOUNTS_DTYPES[name] for raw, name in canonical.items() if name in ACCOUNTS_DTYPES}
+    return _read_csv(path, dtype).rename(columns=renames)
+
+def read_engineers(path=ENGINEERS_CSV):
+    """Carga datos de ingenieros"""
+    if os.path.exists(path):
+        df = _read_csv(path, ENGINEERS_DTYPES)
+    else:
+        df = pd.DataFrame({
+            'engineer_id': [1, 2, 3, 4],
+            'engineer_name': ['Sergio', 'Marvin', 'Christopher', 'Esteban'],
+            'shift': ['Afternoon', 'Afternoon', 'Afternoon', 'Afternoon'],
+            'active': ['yes', 'yes', 'yes', 'yes']
+        })
+
+    df.columns = df.columns.str.strip()
+    df['engineer_name'] = df['engineer_name'].fillna('').astype(str).str.strip()
+
+    # Estado del ingeniero (vacío o ausente = activo)
+    if 'active' not in df.columns:
+        df['active'] = 'yes'
+    df['active'] = df['active'].fillna('yes').astype(str).str.lower().str.strip()
+
+    # Turno del ingeniero (vacío o ausente = DEFAULT_SHIFT)
+    if 'shift' not in df.columns:
+        df['shift'] = DEFAULT_SHIFT
+    df['shift'] = df['shift'].map(normalize_shift)
+
+    # Habilidades del ingeniero, separadas por comas (vacío = ninguna)
+    if 'skills' not in df.columns:
+        df['skills'] = ''
+    df['skills'] = df['skills'].fillna('').astype(str).str.strip()
+    return df
+
+def read_availability(path=AVAILABILITY_CSV):
+    """Carga datos de disponibilidad"""
+    if os.path.exists(path):
+        df = _read_csv(path, AVAILABILITY_DTYPES)
+    else:
+        data = []
+        for day in DAYS_OF_WEEK:
+            for engineer_id in [1, 2, 3, 4]:
+                available = 'yes' if day != 'sunday' else 'no'
+                data.append({'engineer_id': engineer_id, 'day': day, 'available': available})
+        df = pd.DataFrame(data)
+
+    df.columns = df.columns.str.strip()
+    # Celdas vacías: sin día no se usa la fila; sin valor cuenta como no disponible
+    df['day'] = df['day'].fillna('').astype(str).str.lower().str.strip()
+    df['available'] = df['available'].fillna('no').astype(str).str.lower().str.strip()
+    return df
+
+def read_accounts(path=ACCOUNTS_CSV):
+    """Carga datos de cuentas"""
+    if os.path.exists(path):
+        df = _read_accounts_csv(path)
+    else:
+        accounts_data = {
+            'account': [
+                'CMF', 'BGR', 'ITAU', 'Pich Ecuador', 'Pich Peru', 'Arauco', 'CCA', 'Cermaq',
+                'Claro Peru', 'CMA (HNN)', 'CMP', 'DIGICEL', 'Forum', 'INS', 'Lima Exp',
+                'Philips', 'Produbanco', 'Qualitas', 'Recipharm', 'RENIEC', 'Registro Civil',
+                'Suzano', 'Chedraui', 'Walmart', 'EoS Report', 'DCOSS Monitoring'
+            ],
+            'intensity': [2, 1, 5, 5, 3, 5, 4, 2, 4, 3, 3, 3, 4, 4, 1, 2, 2, 1, 3, 3, 4, 4, 2, 4, 2, 2]
+        }
+        df = pd.DataFrame(accounts_data)
+
+    df.columns = df.columns.str.strip()
+
+    # Columnas de intensidad y de cuenta con otro nombre (ya renombradas si vienen del CSV)
+    df = df.rename(columns=account_columns(df.columns))
+    if 'intensity' not in df.columns:
+        df['intensity'] = 1
+
+    # Sin nombre de cuenta la fila no se planifica
+    accounts = df['account'].astype('string').str.strip()
+    named = (accounts.notna() & (accounts != '')).to_numpy(dtype=bool)
+    df = df[named].assign(account=accounts[named].astype(str))
+
+    df['intensity'] = pd.to_numeric(df['intensity'], errors='coerce').fillna(2).astype(int)
+
+    # Estado operativo de la cuenta (las tareas especiales no lo traen): active = 'no' la saca del plan
+    # (planner.active_accounts); current spike solo se destaca en el rebalanceo, no cambia el reparto.
+    # sticky = preferir al dueño de ayer
+    for col, default in (('current spike', 'no'), ('active', 'yes'), ('sticky', 'no')):
+        if col not in df.columns:
+            df[col] = default
+        df[col] = df[col].fillna(default).astype(str).str.lower().str.strip()
+
+    # Turnos que cubren la cuenta y habilidades que exige, separados por comas (vacío = todos / ninguna)
+    for col in ('shift', 'skills'):
+        if col not in df.columns:
+            df[col] = ''
+        df[col] = df[col].fillna('').astype(str).str.strip()
+
+    return df[['account', 'intensity', 'current spike', 'active', 'shift', 'skills', 'sticky']].dropna()
+
+# =========================
+# CARGA CON SNAPSHOT BINARIO
+# =========================
+def file_signature(path):
+    """(mtime_ns, tamaño) del archivo, o None si no existe; cambia cuando el archivo cambia"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def load_with_snapshot(path, reader, snapshot_dir=SNAPSHOT_DIR):
+    """Devuelve reader(path) reutilizando un snapshot binario ya normalizado
+
+    El snapshot se nombra con la firma del CSV, así que se descarta solo en
+    cuanto el archivo cambia de fecha o tamaño. Si no se puede escribir
+    (disco de solo lectura, etc.) se sigue sin snapshot.
+    """
+    signature = file_signature(path)
+    if signature is None:
+        return reader(path)
+
+    # El hash de la ruta evita choques entre CSV homónimos de distintos directorios
+    path_hash = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    stem = f"{os.path.basename(path)}-{path_hash}"
+    snapshot = os.path.join(snapshot_dir, f"{stem}.v{SNAPSHOT_VERSION}.{signature[0]}-{signature[1]}.{SNAPSHOT_EXT}")
+    if os.path.exists(snapshot):
+        return pd.read_parquet(snapshot) if SNAPSHOT_EXT == "parquet" else pd.read_pickle(snapshot)
+
+    df = reader(path)
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(snapshot_dir, f"{glob.escape(stem)}.*")):
+            os.remove(stale)
+        tmp = f"{snapshot}.{os.getpid()}.tmp"
+        if SNAPSHOT_EXT == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, snapshot)  # atómico: otro proceso nunca ve un snapshot a medias
+    except OSError:
+        pass
+    return df
+
+def load_engineers(path=ENGINEERS_CSV):
+    """Ingenieros normalizados, desde el snapshot si el CSV no cambió"""
+    return load_with_snapshot(path, read_engineers)
+
+def load_availability(path=AVAILABILITY_CSV):
+    """Disponibilidad normalizada, desde el snapshot si el CSV no cambió"""
+    return load_with_snapshot(path, read_availability)
+
+def load_accounts(path=ACCOUNTS_CSV):
+    """Cuentas normalizadas, desde el snapshot si el CSV no cambió"""
+    return load_with_snapshot(path, read_accounts)
@@ -0,0 +1,98 @@
+"""Tiempos por etapa y perfilado puntual de una ejecución, sin dependencia de Streamlit."""
+import io
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+HISTORY_SIZE = 50  # Ejecuciones que se conservan en memoria
+PROFILE_LINES = 40
+
+# =========================
+# CRONÓMETRO POR ETAPA
+# =========================
+class StageTimer:
+    """Acumula la duración de cada etapa de una ejecución, en el orden en que ocurren"""
+
+    def __init__(self):
+        self.timestamp = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.meta = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Cronometra el bloque; la duración se registra aunque el bloque lance una excepción"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def mark(self, name):
+        """Registra en meta los segundos desde el inicio hasta este punto (p. ej. 'first_paint')"""
+        self.meta[name] = time.perf_counter() - self.started
+
+    def note(self, **meta):
+        """Datos de contexto de la ejecución (día, tamaño del roster, ...)"""
+        self.meta.update(meta)
+
+    def record(self):
+        """Resumen serializable de la ejecución"""
+        return {
+            'timestamp': self.timestamp,
+            'total_s': time.perf_counter() - self.started,
+            'stages': dict(self.stages),
+            **self.meta,
+        }
+
+# =========================
+# HISTORIAL EN MEMORIA
+# =========================
+class TimingHistory:
+    """Últimas ejecuciones (buffer circular de tamaño fijo)"""
+
+    def __init__(self, maxlen=HISTORY_SIZE):
+        self.runs = deque(maxlen=maxlen)
+
+    def add(self, record):
+        self.runs.append(record)
+
+    def clear(self):
+        self.runs.clear()
+
+    def stage_rows(self):
+        """Una fila por ejecución y etapa, lista para un DataFrame"""
+        return [
+            {'timestamp': run['timestamp'], 'run': idx, 'stage': stage, 'ms': seconds * 1000}
+            for idx, run in enumerate(self.runs)
+            for stage, seconds in run['stages'].items()
+        ]
+
+    def to_json(self):
+        return json.dumps(list(self.runs), indent=2, ensure_ascii=False)
+
+# =========================
+# PERFILADO
+# =========================
+@contextmanager
+def profiled(enabled=True):
+    """cProfile sobre el bloque; entrega el Profile (o None si no está habilitado)"""
+    if not enabled:
+        yield None
+        return
+    import cProfile  # solo al perfilar: no pesa en el arranque normal
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+
+def profile_report(profiler, limit=PROFILE_LINES, sort="cumulative"):
+    """Texto de pstats con las funciones más costosas"""
+    import pstats
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,283 @@
+"""Exportación del plan en formato largo (día, ingeniero, cuenta) a CSV, Parquet y XLSX, sin dependencia de Streamlit.
+
+Cada archivo se escribe por bloques de filas: iter_export entrega los bytes a
+medida que se generan (CSV directo; Parquet y XLSX pasan por un archivo
+temporal que solo queda en memoria si es chico), así que una exportación
+grande no se arma entera en memoria. ExportCache guarda los bytes ya generados
+por huella del plan, formato y alcance (día o semana); ExportCache.spool deja
+la exportación en un archivo temporal para un botón de descarga.
+"""
+import hashlib
+import importlib.util
+import io
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from data import HAS_PYARROW
+from planner import SPECIAL_TASK_INTENSITY
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+# Motores XLSX opcionales: xlsxwriter escribe fila a fila con memoria constante; openpyxl en modo write_only
+HAS_XLSXWRITER = importlib.util.find_spec("xlsxwriter") is not None
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+
+EXPORT_FORMATS = {
+    'csv': {'label': "CSV", 'mime': "text/csv"},
+    'parquet': {'label': "Parquet", 'mime': "application/vnd.apache.parquet"},
+    'xlsx': {'label': "Excel (XLSX)", 'mime': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+}
+CHUNK_ROWS = 50_000  # Filas por bloque (y por row group en Parquet)
+CHUNK_BYTES = 1 << 20  # Bytes por bloque al servir un archivo
+SPOOL_BYTES = 8 << 20  # Parquet/XLSX más grandes que esto se escriben a disco antes de servirse
+XLSX_MAX_ROWS = 1_048_575  # Filas de datos por hoja (más el encabezado)
+DEFAULT_MAX_EXPORT_BYTES = 256 << 20
+DEFAULT_MAX_ENTRY_BYTES = 64 << 20
+
+def available_formats():
+    """Formatos con su dependencia instalada, en el orden de EXPORT_FORMATS"""
+    installed = {'csv': True, 'parquet': HAS_PYARROW, 'xlsx': HAS_XLSXWRITER or HAS_OPENPYXL}
+    return [fmt for fmt in EXPORT_FORMATS if installed[fmt]]
+
+def file_name(fmt, week, day=None):
+    """Nombre del archivo: plan_<semana>_<día>.<ext> o plan_<semana>.<ext> para la semana completa"""
+    return f"plan_{week}_{day}.{fmt}" if day else f"plan_{week}.{fmt}"
+
+# =========================
+# FORMATO LARGO (el de plan_long_frame, a partir del historial)
+# =========================
+def rows_long_frame(rows_by_day, accounts_df):
+    """Formato largo de {día: [(ingeniero, cuenta, especial)]}, como las guarda el historial"""
+    columns = ['Día', 'Ingeniero', 'Cuenta', 'Especial', 'Intensidad']
+    days, engineers, accounts, special = [], [], [], []
+    for day, rows in rows_by_day.items():
+        for engineer, account, is_special in rows:
+            days.append(day)
+            engineers.append(engineer)
+            accounts.append(account)
+            special.append(bool(is_special))
+    long_df = pd.DataFrame({'Día': days, 'Ingeniero': engineers, 'Cuenta': accounts, 'Especial': special},
+                           columns=columns[:-1])
+    intensity_by_account = dict(zip(accounts_df['account'].tolist(), accounts_df['intensity'].tolist()))
+    long_df['Intensidad'] = [SPECIAL_TASK_INTENSITY if is_special else intensity_by_account.get(account, 0)
+                             for account, is_special in zip(accounts, special)]
+    return long_df.astype({'Especial': bool, 'Intensidad': 'int64'})
+
+def plan_fingerprint(plans):
+    """Huella de {día: assignments_df} (ingenieros, turnos y cuentas de cada día)"""
+    digest = hashlib.sha1()
+    for day, assignments_df in plans.items():
+        digest.update(f"\x00{day}\x00".encode("utf-8"))
+        if assignments_df.empty:
+            continue
+        shifts = assignments_df['Turno'].tolist() if 'Turno' in assignments_df.columns else None
+        for i, (engineer, accounts) in enumerate(zip(assignments_df['Ingeniero'], assignments_df['Lista Cuentas'])):
+            shift = f"{shifts[i]}\x1f" if shifts is not None else ""
+            digest.update(f"{shift}{engineer}\x1e{chr(31).join(accounts)}\x1d".encode("utf-8"))
+    return digest.hexdigest()
+
+def rows_fingerprint(rows_by_day):
+    """Huella de {día: [(ingeniero, cuenta, especial)]} (las versiones del historial se reinician con la semana)"""
+    digest = hashlib.sha1()
+    for day, rows in rows_by_day.items():
+        digest.update(repr((day, [tuple(row) for row in rows])).encode("utf-8"))
+    return digest.hexdigest()
+
+# =========================
+# ESCRITURA POR BLOQUES
+# =========================
+def _chunks(long_df, chunk_rows):
+    for start in range(0, len(long_df), chunk_rows):
+        yield long_df.iloc[start:start + chunk_rows]
+
+def iter_csv(long_df, chunk_rows=CHUNK_ROWS):
+    """Bytes del CSV (UTF-8 con BOM, para Excel) bloque a bloque"""
+    yield long_df.head(0).to_csv(index=False).encode("utf-8-sig")
+    for chunk in _chunks(long_df, chunk_rows):
+        yield chunk.to_csv(index=False, header=False).encode("utf-8")
+
+def _write_parquet(long_df, sink, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(long_df.head(chunk_rows), preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        if long_df.empty:
+            writer.write_table(pa.Table.from_pandas(long_df, schema=schema, preserve_index=False))
+        for chunk in _chunks(long_df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def _sheets(long_df):
+    """(nombre de hoja, filas): una hoja por día si hay columna Día, partida si supera el límite de Excel"""
+    groups = [(str(day), rows) for day, rows in long_df.groupby('Día', sort=False)] if 'Día' in long_df else []
+    for name, rows in groups or [("Plan", long_df)]:
+        for part, start in enumerate(range(0, max(len(rows), 1), XLSX_MAX_ROWS)):
+            yield (name if part == 0 else f"{name} ({part + 1})")[:31], rows.iloc[start:start + XLSX_MAX_ROWS]
+
+def _write_xlsx(long_df, sink, chunk_rows):
+    columns = list(long_df.columns)
+    if HAS_XLSXWRITER:
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(sink, {'constant_memory': True, 'in_memory': False})
+        for name, rows in _sheets(long_df):
+            sheet = workbook.add_worksheet(name)
+            sheet.write_row(0, 0, columns)
+            row_number = 1
+            for chunk in _chunks(rows, chunk_rows):
+                for values in zip(*(chunk[col].tolist() for col in columns)):
+                    sheet.write_row(row_number, 0, values)
+                    row_number += 1
+        workbook.close()
+        return
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for name, rows in _sheets(long_df):
+        sheet = workbook.create_sheet(name)
+        sheet.append(columns)
+        for chunk in _chunks(rows, chunk_rows):
+            for values in zip(*(chunk[col].tolist() for col in columns)):
+                sheet.append(values)
+    workbook.save(sink)
+
+def write_export(long_df, sink, fmt, chunk_rows=CHUNK_ROWS):
+    """Escribe long_df en sink (ruta o archivo binario) en el formato fmt, por bloques de filas"""
+    if fmt not in available_formats():
+        raise ValueError(f"Formato no disponible: {fmt} (disponibles: {', '.join(available_formats())})")
+    if fmt == 'csv':
+        if isinstance(sink, str):
+            with open(sink, "wb") as fh:
+                return write_export(long_df, fh, fmt, chunk_rows)
+        for chunk in iter_csv(long_df, chunk_rows):
+            sink.write(chunk)
+    elif fmt == 'parquet':
+        _write_parquet(long_df, sink, chunk_rows)
+    else:
+        _write_xlsx(long_df, sink, chunk_rows)
+
+def iter_export(long_df, fmt, chunk_rows=CHUNK_ROWS):
+    """Bytes del archivo bloque a bloque, para servirlo sin tenerlo entero en memoria"""
+    if fmt == 'csv':
+        yield from iter_csv(long_df, chunk_rows)
+        return
+    # Parquet y XLSX se cierran con un índice al final: se escriben primero a un temporal
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        write_export(long_df, spool, fmt, chunk_rows)
+        spool.seek(0)
+        while True:
+            block = spool.read(CHUNK_BYTES)
+            if not block:
+                break
+            yield block
+
+def export_bytes(long_df, fmt, chunk_rows=CHUNK_ROWS):
+    """El archivo completo en memoria (para exportaciones chicas o un botón de descarga)"""
+    buffer = io.BytesIO()
+    for block in iter_export(long_df, fmt, chunk_rows):
+        buffer.write(block)
+    return buffer.getvalue()
+
+# =========================
+# CACHÉ DE EXPORTACIONES
+# =========================
+class ExportCache:
+    """Bytes de exportaciones ya generadas por (huella del plan, alcance, formato), con desalojo LRU
+
+    El tamaño total está acotado por max_bytes; los archivos más grandes que
+    max_entry_bytes no se guardan y se vuelven a generar por bloques.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_EXPORT_BYTES, max_entry_bytes=DEFAULT_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(fingerprint, scope, fmt):
+        return fingerprint, scope, fmt
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def chunks(self, key, build_frame, fmt, chunk_rows=CHUNK_ROWS):
+        """Bytes de la exportación bloque a bloque: de la caché o generados (y guardados si no son muy grandes)
+
+        build_frame() arma el formato largo; solo se llama si la exportación no está en la caché.
+        """
+        data = self.get(key)
+        if data is not None:
+            for start in range(0, len(data), CHUNK_BYTES):
+                yield data[start:start + CHUNK_BYTES]
+            return
+        yield from self._build(key, build_frame, fmt, chunk_rows)
+
+    def _build(self, key, build_frame, fmt, chunk_rows):
+        blocks, size = [], 0
+        for block in iter_export(build_frame(), fmt, chunk_rows):
+            if blocks is not None:
+                size += len(block)
+                blocks = blocks if size <= self.max_entry_bytes else None
+                if blocks is not None:
+                    blocks.append(block)
+            yield block
+        if blocks is not None:
+            self.put(key, b"".join(blocks))
+
+    def get_or_build(self, key, build_frame, fmt, chunk_rows=CHUNK_ROWS):
+        """El archivo completo, desde la caché o generado una sola vez"""
+        return b"".join(self.chunks(key, build_frame, fmt, chunk_rows))
+
+    def spool(self, key, build_frame, fmt, chunk_rows=CHUNK_ROWS):
+        """La exportación como archivo binario en la posición 0: la de la caché o generada a un temporal
+
+        Lo generado se escribe a disco bloque a bloque en lugar de unirse en
+        memoria; el temporal se borra al cerrar el archivo.
+        """
+        data = self.get(key)
+        if data is not None:
+            return io.BytesIO(data)
+        raw = tempfile.TemporaryFile(buffering=0)
+        try:
+            writer = io.BufferedWriter(raw, buffer_size=CHUNK_BYTES)
+            for block in self._build(key, build_frame, fmt, chunk_rows):
+                writer.write(block)
+            writer.flush()
+            writer.detach()  # sin cerrar el temporal
+            raw.seek(0)
+        except BaseException:
+            raw.close()
+            raise
+        return io.BufferedReader(raw)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,186 @@
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from planner import DAYS_OF_WEEK, RotationIndex
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+DEFAULT_DB_PATH = "history.db"
+BUSY_TIMEOUT_MS = 5000  # Espera máxima por el bloqueo de escritura
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plan_versions (
+    week TEXT NOT NULL,
+    day TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (week, day)
+);
+CREATE TABLE IF NOT EXISTS special_tasks (
+    week TEXT NOT NULL,
+    day TEXT NOT NULL,
+    task TEXT NOT NULL,
+    engineer TEXT NOT NULL,
+    PRIMARY KEY (week, day, task)
+);
+CREATE INDEX IF NOT EXISTS idx_special_tasks_engineer ON special_tasks (engineer, week);
+CREATE TABLE IF NOT EXISTS assignments (
+    week TEXT NOT NULL,
+    day TEXT NOT NULL,
+    engineer TEXT NOT NULL,
+    account TEXT NOT NULL,
+    special INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_assignments_week_day ON assignments (week, day);
+CREATE INDEX IF NOT EXISTS idx_assignments_engineer ON assignments (engineer, week);
+"""
+
+class HistoryConflictError(Exception):
+    """Otro proceso guardó el mismo día después de que lo leyéramos"""
+
+def current_week(today=None):
+    """Semana ISO (p. ej. '2026-W42') que identifica la ventana de rotación"""
+    return (today or date.today()).strftime("%G-W%V")
+
+def previous_day(week, day):
+    """(semana, día) anterior; el del lunes es el domingo de la semana previa"""
+    year, week_number = week.split("-W")
+    day_date = date.fromisocalendar(int(year), int(week_number), DAYS_OF_WEEK.index(day) + 1) - timedelta(days=1)
+    return current_week(day_date), DAYS_OF_WEEK[day_date.weekday()]
+
+# =========================
+# ALMACÉN DE HISTORIAL
+# =========================
+class HistoryStore:
+    """Historial de asignaciones y rotación compartido entre sesiones (SQLite en modo WAL)
+
+    WAL permite lectores concurrentes mientras un único escritor guarda. Cada
+    (semana, día) tiene una versión: save_day solo escribe si la versión sigue
+    siendo la que se leyó y, si no, lanza HistoryConflictError.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Una conexión por operación: Streamlit atiende cada sesión en su propio hilo
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    # ---- Lecturas ----
+    def load_rotation(self, week):
+        """RotationIndex con las tareas especiales de la semana y la versión de cada día"""
+        rotation = RotationIndex()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT day, task, engineer FROM special_tasks WHERE week = ?", (week,)
+            ).fetchall()
+            versions = dict(conn.execute(
+                "SELECT day, version FROM plan_versions WHERE week = ?", (week,)
+            ).fetchall())
+        for day, task, engineer in rows:
+            rotation.record(day, task, engineer)
+        return rotation, versions
+
+    def day_assignments(self, week, day):
+        """Filas (ingeniero, cuenta, especial) guardadas para un día"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT engineer, account, special FROM assignments WHERE week = ? AND day = ? ORDER BY rowid",
+                (week, day)
+            ).fetchall()
+
+    def previous_owners(self, week, day):
+        """{cuenta: ingeniero} de las cuentas regulares guardadas el día anterior (ver previous_day)"""
+        return {
+            account: engineer
+            for engineer, account, special in self.day_assignments(*previous_day(week, day)) if not special
+        }
+
+    def engineer_history(self, engineer, week=None):
+        """Tareas especiales de un ingeniero, opcionalmente limitadas a una semana"""
+        query = "SELECT week, day, task FROM special_tasks WHERE engineer = ?"
+        params = [engineer]
+        if week is not None:
+            query += " AND week = ?"
+            params.append(week)
+        with self._connect() as conn:
+            return conn.execute(query + " ORDER BY week, day", params).fetchall()
+
+    # ---- Escrituras ----
+    def save_day(self, week, day, special_tasks, assignments, expected_version):
+        """Guarda el plan de un día si nadie lo cambió desde expected_version
+
+        special_tasks: {tarea: ingeniero}; assignments: filas (ingeniero, cuenta, especial).
+        Devuelve la versión vigente (la misma si el plan no cambió).
+        """
+        digest = _plan_digest(special_tasks, assignments)
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE toma el bloqueo de escritura: los escritores se serializan
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT version, digest FROM plan_versions WHERE week = ? AND day = ?", (week, day)
+                ).fetchone()
+                version, stored_digest = row if row else (0, None)
+                if version != expected_version:
+                    raise HistoryConflictError(
+                        f"{week}/{day}: versión {version} en disco, se esperaba {expected_version}"
+                    )
+                if stored_digest == digest:
+                    conn.execute("ROLLBACK")
+                    return version
+
+                conn.execute("DELETE FROM special_tasks WHERE week = ? AND day = ?", (week, day))
+                conn.execute("DELETE FROM assignments WHERE week = ? AND day = ?", (week, day))
+                conn.executemany(
+                    "INSERT INTO special_tasks (week, day, task, engineer) VALUES (?, ?, ?, ?)",
+                    [(week, day, task, engineer) for task, engineer in special_tasks.items()]
+                )
+                conn.executemany(
+                    "INSERT INTO assignments (week, day, engineer, account, special) VALUES (?, ?, ?, ?, ?)",
+                    [(week, day, engineer, account, int(special)) for engineer, account, special in assignments]
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO plan_versions (week, day, version, digest, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (week, day, version + 1, digest, datetime.now().isoformat(timespec="seconds"))
+                )
+                conn.execute("COMMIT")
+                return version + 1
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def clear_week(self, week):
+        """Borra el historial de una semana (Reiniciar Semana)"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for table in ("special_tasks", "assignments", "plan_versions"):
+                conn.execute(f"DELETE FROM {table} WHERE week = ?", (week,))
+            conn.execute("COMMIT")
+
+def assignment_rows(assignments_df):
+    """Filas (ingeniero, cuenta, especial) a partir de la tabla de asignaciones"""
+    rows = []
+    for engineer, accounts in zip(assignments_df['Ingeniero'], assignments_df['Lista Cuentas']):
+        for account in accounts:
+            special = account.startswith('**')
+            rows.append((engineer, account.replace('**', '') if special else account, special))
+    return rows
+
+def _plan_digest(special_tasks, assignments):
+    payload = repr((sorted(special_tasks.items()), [tuple(row) for row in assignments]))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
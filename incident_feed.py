@@ -0,0 +1,191 @@
+"""Ingesta de incidentes en vivo: tasas por cuenta en buffers circulares e intensidad efectiva.
+
+Un hilo en segundo plano sigue un archivo JSONL al que otro proceso agrega
+eventos, uno por línea:
+
+    {"account": "ITAU", "ts": "2026-10-17T14:05:00", "count": 1}
+
+ts (epoch o ISO 8601) y count son opcionales. No depende de Streamlit.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from data import INCIDENTS_JSONL
+from planner import SPECIAL_TASKS
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+DEFAULT_WINDOW_S = 3600  # Ventana de la tasa: última hora
+DEFAULT_BUCKET_S = 60    # Resolución del buffer circular
+DEFAULT_POLL_S = 0.5
+DEFAULT_MAX_FUTURE_S = 300  # Desfase de reloj tolerado: un evento más adelantado que esto se descarta
+RATE_LEVELS = (1.0, 3.0, 6.0, 10.0)  # Incidentes/hora desde los que la intensidad pasa a 2, 3, 4 y 5
+
+# =========================
+# TASAS POR CUENTA
+# =========================
+class IncidentRates:
+    """Incidentes por cuenta en una ventana deslizante
+
+    Cada cuenta ocupa una fila de una matriz cuentas × buckets (un buffer
+    circular por cuenta): sumar un evento y avanzar la ventana son O(1) por
+    bucket, y la memoria no crece con el número de eventos. Un evento con ts
+    en el futuro cuenta como de ahora si está dentro de max_future_s, y si no
+    se descarta (en dropped): no puede adelantar la ventana y vaciarla.
+    """
+
+    def __init__(self, window_s=DEFAULT_WINDOW_S, bucket_s=DEFAULT_BUCKET_S, max_future_s=DEFAULT_MAX_FUTURE_S):
+        self.bucket_s = bucket_s
+        self.max_future_s = max_future_s
+        self.n_buckets = max(1, int(window_s // bucket_s))
+        self.counts = np.zeros((16, self.n_buckets), dtype=np.uint32)
+        self.index = {}       # cuenta -> fila de counts
+        self.current = None   # último bucket absoluto (ts // bucket_s) de la ventana
+        self.events = 0
+        self.dropped = 0
+        self.last_event = None
+        self._lock = threading.Lock()
+
+    @property
+    def window_s(self):
+        return self.n_buckets * self.bucket_s
+
+    def add(self, account, ts=None, count=1, now=None):
+        """Suma count incidentes de account en el instante ts (epoch; por defecto, ahora)"""
+        now = time.time() if now is None else now
+        ts = now if ts is None else ts
+        if ts > now + self.max_future_s:
+            with self._lock:
+                self.dropped += count
+            return
+        ts = min(ts, now)
+        bucket = int(ts // self.bucket_s)
+        with self._lock:
+            self._advance(bucket)
+            if self.current - bucket >= self.n_buckets:
+                return  # fuera de la ventana
+            row = self.index.get(account)
+            if row is None:
+                row = len(self.index)
+                if row == len(self.counts):
+                    self.counts = np.vstack([self.counts, np.zeros_like(self.counts)])
+                self.index[account] = row
+            self.counts[row, bucket % self.n_buckets] += count
+            self.events += count
+            self.last_event = max(ts, self.last_event or ts)
+
+    def rates(self, now=None):
+        """{cuenta: incidentes por hora en la ventana} de las cuentas vistas desde que arrancó el feed"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._advance(int(now // self.bucket_s))
+            totals = self.counts[:len(self.index)].sum(axis=1)
+            accounts = list(self.index)
+        return dict(zip(accounts, (totals * (3600 / self.window_s)).tolist()))
+
+    def _advance(self, bucket):
+        """Mueve la ventana hasta bucket, vaciando los buckets que quedan fuera"""
+        if self.current is None:
+            self.current = bucket
+            return
+        steps = bucket - self.current
+        if steps <= 0:
+            return
+        if steps >= self.n_buckets:
+            self.counts[:] = 0
+        else:
+            self.counts[:, np.arange(self.current + 1, bucket + 1) % self.n_buckets] = 0
+        self.current = bucket
+
+def live_intensity(accounts_df, rates, levels=RATE_LEVELS):
+    """Copia de accounts_df con la intensidad efectiva según la tasa de incidentes
+
+    Las cuentas que el feed ya vio toman 1 + el número de niveles de levels que
+    su tasa alcanza; las demás y las tareas especiales conservan la del CSV.
+    """
+    live_df = accounts_df.copy()
+    rate = live_df['account'].map(rates)
+    observed = (rate.notna() & ~live_df['account'].isin(SPECIAL_TASKS)).to_numpy()
+    if observed.any():
+        intensity = live_df['intensity'].to_numpy().copy()
+        intensity[observed] = 1 + np.searchsorted(levels, rate[observed].to_numpy(), side='right')
+        live_df['intensity'] = intensity
+    return live_df
+
+# =========================
+# SEGUIMIENTO DEL ARCHIVO
+# =========================
+def _event_time(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value)).timestamp()
+
+class FeedTailer(threading.Thread):
+    """Hilo que sigue un archivo JSONL (como tail -f) y suma cada evento en un IncidentRates
+
+    Soporta líneas a medio escribir, truncado y rotación del archivo. Las
+    líneas inválidas se cuentan en errors y se descartan.
+    """
+
+    def __init__(self, path=INCIDENTS_JSONL, rates=None, poll_s=DEFAULT_POLL_S):
+        super().__init__(name="incident-feed", daemon=True)
+        self.path = path
+        self.rates = rates if rates is not None else IncidentRates()
+        self.poll_s = poll_s
+        self.lines = 0
+        self.errors = 0
+        self._offset = 0
+        self._inode = None
+        self._partial = b""
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            try:
+                self.poll()
+            except OSError:
+                pass  # el archivo puede desaparecer entre stat y open; se reintenta
+            self._halt.wait(self.poll_s)
+
+    def stop(self):
+        self._halt.set()
+
+    def poll(self):
+        """Procesa lo agregado al archivo desde la última lectura; devuelve el número de eventos"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Archivo nuevo, rotado o truncado: empezar desde el principio
+            self._inode, self._offset, self._partial = stat.st_ino, 0, b""
+        if stat.st_size == self._offset:
+            return 0
+
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read()
+            self._offset = fh.tell()
+
+        *lines, self._partial = (self._partial + chunk).split(b"\n")
+        processed = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+                self.rates.add(str(event['account']), _event_time(event.get('ts')), int(event.get('count', 1)))
+            except (ValueError, KeyError, TypeError):
+                self.errors += 1
+                continue
+            processed += 1
+        self.lines += processed
+        return processed
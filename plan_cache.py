@@ -0,0 +1,65 @@
+"""Caché LRU de planes diarios compartida entre sesiones, sin dependencia de Streamlit."""
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_PLANS = 64
+
+# =========================
+# CACHÉ DE PLANES
+# =========================
+class PlanCache:
+    """Planes ya calculados por clave de entrada, con tamaño acotado y desalojo LRU
+
+    La clave combina la huella de los datos, el día, el estado de la rotación y
+    los parámetros del reparto (ver key). Las entradas son de solo lectura para
+    quien las recibe: varias sesiones pueden compartir el mismo plan.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_PLANS):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # Streamlit atiende cada sesión en su propio hilo
+
+    @staticmethod
+    def key(data_fingerprint, day, rotation_state, **params):
+        """Clave hashable de un plan diario"""
+        return data_fingerprint, day, rotation_state, tuple(sorted(params.items()))
+
+    def get(self, key):
+        """Entrada de key (o None) y la marca como la más reciente"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores de aciertos y fallos para diagnóstico"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
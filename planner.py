@@ -0,0 +1,944 @@
+import hashlib
+import copy
+import heapq
+import random
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Tareas especiales que deben rotar
+SPECIAL_TASKS = ["EoS Report", "DCOSS Monitoring"]
+SPECIAL_TASK_INTENSITY = 2  # Intensidad fija para tareas especiales
+
+DEFAULT_SEED = 42  # Semilla del orden aleatorio
+DEFAULT_BALANCE_BUDGET = 0.5  # Segundos de búsqueda local en modo balance óptimo
+PARALLEL_MIN_ACCOUNTS = 5000  # Por debajo, repartir turnos en procesos cuesta más de lo que ahorra
+DEFAULT_CANDIDATES = 8  # Planes candidatos en el modo con semilla (mejor de N)
+FAIRNESS_WEIGHT = 0.5  # Fracción de la carga acumulada de más (o de menos) que se compensa en cada plan
+DEFAULT_WINDOW_DAYS = 14  # Días de historial que mira la equidad multi-día
+DEFAULT_SHIFT = "Sin turno"  # Turno de los ingenieros con la columna shift vacía
+
+# =========================
+# CODIFICACIÓN DE ENTRADAS
+# =========================
+def availability_status(engineers_df, availability_df):
+    """Matriz ingenieros × días: 1 disponible, 0 no disponible, -1 sin dato
+
+    Filas en el orden de engineers_df; si un (ingeniero, día) aparece repetido
+    vale la primera fila.
+    """
+    first = availability_df.drop_duplicates(['engineer_id', 'day'], keep='first')
+    status = first.assign(status=(first['available'] == 'yes').astype(np.int8))
+    pivot = status.pivot(index='engineer_id', columns='day', values='status')
+    pivot = pivot.reindex(index=engineers_df['engineer_id'], columns=DAYS_OF_WEEK)
+    return pivot.fillna(-1).to_numpy(dtype=np.int8)
+
+def active_engineers(engineers_df):
+    """Máscara de ingenieros activos (active distinto de 'no'; sin esa columna, todos)"""
+    if 'active' not in engineers_df.columns:
+        return np.ones(len(engineers_df), dtype=bool)
+    return (engineers_df['active'].fillna('yes').astype(str).str.lower().str.strip() != 'no').to_numpy()
+
+def active_accounts(accounts_df):
+    """Cuentas a planificar: sin las marcadas active = 'no' (las tareas especiales se planifican siempre)"""
+    if 'active' not in accounts_df.columns:
+        return accounts_df
+    inactive = accounts_df['active'].fillna('yes').astype(str).str.lower().str.strip() == 'no'
+    inactive &= ~accounts_df['account'].isin(SPECIAL_TASKS)
+    return accounts_df[~inactive.to_numpy()] if inactive.any() else accounts_df
+
+def encode_availability(engineers_df, availability_df):
+    """Matriz booleana ingenieros × días de quién se puede planificar (disponible y activo)"""
+    return (availability_status(engineers_df, availability_df) == 1) & active_engineers(engineers_df)[:, None]
+
+def normalize_shift(value):
+    """Turno de un ingeniero sin espacios de más; vacío (o nulo) es DEFAULT_SHIFT"""
+    value = "" if value is None or pd.isna(value) else str(value).strip()
+    return value or DEFAULT_SHIFT
+
+def shift_coverage(accounts_df, shifts):
+    """Matriz booleana cuentas × turnos según la columna opcional 'shift' de accounts_df
+
+    La columna admite varios turnos separados por comas; vacía (o ausente)
+    significa que la cuenta se cubre en todos los turnos.
+    """
+    coverage = np.ones((len(accounts_df), len(shifts)), dtype=bool)
+    if 'shift' not in accounts_df.columns:
+        return coverage
+    wanted = [normalize_shift(shift).lower() for shift in shifts]
+    for row, value in enumerate(accounts_df['shift'].fillna('').astype(str)):
+        listed = {part.strip().lower() for part in value.split(',') if part.strip()}
+        if listed:
+            coverage[row] = [shift in listed for shift in wanted]
+    return coverage
+
+def encode_accounts(accounts_df):
+    """Codifica las cuentas como arrays: (nombres, intensidad, índice de cada tarea especial)
+
+    Las tareas especiales siempre quedan representadas (se añaden si faltan en
+    accounts_df) y llevan SPECIAL_TASK_INTENSITY como intensidad.
+    """
+    # Cada tarea especial se asigna una sola vez aunque aparezca repetida
+    duplicated_tasks = accounts_df['account'].isin(SPECIAL_TASKS) & accounts_df['account'].duplicated()
+    accounts_df = accounts_df[~duplicated_tasks]
+
+    names = accounts_df['account'].tolist()
+    intensity = accounts_df['intensity'].to_numpy(dtype=np.int64, copy=True)
+
+    missing = [task for task in SPECIAL_TASKS if task not in names]
+    if missing:
+        names = names + missing
+        intensity = np.concatenate([intensity, np.full(len(missing), SPECIAL_TASK_INTENSITY, dtype=np.int64)])
+
+    account_names = np.array(names, dtype=object)
+    special_index = np.array([names.index(task) for task in SPECIAL_TASKS], dtype=np.int64)
+    intensity[special_index] = SPECIAL_TASK_INTENSITY
+    return account_names, intensity, special_index
+
+def parse_skills(value):
+    """Habilidades de un valor separado por comas, en minúsculas ('' o NaN = ninguna)"""
+    if not isinstance(value, str):
+        return set()
+    return {part.strip().lower() for part in value.split(',') if part.strip()}
+
+def skill_bits(engineer_skills, account_requirements):
+    """Codifica las habilidades como bitsets (int de Python): (máscara por ingeniero, máscara por cuenta)
+
+    Solo las habilidades que alguna cuenta exige reciben un bit. Un ingeniero
+    puede atender una cuenta si tiene todos sus bits: requerida & propias == requerida.
+    """
+    required = [parse_skills(value) for value in account_requirements]
+    bit = {}
+    for skills in required:
+        for skill in sorted(skills):
+            bit.setdefault(skill, 1 << len(bit))
+
+    def mask(skills):
+        result = 0
+        for skill in skills:
+            result |= bit.get(skill, 0)
+        return result
+
+    return [mask(parse_skills(value)) for value in engineer_skills], [mask(skills) for skills in required]
+
+def encode_constraints(accounts_df, account_names, engineer_names, engineer_skills=None, previous_owners=None):
+    """Restricciones del reparto alineadas con encode_accounts: (requisitos, habilidades, dueño previo) o None
+
+    Las cuentas exigen las habilidades de su columna opcional 'skills' y los
+    ingenieros tienen las de engineer_skills ({ingeniero: 'hab1, hab2'}; sin
+    engineer_skills no se exigen habilidades). Las
+    cuentas con 'sticky' = yes prefieren al ingeniero que las tuvo el día
+    anterior (previous_owners = {cuenta: ingeniero}). Devuelve listas de
+    bitsets por cuenta y por ingeniero y el código del dueño previo por cuenta
+    (-1 si no hay o no está en el reparto); None si nada restringe el reparto.
+    """
+    special = set(SPECIAL_TASKS)
+    requirements = [0] * len(account_names)
+    has_requirements = 'skills' in accounts_df.columns and accounts_df['skills'].fillna('').astype(str).str.strip().any()
+    if engineer_skills is not None and has_requirements:
+        required_by_account = dict(zip(accounts_df['account'].tolist(), accounts_df['skills'].tolist()))
+        skills, account_masks = skill_bits(
+            [engineer_skills.get(name, '') for name in engineer_names],
+            ['' if name in special else required_by_account.get(name, '') for name in account_names.tolist()]
+        )
+        requirements = account_masks
+    else:
+        skills = [0] * len(engineer_names)
+
+    sticky_owner = np.full(len(account_names), -1, dtype=np.int64)
+    if previous_owners and 'sticky' in accounts_df.columns:
+        sticky_accounts = set(accounts_df.loc[accounts_df['sticky'] == 'yes', 'account']) - special
+        codes = {}
+        for code, name in enumerate(engineer_names):
+            codes.setdefault(name, code)
+        for account, name in enumerate(account_names.tolist()):
+            if name in sticky_accounts:
+                sticky_owner[account] = codes.get(previous_owners.get(name), -1)
+
+    if not any(requirements) and not (sticky_owner >= 0).any():
+        return None
+    return requirements, skills, sticky_owner
+
+# =========================
+# MOTOR DE ASIGNACIÓN
+# =========================
+def assign_linear(intensities, intensity_sums, counts):
+    """Asignación greedy de referencia: recorre todos los ingenieros por cuenta (O(cuentas × ingenieros))"""
+    keys = [(s, c, i) for i, (s, c) in enumerate(zip(intensity_sums, counts))]
+    owners = []
+    for intensity in intensities:
+        intensity_sum, count, idx = min(keys)
+        keys[idx] = (intensity_sum + intensity, count + 1, idx)
+        owners.append(idx)
+    return owners
+
+def assign_heap(intensities, intensity_sums, counts):
+    """Asignación greedy con cola de prioridad (O(cuentas × log ingenieros))
+
+    Cada cuenta va al ingeniero con menor (intensity_sum, count); los empates se
+    resuelven por posición, igual que min() sobre el diccionario original.
+    Devuelve el índice del ingeniero asignado a cada cuenta.
+    """
+    heap = [(s, c, i) for i, (s, c) in enumerate(zip(intensity_sums, counts))]
+    if not heap:
+        return []
+    heapq.heapify(heap)
+    owners = []
+    for intensity in intensities:
+        intensity_sum, count, idx = heap[0]
+        heapq.heapreplace(heap, (intensity_sum + intensity, count + 1, idx))
+        owners.append(idx)
+    return owners
+
+def assign_constrained(intensities, intensity_sums, counts, requirements, skills, preferred=None):
+    """Greedy de assign_heap con habilidades y continuidad (O(cuentas × requisitos distintos × log ingenieros))
+
+    Cada cuenta va al ingeniero con menor (intensity_sum, count) entre los que
+    cumplen su bitset de requirements (ver skill_bits). Hay una cola de
+    prioridad por requisito distinto con los ingenieros que lo cumplen: al
+    cambiar una carga el ingeniero se vuelve a encolar en sus colas y las
+    entradas viejas se descartan cuando llegan al tope. preferred (posición o
+    -1 por cuenta) es el dueño del día anterior: conserva la cuenta si la puede
+    atender y no pasa de la carga media del día. Una cuenta que nadie puede
+    atender va al menos cargado de todos.
+    Devuelve la posición del ingeniero asignado a cada cuenta.
+    """
+    sums, counts = list(intensity_sums), list(counts)
+    n_engineers = len(sums)
+    if not n_engineers:
+        return []
+    fair_share = (sum(sums) + sum(intensities)) / n_engineers
+    heaps = {}                                    # requisito -> cola de (intensity_sum, count, idx)
+    queues_of = [[] for _ in range(n_engineers)]  # idx -> colas en las que está
+
+    def queue(requirement):
+        heap = heaps.get(requirement)
+        if heap is None:
+            members = [idx for idx in range(n_engineers) if skills[idx] & requirement == requirement]
+            heap = [(sums[idx], counts[idx], idx) for idx in members]
+            heapq.heapify(heap)
+            heaps[requirement] = heap
+            for idx in members:
+                queues_of[idx].append(heap)
+        return heap or queue(0)
+
+    owners = []
+    for account, (intensity, requirement) in enumerate(zip(intensities, requirements)):
+        idx = preferred[account] if preferred is not None else -1
+        if idx < 0 or skills[idx] & requirement != requirement or sums[idx] + intensity > fair_share:
+            heap = queue(requirement)
+            while heap[0][0] != sums[heap[0][2]] or heap[0][1] != counts[heap[0][2]]:
+                heapq.heappop(heap)  # entrada de una carga que ya cambió
+            idx = heap[0][2]
+        sums[idx] += intensity
+        counts[idx] += 1
+        for heap in queues_of[idx]:
+            heapq.heappush(heap, (sums[idx], counts[idx], idx))
+        owners.append(idx)
+    return owners
+
+def unmet_requirements(requirements, skills):
+    """Máscara de las cuentas cuyo requisito no cumple ningún ingeniero de skills"""
+    feasible = {
+        requirement: any(engineer & requirement == requirement for engineer in skills)
+        for requirement in set(requirements)
+    }
+    return np.array([not feasible[requirement] for requirement in requirements], dtype=bool)
+
+def regular_mask(n_accounts, special_index):
+    """Máscara de cuentas regulares (todas menos las tareas especiales)"""
+    regular = np.ones(n_accounts, dtype=bool)
+    regular[special_index] = False
+    return regular
+
+def processing_order(intensity, regular, weighted=True, randomize=False, seed=DEFAULT_SEED):
+    """Índices de las cuentas regulares en el orden en que se reparten"""
+    order = np.flatnonzero(regular)
+    if weighted:
+        # Mismo orden que DataFrame.sort_values('intensity', ascending=False)
+        values = intensity[order][::-1]
+        order = order[::-1][values.argsort(kind='quicksort')][::-1]
+    if randomize:
+        # Mismo orden que DataFrame.sample(frac=1, random_state=seed)
+        order = order[np.random.RandomState(seed).choice(len(order), size=len(order), replace=False)]
+    return order
+
+def seeded_order(intensity, regular, weighted=True, seed=DEFAULT_SEED):
+    """Orden de reparto determinado por seed: con weighted solo se barajan los empates de intensidad"""
+    order = np.flatnonzero(regular)
+    order = order[np.random.default_rng(seed).permutation(len(order))]
+    if weighted:
+        order = order[np.argsort(-intensity[order], kind='stable')]
+    return order
+
+# =========================
+# ROTACIÓN DE TAREAS ESPECIALES
+# =========================
+class RotationIndex:
+    """Historial de tareas especiales con índices mantenidos incrementalmente
+
+    Cada asignación se guarda por periodo (un día de la semana, una fecha...) y
+    actualiza dos contadores: tareas especiales por ingeniero y veces que cada
+    ingeniero tuvo cada tarea. La ventana de rotación es lo que el índice
+    contiene, así que puede abarcar una semana, un mes o más sin que elegir
+    responsable dependa del largo del historial.
+    """
+
+    def __init__(self):
+        self.assignments = {}         # periodo -> {tarea: ingeniero}
+        self.task_counts = Counter()  # ingeniero -> tareas especiales en la ventana
+        self.seen = Counter()         # (tarea, ingeniero) -> veces en la ventana
+
+    def record(self, period, task, engineer):
+        """Registra (o reemplaza) el responsable de una tarea en un periodo"""
+        period_tasks = self.assignments.setdefault(period, {})
+        if task in period_tasks:
+            self._discount(task, period_tasks[task])
+        period_tasks[task] = engineer
+        self.task_counts[engineer] += 1
+        self.seen[(task, engineer)] += 1
+
+    def clear_period(self, period):
+        """Olvida las asignaciones de un periodo (p. ej. al replanificar ese día)"""
+        for task, engineer in self.assignments.pop(period, {}).items():
+            self._discount(task, engineer)
+
+    def had_task(self, task, engineer):
+        return self.seen[(task, engineer)] > 0
+
+    def state_key(self, exclude_period=None):
+        """Contenido del índice como clave hashable, sin exclude_period (el periodo que se va a replanificar)"""
+        return tuple(sorted(
+            (period, tuple(sorted(tasks.items())))
+            for period, tasks in self.assignments.items() if period != exclude_period
+        ))
+
+    def _discount(self, task, engineer):
+        self.task_counts[engineer] -= 1
+        self.seen[(task, engineer)] -= 1
+        if not self.task_counts[engineer]:
+            del self.task_counts[engineer]
+        if not self.seen[(task, engineer)]:
+            del self.seen[(task, engineer)]
+
+def select_special_owners(candidates, engineer_names, selected_day, rotation, tasks=SPECIAL_TASKS, rng=None,
+                          keep_recorded=False):
+    """Elige el responsable de cada tarea especial y lo registra en rotation
+
+    Replanificar un día reemplaza lo que ese día tenía registrado. Con rng
+    (random.Random) los empates y el reinicio de ciclo salen de ese generador,
+    así que la elección se puede reproducir. Con keep_recorded una tarea que ya
+    tenía responsable ese día lo conserva si sigue entre los candidatos.
+    Devuelve un código de ingeniero por tarea de tasks (-1 si no queda nadie).
+    """
+    recorded = dict(rotation.assignments.get(selected_day, {})) if keep_recorded else {}
+    rotation.clear_period(selected_day)
+
+    owners = np.full(len(tasks), -1, dtype=np.int64)
+    available_engineers = [int(code) for code in candidates]
+    if rng is not None:
+        rng.shuffle(available_engineers)
+
+    for task_idx, task in enumerate(tasks):
+        if not available_engineers:
+            break
+
+        # Ingenieros que NO han tenido esta tarea en la ventana
+        engineers_without_task = [
+            code for code in available_engineers if not rotation.had_task(task, engineer_names[code])
+        ]
+        kept = [code for code in available_engineers if engineer_names[code] == recorded.get(task)]
+
+        if kept:
+            chosen = kept[0]
+        elif engineers_without_task:
+            # Elegir ingeniero con menos tareas especiales en la ventana
+            chosen = min(engineers_without_task, key=lambda code: rotation.task_counts[engineer_names[code]])
+        else:
+            # Si todos ya tuvieron esta tarea, reiniciar ciclo
+            chosen = (rng or random).choice(available_engineers)
+
+        owners[task_idx] = chosen
+        available_engineers = [code for code in available_engineers if code != chosen]
+        rotation.record(selected_day, task, engineer_names[chosen])
+
+    return owners
+
+# =========================
+# PLANIFICACIÓN
+# =========================
+def plan_day(intensity, special_index, special_owners, candidates, weighted=True, randomize=False, seed=DEFAULT_SEED,
+             order=None, offsets=None, constraints=None):
+    """Reparte las cuentas de un día entre los candidatos
+
+    order fija el orden de reparto de las cuentas regulares (por defecto,
+    processing_order); offsets, la carga inicial de cada candidato (enteros, en
+    el orden de candidates); constraints, las habilidades y la continuidad de
+    encode_constraints (ver assign_constrained).
+    Devuelve el vector de asignación: código de ingeniero por cuenta (-1 = sin asignar).
+    """
+    candidates = np.asarray(candidates, dtype=np.int64)
+    assignment = np.full(len(intensity), -1, dtype=np.int64)
+    if len(candidates) == 0:
+        return assignment
+
+    position = {int(code): pos for pos, code in enumerate(candidates)}
+    intensity_sums = [int(offset) for offset in offsets] if offsets is not None else [0] * len(candidates)
+    counts = [0] * len(candidates)
+
+    # Tareas especiales primero
+    for account, owner in zip(special_index, special_owners):
+        if owner >= 0:
+            assignment[account] = owner
+            intensity_sums[position[int(owner)]] += int(intensity[account])
+            counts[position[int(owner)]] += 1
+
+    # Cuentas regulares
+    if order is None:
+        order = processing_order(intensity, regular_mask(len(intensity), special_index), weighted, randomize, seed)
+    if constraints is None:
+        owners = assign_heap(intensity[order].tolist(), intensity_sums, counts)
+    else:
+        requirements, skills, sticky_owner = constraints
+        owners = assign_constrained(
+            intensity[order].tolist(), intensity_sums, counts,
+            [requirements[account] for account in order.tolist()],
+            [skills[code] for code in candidates.tolist()],
+            [position.get(code, -1) for code in sticky_owner[order].tolist()]
+        )
+    assignment[order] = candidates[np.asarray(owners, dtype=np.int64)]
+    return assignment
+
+# =========================
+# BALANCE ÓPTIMO (BÚSQUEDA LOCAL)
+# =========================
+def engineer_loads(assignment, intensity, candidates):
+    """Intensidad total de cada candidato, en el orden de candidates"""
+    candidates = np.asarray(candidates, dtype=np.int64)
+    totals = np.zeros(int(candidates.max()) + 1 if len(candidates) else 0, dtype=np.int64)
+    assigned = assignment >= 0
+    np.add.at(totals, assignment[assigned], intensity[assigned])
+    return totals[candidates]
+
+def load_gap(loads):
+    """Brecha de intensidad entre el ingeniero más y menos cargado"""
+    return int(max(loads) - min(loads)) if len(loads) else 0
+
+def best_transfer(source, target, gap):
+    """Mejor movimiento entre dos ingenieros: (intensidad que sale, intensidad que entra o None)
+
+    source y target agrupan las cuentas movibles por intensidad. Solo se aceptan
+    transferencias netas 0 < delta < gap, que reducen la diferencia del par; se
+    elige la que deja el par más parejo y, a igualdad, el movimiento simple.
+    """
+    best, best_score = None, gap
+    for out_weight in source:
+        options = [(out_weight, None)] + [(out_weight, in_weight) for in_weight in target]
+        for option in options:
+            delta = option[0] - (option[1] or 0)
+            if 0 < delta < gap and abs(gap - 2 * delta) < best_score:
+                best, best_score = option, abs(gap - 2 * delta)
+    return best
+
+def _transfer_options(bucket, skills):
+    """{intensidad: clave de bucket} de las cuentas movibles que puede recibir un ingeniero con skills"""
+    options = {}
+    for weight, requirement in bucket:
+        if skills & requirement == requirement:
+            options.setdefault(weight, (weight, requirement))
+    return options
+
+def improve_balance(assignment, intensity, candidates, movable, time_budget=DEFAULT_BALANCE_BUDGET, offsets=None,
+                    constraints=None):
+    """Mejora una asignación moviendo o intercambiando cuentas hasta agotar time_budget (segundos)
+
+    En cada paso se transfiere carga entre el ingeniero más y el menos cargado
+    (contando offsets, la carga inicial de plan_day); solo se tocan las cuentas
+    marcadas en movable. Con constraints (ver encode_constraints) una cuenta solo
+    va a quien cumple sus habilidades y las que siguen con su dueño previo no se
+    mueven. Devuelve (asignación, reporte) con la brecha max-min antes y después
+    y el número de movimientos.
+    """
+    deadline = time.perf_counter() + time_budget
+    candidates = np.asarray(candidates, dtype=np.int64)
+    assignment = assignment.copy()
+    position = {int(code): pos for pos, code in enumerate(candidates)}
+    requirements, skills = [0] * len(intensity), [0] * len(candidates)
+    if constraints is not None:
+        requirements, engineer_skills, sticky_owner = constraints
+        skills = [engineer_skills[code] for code in candidates.tolist()]
+        movable = movable & (assignment != sticky_owner)
+
+    loads = [int(offset) for offset in offsets] if offsets is not None else [0] * len(candidates)
+    buckets = [defaultdict(list) for _ in candidates]  # (intensidad, requisito) -> cuentas movibles
+    for account in np.flatnonzero(assignment >= 0):
+        pos = position[int(assignment[account])]
+        loads[pos] += int(intensity[account])
+        if movable[account]:
+            buckets[pos][(int(intensity[account]), requirements[account])].append(int(account))
+
+    gap_before = load_gap(loads)
+    moves = 0
+    while len(candidates) > 1 and time.perf_counter() < deadline:
+        hi = max(range(len(loads)), key=loads.__getitem__)
+        lo = min(range(len(loads)), key=loads.__getitem__)
+        outgoing, incoming = _transfer_options(buckets[hi], skills[lo]), _transfer_options(buckets[lo], skills[hi])
+        transfer = best_transfer(outgoing, incoming, loads[hi] - loads[lo])
+        if transfer is None:
+            break
+
+        out_weight, in_weight = transfer
+        for src, dst, weight, options in [(hi, lo, out_weight, outgoing), (lo, hi, in_weight, incoming)]:
+            if weight is None:
+                continue
+            key = options[weight]
+            account = buckets[src][key].pop()
+            if not buckets[src][key]:
+                del buckets[src][key]
+            buckets[dst][key].append(account)
+            assignment[account] = candidates[dst]
+            loads[src] -= weight
+            loads[dst] += weight
+            moves += 1
+
+    return assignment, {'gap_before': gap_before, 'gap_after': load_gap(loads), 'moves': moves}
+
+def assignments_frame(engineer_names, account_names, intensity, assignment, special_index, order):
+    """Construye la tabla de asignaciones por ingeniero que muestra la interfaz"""
+    accounts_by_engineer = {code: [] for code in range(len(engineer_names))}
+    for account in special_index:
+        if assignment[account] >= 0:
+            accounts_by_engineer[int(assignment[account])].append(f"**{account_names[account]}**")
+    for account in order:
+        accounts_by_engineer[int(assignment[account])].append(account_names[account])
+
+    assigned = assignment >= 0
+    counts = np.bincount(assignment[assigned], minlength=len(engineer_names))
+    intensity_sums = np.zeros(len(engineer_names), dtype=np.int64)
+    np.add.at(intensity_sums, assignment[assigned], intensity[assigned])
+
+    assignments = []
+    for code, accounts in accounts_by_engineer.items():
+        count, intensity_sum = int(counts[code]), int(intensity_sums[code])
+        if count > 0:
+            special_tasks = [acc for acc in accounts if acc.startswith('**')]
+            assignments.append({
+                'Ingeniero': engineer_names[code],
+                'Cuentas Asignadas': ", ".join(accounts),
+                'Lista Cuentas': accounts,
+                'Tiene Tarea Especial': len(special_tasks) > 0,
+                'Tarea Especial': special_tasks[0] if special_tasks else "Ninguna",
+                'Total Cuentas': count,
+                'Intensidad Total': intensity_sum,
+                'Intensidad Promedio': round(intensity_sum / count, 1)
+            })
+
+    return pd.DataFrame(assignments)
+
+# =========================
+# EQUIDAD ENTRE DÍAS
+# =========================
+def fairness_offsets(rolling_df, weight=FAIRNESS_WEIGHT):
+    """Carga de más (o de menos) que acumuló cada ingeniero en la ventana, como carga inicial del próximo plan
+
+    rolling_df trae engineer, total y days (ver WorkloadStore.rolling_load). El
+    exceso se mide contra lo que habría cargado un ingeniero promedio en los
+    mismos días trabajados, así que quien no tiene historial arranca en 0.
+    Devuelve {ingeniero: offset entero}.
+    """
+    if rolling_df.empty or rolling_df['days'].sum() == 0:
+        return {}
+    mean_daily = rolling_df['total'].sum() / rolling_df['days'].sum()
+    excess = weight * (rolling_df['total'] - rolling_df['days'] * mean_daily)
+    return dict(zip(rolling_df['engineer'], np.rint(excess).astype(np.int64).tolist()))
+
+class RollingLoads:
+    """Ventana móvil de carga para la equidad multi-día de una semana planificada día a día
+
+    history es el formato largo (day, engineer, intensity) de los días previos
+    al lunes, con day contado desde el lunes (negativo; ver
+    WorkloadStore.week_history). La carga de arranque de cada día suma la de
+    los días de la semana ya planificados que caen en la ventana, así que el
+    plan del lunes pesa en el del martes.
+    """
+
+    def __init__(self, history, window_days, weight=FAIRNESS_WEIGHT):
+        self.history = history
+        self.window_days = window_days
+        self.weight = weight
+
+    def offsets(self, day, plans):
+        """{ingeniero: offset} para day, con plans = {día: assignments_df} de los días anteriores"""
+        idx = DAYS_OF_WEEK.index(day)
+        start = idx - self.window_days
+        past = self.history[(self.history['day'] >= start) & (self.history['day'] < 0)]
+        frames = [past[['engineer', 'intensity']]]
+        for planned_day in DAYS_OF_WEEK[max(start, 0):idx]:
+            plan = plans.get(planned_day)
+            if plan is not None and not plan.empty:
+                loads = plan.groupby('Ingeniero', sort=False)['Intensidad Total'].sum()
+                frames.append(pd.DataFrame({'engineer': loads.index, 'intensity': loads.to_numpy()}))
+        window = pd.concat(frames, ignore_index=True)
+        rolling_df = window.groupby('engineer', sort=False)['intensity'].agg(total='sum', days='size').reset_index()
+        return fairness_offsets(rolling_df, self.weight)
+
+    def key(self):
+        """Clave para cachear un plan hecho con esta ventana"""
+        return input_fingerprint(self.history, window_days=self.window_days, weight=self.weight)
+
+def day_offsets(load_offsets, day, plans):
+    """load_offsets de un día de la semana: fijo ({ingeniero: offset}) o calculado por RollingLoads"""
+    if isinstance(load_offsets, RollingLoads):
+        return load_offsets.offsets(day, plans)
+    return load_offsets
+
+def _offsets_for(engineer_names, load_offsets):
+    if not load_offsets:
+        return None
+    return [int(load_offsets.get(name, 0)) for name in engineer_names]
+
+def constraints_report(constraints, account_names, assignment, candidates):
+    """Resumen de restricciones de un plan: cuentas sin nadie habilitado y continuidad conservada"""
+    requirements, skills, sticky_owner = constraints
+    unmet = unmet_requirements(requirements, [skills[code] for code in candidates])
+    sticky = sticky_owner >= 0
+    return {
+        'unmet_skills': account_names[unmet].tolist(),
+        'sticky_total': int(sticky.sum()),
+        'sticky_kept': int((assignment[sticky] == sticky_owner[sticky]).sum()),
+    }
+
+def plan_assignments(accounts_df, engineers_list, special_owner_names, weighted=True, randomize=False,
+                     balance_budget=None, load_offsets=None, engineer_skills=None, previous_owners=None):
+    """Reparte las cuentas entre engineers_list con los responsables de tareas especiales ya elegidos
+
+    special_owner_names va alineado con SPECIAL_TASKS; None (o un nombre que no
+    está en engineers_list) deja la tarea fuera de este reparto. load_offsets
+    ({ingeniero: carga}) es la carga con la que arranca cada ingeniero (ver
+    fairness_offsets); engineer_skills y previous_owners, las habilidades y la
+    continuidad de encode_constraints (resumen en attrs['constraints']).
+    """
+    engineer_names = list(engineers_list)
+    candidates = np.arange(len(engineer_names))
+    account_names, intensity, special_index = encode_accounts(accounts_df)
+
+    codes = {}
+    for code, name in enumerate(engineer_names):
+        codes.setdefault(name, code)
+    special_owners = np.array([codes.get(name, -1) for name in special_owner_names], dtype=np.int64)
+    offsets = _offsets_for(engineer_names, load_offsets)
+    constraints = encode_constraints(accounts_df, account_names, engineer_names, engineer_skills, previous_owners)
+    assignment = plan_day(intensity, special_index, special_owners, candidates, weighted, randomize, offsets=offsets,
+                          constraints=constraints)
+
+    regular = regular_mask(len(intensity), special_index)
+    balance = None
+    if balance_budget:
+        assignment, balance = improve_balance(assignment, intensity, candidates, regular, balance_budget, offsets,
+                                              constraints)
+
+    order = processing_order(intensity, regular, weighted, randomize)
+    assignments_df = assignments_frame(engineer_names, account_names, intensity, assignment, special_index, order)
+    if balance is not None:
+        assignments_df.attrs['balance'] = balance
+    if constraints is not None:
+        assignments_df.attrs['constraints'] = constraints_report(constraints, account_names, assignment, candidates)
+    return assignments_df
+
+def distribute_with_special_tasks(accounts_df, engineers_list, selected_day, rotation, weighted=True, randomize=False,
+                                  balance_budget=None, load_offsets=None, engineer_skills=None, previous_owners=None,
+                                  rng=None, keep_recorded=False):
+    """Distribuye cuentas con rotación de tareas especiales
+
+    Con balance_budget (segundos) el resultado greedy se mejora con búsqueda local
+    y el reporte de brechas queda en assignments_df.attrs['balance']. Con
+    load_offsets cada ingeniero arranca con esa carga acumulada. Con
+    engineer_skills ({ingeniero: habilidades}) las cuentas que exigen
+    habilidades van solo a quien las tiene, y con previous_owners ({cuenta:
+    ingeniero} del día anterior) las cuentas sticky se quedan con su dueño
+    cuando el balance lo permite. rng (random.Random) y keep_recorded van a
+    select_special_owners.
+    """
+    if not engineers_list or accounts_df.empty:
+        return pd.DataFrame()
+
+    engineer_names = list(engineers_list)
+    special_owners = select_special_owners(np.arange(len(engineer_names)), engineer_names, selected_day, rotation,
+                                           rng=rng, keep_recorded=keep_recorded)
+    owner_names = [engineer_names[code] if code >= 0 else None for code in special_owners]
+    return plan_assignments(accounts_df, engineer_names, owner_names, weighted, randomize, balance_budget, load_offsets,
+                            engineer_skills, previous_owners)
+
+def _plan_partition(job):
+    return plan_assignments(*job)
+
+def distribute_by_shift(accounts_df, engineers_list, engineer_shifts, selected_day, rotation, weighted=True,
+                        randomize=False, balance_budget=None, max_workers=None, load_offsets=None,
+                        engineer_skills=None, previous_owners=None, rng=None, keep_recorded=False):
+    """Distribuye por turno: cada turno reparte sus cuentas solo entre sus ingenieros
+
+    Las tareas especiales rotan entre todos los ingenieros del día, igual que en
+    distribute_with_special_tasks; las cuentas regulares se reparten dentro de
+    cada turno que las cubre (ver shift_coverage). Con suficientes cuentas los
+    turnos se resuelven en procesos separados. Una cuenta cuyos turnos no
+    tienen a nadie ese día se cubre en todos los turnos presentes. Los turnos
+    se comparan sin distinguir mayúsculas (ver normalize_shift).
+    Devuelve la vista combinada, con una columna 'Turno'.
+    """
+    if not engineers_list or accounts_df.empty:
+        return pd.DataFrame()
+
+    engineer_names = list(engineers_list)
+    # Un turno por nombre sin distinguir mayúsculas, con la grafía de su primer ingeniero
+    engineer_shifts = [normalize_shift(shift) for shift in engineer_shifts]
+    shift_names = {}
+    for shift in engineer_shifts:
+        shift_names.setdefault(shift.lower(), shift)
+    engineer_shifts = [shift_names[shift.lower()] for shift in engineer_shifts]
+    special_owners = select_special_owners(np.arange(len(engineer_names)), engineer_names, selected_day, rotation,
+                                           rng=rng, keep_recorded=keep_recorded)
+    owner_names = [engineer_names[code] if code >= 0 else None for code in special_owners]
+
+    shifts = list(dict.fromkeys(engineer_shifts))
+    coverage = shift_coverage(accounts_df, shifts)
+    coverage[~coverage.any(axis=1)] = True
+    regular = ~accounts_df['account'].isin(SPECIAL_TASKS).to_numpy()
+    jobs = []
+    for shift_idx, shift in enumerate(shifts):
+        names = [name for name, engineer_shift in zip(engineer_names, engineer_shifts) if engineer_shift == shift]
+        jobs.append((accounts_df[regular & coverage[:, shift_idx]], names,
+                     [name if name in names else None for name in owner_names],
+                     weighted, randomize, balance_budget, load_offsets, engineer_skills, previous_owners))
+
+    if len(jobs) > 1 and len(accounts_df) >= PARALLEL_MIN_ACCOUNTS and max_workers != 1:
+        from concurrent.futures import ProcessPoolExecutor  # importarlo cuesta; solo hace falta con muchas cuentas
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(_plan_partition, jobs))
+    else:
+        frames = [_plan_partition(job) for job in jobs]
+
+    balances = [frame.attrs['balance'] for frame in frames if 'balance' in frame.attrs]
+    reports = [frame.attrs['constraints'] for frame in frames if 'constraints' in frame.attrs]
+    for shift, frame in zip(shifts, frames):
+        frame.insert(0, 'Turno', shift)
+    assignments_df = pd.concat([frame for frame in frames if not frame.empty], ignore_index=True)
+    if balances:
+        assignments_df.attrs['balance'] = {
+            'gap_before': max(b['gap_before'] for b in balances),
+            'gap_after': max(b['gap_after'] for b in balances),
+            'moves': sum(b['moves'] for b in balances),
+        }
+    if reports:
+        assignments_df.attrs['constraints'] = {
+            'unmet_skills': list(dict.fromkeys(name for r in reports for name in r['unmet_skills'])),
+            'sticky_total': sum(r['sticky_total'] for r in reports),
+            'sticky_kept': sum(r['sticky_kept'] for r in reports),
+        }
+    return assignments_df
+
+# =========================
+# MODO CON SEMILLA (MEJOR DE N)
+# =========================
+def plan_score(assignment, intensity, candidates, engineer_names, rotation):
+    """Puntaje de un plan, menor es mejor: (brecha de carga, dispersión de tareas especiales, repeticiones)
+
+    La dispersión es la diferencia de tareas especiales en la ventana entre los
+    candidatos; las repeticiones, las veces que un ingeniero repite una tarea.
+    """
+    gap = load_gap(engineer_loads(assignment, intensity, candidates).tolist())
+    special_counts = [rotation.task_counts[engineer_names[code]] for code in candidates]
+    repeats = sum(count - 1 for count in rotation.seen.values() if count > 1)
+    return gap, max(special_counts, default=0) - min(special_counts, default=0), repeats
+
+def _seeded_candidate(job):
+    """Plan completo de una semilla sobre una copia de la rotación; devuelve (puntaje, semilla, asignación, balance)"""
+    (intensity, special_index, engineer_names, selected_day, rotation, weighted, balance_budget, offsets, constraints,
+     seed) = job
+    candidates = np.arange(len(engineer_names))
+    owners = select_special_owners(candidates, engineer_names, selected_day, rotation, rng=random.Random(seed))
+    order = seeded_order(intensity, regular_mask(len(intensity), special_index), weighted, seed)
+    assignment = plan_day(intensity, special_index, owners, candidates, order=order, offsets=offsets,
+                          constraints=constraints)
+    balance = None
+    if balance_budget:
+        regular = regular_mask(len(intensity), special_index)
+        assignment, balance = improve_balance(assignment, intensity, candidates, regular, balance_budget, offsets,
+                                              constraints)
+    return plan_score(assignment, intensity, candidates, engineer_names, rotation), seed, assignment, balance
+
+def distribute_best_of(accounts_df, engineers_list, selected_day, rotation, n_candidates=DEFAULT_CANDIDATES,
+                       seed=None, weighted=True, balance_budget=None, max_workers=None, load_offsets=None,
+                       engineer_skills=None, previous_owners=None):
+    """Genera n_candidates planes con semillas seed, seed+1, ... y se queda con el de mejor plan_score
+
+    Cada semilla fija el orden de reparto (desempates de intensidad, o todo el
+    orden sin weighted) y los desempates de la rotación, así que
+    distribute_best_of(..., n_candidates=1, seed=semilla_ganadora) reproduce el
+    plan (salvo el ajuste de balance, que depende del tiempo disponible). Sin
+    seed se sortea una. Con suficientes cuentas los candidatos se evalúan en
+    procesos separados.
+    Devuelve assignments_df con attrs['seed'] y attrs['candidates'] ({semilla: puntaje}).
+    """
+    if not engineers_list or accounts_df.empty:
+        return pd.DataFrame()
+
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 31)
+    engineer_names = list(engineers_list)
+    account_names, intensity, special_index = encode_accounts(accounts_df)
+    offsets = _offsets_for(engineer_names, load_offsets)
+    constraints = encode_constraints(accounts_df, account_names, engineer_names, engineer_skills, previous_owners)
+    jobs = [
+        (intensity, special_index, engineer_names, selected_day, copy.deepcopy(rotation), weighted, balance_budget,
+         offsets, constraints, seed + offset)
+        for offset in range(max(1, n_candidates))
+    ]
+
+    if len(jobs) > 1 and len(intensity) >= PARALLEL_MIN_ACCOUNTS and max_workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_seeded_candidate, jobs))
+    else:
+        results = [_seeded_candidate(job) for job in jobs]
+
+    score, best_seed, assignment, balance = min(results, key=lambda result: (result[0], result[1]))
+
+    # Registrar en la rotación real lo mismo que eligió el candidato ganador
+    candidates = np.arange(len(engineer_names))
+    select_special_owners(candidates, engineer_names, selected_day, rotation, rng=random.Random(best_seed))
+
+    order = seeded_order(intensity, regular_mask(len(intensity), special_index), weighted, best_seed)
+    assignments_df = assignments_frame(engineer_names, account_names, intensity, assignment, special_index, order)
+    if balance is not None:
+        assignments_df.attrs['balance'] = balance
+    if constraints is not None:
+        assignments_df.attrs['constraints'] = constraints_report(constraints, account_names, assignment, candidates)
+    assignments_df.attrs['seed'] = best_seed
+    assignments_df.attrs['score'] = score
+    assignments_df.attrs['candidates'] = {result[1]: result[0] for result in results}
+    return assignments_df
+
+def plan_week(accounts_df, engineer_names, availability, weighted=True, randomize=False, balance_budget=None,
+              rotation=None, engineer_shifts=None, load_offsets=None, engineer_skills=None, previous_owners=None,
+              seed=DEFAULT_SEED, max_workers=None, keep_recorded=False):
+    """Planifica los siete días en una sola pasada, arrastrando la rotación de tareas especiales
+
+    availability es la matriz ingenieros × días de encode_availability (filas
+    alineadas con engineer_names). Con engineer_shifts cada día se reparte por
+    turno (distribute_by_shift); engineer_skills se aplica a todos los días y
+    load_offsets también, salvo que sea un RollingLoads, que suma a la ventana
+    los días ya planificados. previous_owners es el dueño de cada cuenta el día anterior
+    al lunes; los días siguientes arrastran la continuidad del día previo. Los
+    empates y reinicios de la rotación salen de un generador por día derivado
+    de seed (day_rng), así que dos llamadas con los mismos datos dan el mismo
+    plan. max_workers va a distribute_by_shift (1 = sin procesos, p. ej. si ya
+    se corre dentro de un pool). rotation puede traer la rotación guardada de
+    la semana; con keep_recorded los días que ya tienen responsables los
+    conservan (ver select_special_owners).
+    Devuelve ({día: assignments_df}, rotation).
+    """
+    rotation = rotation if rotation is not None else RotationIndex()
+    plans = {}
+    for day in DAYS_OF_WEEK:
+        plans[day] = plan_week_day(accounts_df, engineer_names, availability, day, rotation, weighted, randomize,
+                                   balance_budget, engineer_shifts, day_offsets(load_offsets, day, plans),
+                                   engineer_skills, previous_owners, seed, max_workers, keep_recorded)
+        if not plans[day].empty:
+            previous_owners = plan_owners(plans[day])
+    return plans, rotation
+
+def plan_week_day(accounts_df, engineer_names, availability, day, rotation, weighted=True, randomize=False,
+                  balance_budget=None, engineer_shifts=None, load_offsets=None, engineer_skills=None,
+                  previous_owners=None, seed=DEFAULT_SEED, max_workers=None, keep_recorded=False):
+    """Un día de plan_week: reparte entre los disponibles de la columna del día y lo registra en rotation"""
+    rng = day_rng(seed, day)
+    available = availability[:, DAYS_OF_WEEK.index(day)]
+    names = np.asarray(engineer_names, dtype=object)[available].tolist()
+    if engineer_shifts is not None:
+        shifts = np.asarray(engineer_shifts, dtype=object)[available].tolist()
+        return distribute_by_shift(
+            accounts_df, names, shifts, day, rotation, weighted, randomize, balance_budget, max_workers=max_workers,
+            load_offsets=load_offsets, engineer_skills=engineer_skills, previous_owners=previous_owners, rng=rng,
+            keep_recorded=keep_recorded
+        )
+    return distribute_with_special_tasks(
+        accounts_df, names, day, rotation, weighted, randomize, balance_budget, load_offsets,
+        engineer_skills, previous_owners, rng, keep_recorded
+    )
+
+def day_rng(seed, day):
+    """Generador propio de cada día: replanificar un día no cambia los números que usan los demás"""
+    return random.Random(f"{seed}/{day}")
+
+def plan_owners(assignments_df):
+    """{cuenta: ingeniero} de las cuentas regulares de un plan (el previous_owners del día siguiente)"""
+    return {
+        account: engineer
+        for engineer, accounts in zip(assignments_df['Ingeniero'], assignments_df['Lista Cuentas'])
+        for account in accounts if not account.startswith('**')
+    }
+
+def assignment_accounts(assignments_df, accounts_df):
+    """Vista normalizada ingeniero → cuenta de assignments_df (una fila por cuenta asignada)
+
+    Conserva el orden de 'Lista Cuentas' y la columna 'Turno' si existe.
+    """
+    keys = [col for col in ('Turno', 'Ingeniero') if col in assignments_df.columns]
+    if assignments_df.empty:
+        return pd.DataFrame(columns=keys + ['Cuenta', 'Especial', 'Intensidad'])
+
+    account_lists = assignments_df['Lista Cuentas'].tolist()
+    lengths = [len(accounts) for accounts in account_lists]
+    long_df = pd.DataFrame({key: np.repeat(assignments_df[key].to_numpy(), lengths) for key in keys})
+
+    names, special = [], []
+    for accounts in account_lists:
+        for account in accounts:
+            is_special = account.startswith('**')
+            names.append(account.replace('**', '') if is_special else account)
+            special.append(is_special)
+
+    # Solo las cuentas presentes: con una página del plan no se recorre todo accounts_df
+    listed = accounts_df[accounts_df['account'].isin(names)]
+    intensity_by_account = dict(zip(listed['account'].tolist(), listed['intensity'].tolist()))
+    long_df['Cuenta'] = names
+    long_df['Especial'] = np.array(special, dtype=bool)
+    long_df['Intensidad'] = np.array([
+        SPECIAL_TASK_INTENSITY if is_special else int(intensity_by_account.get(name, 0))
+        for name, is_special in zip(names, special)
+    ], dtype=np.int64)
+    return long_df
+
+def plan_long_frame(plans, accounts_df):
+    """Plan en formato largo (una fila por día, ingeniero y cuenta) a partir de {día: assignments_df}
+
+    Incluye la columna 'Turno' si algún día se repartió por turno.
+    """
+    by_shift = any('Turno' in assignments_df.columns for assignments_df in plans.values())
+    columns = ['Día'] + (['Turno'] if by_shift else []) + ['Ingeniero', 'Cuenta', 'Especial', 'Intensidad']
+    frames = []
+    for day, assignments_df in plans.items():
+        if assignments_df.empty:
+            continue
+        day_df = assignment_accounts(assignments_df, accounts_df)
+        day_df.insert(0, 'Día', day)
+        frames.append(day_df.reindex(columns=columns))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+def input_fingerprint(*frames, **params):
+    """Huella estable de los DataFrames de entrada y los parámetros, para usar como clave de caché"""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(repr(list(frame.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update(repr(sorted(params.items())).encode("utf-8"))
+    return digest.hexdigest()
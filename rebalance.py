@@ -0,0 +1,166 @@
+from collections import defaultdict
+
+from planner import SPECIAL_TASK_INTENSITY, best_transfer, load_gap
+
+# =========================
+# REBALANCEO INCREMENTAL
+# =========================
+class IncrementalBalancer:
+    """Plan vivo que absorbe cambios puntuales moviendo el mínimo de cuentas
+
+    Cada cambio (intensidad de una cuenta, cuenta nueva o retirada, ingeniero
+    que sale o entra) actualiza solo las cargas afectadas. Después se
+    transfieren cuentas entre el ingeniero más y el menos cargado hasta que la
+    brecha max-min vuelve a la que había antes del cambio, así que el trabajo
+    crece con el tamaño del cambio y no con el total de cuentas.
+    Las tareas especiales (pinned) solo se mueven si su responsable sale.
+    """
+
+    def __init__(self, owners, intensities, pinned=(), engineers=()):
+        """owners: {cuenta: ingeniero}; intensities: {cuenta: intensidad}"""
+        self.owner = {}
+        self.intensity = dict(intensities)
+        self.pinned = set(pinned)
+        self.loads = {}
+        # Diccionarios como conjuntos ordenados: los movimientos son reproducibles
+        self.assigned = {}  # ingeniero -> {cuenta: None}
+        self.buckets = {}   # ingeniero -> {intensidad: {cuenta movible: None}}
+        for engineer in list(engineers) + list(owners.values()):
+            self._add_engineer_slot(engineer)
+        for account, engineer in owners.items():
+            self._attach(account, engineer)
+
+    @classmethod
+    def from_plan(cls, assignments_df, accounts_df):
+        """Construye el plan vivo a partir de la tabla de asignaciones y de accounts_df
+
+        No admite planes por turno (con columna 'Turno'): una cuenta puede tener
+        un responsable en cada turno y las transferencias no deben cruzar turnos.
+        """
+        if 'Turno' in assignments_df.columns:
+            raise ValueError("El rebalanceo incremental no admite planes por turno")
+        intensity_by_account = dict(zip(accounts_df['account'], accounts_df['intensity']))
+        owners, intensities, pinned = {}, {}, []
+        for engineer, accounts in zip(assignments_df['Ingeniero'], assignments_df['Lista Cuentas']):
+            for account in accounts:
+                if account.startswith('**'):
+                    account = account.replace('**', '')
+                    pinned.append(account)
+                    intensities[account] = SPECIAL_TASK_INTENSITY
+                else:
+                    intensities[account] = int(intensity_by_account[account])
+                owners[account] = engineer
+        return cls(owners, intensities, pinned, engineers=assignments_df['Ingeniero'].tolist())
+
+    # ---- Cambios ----
+    def set_intensity(self, account, intensity):
+        """Cambio de intensidad de una cuenta (p. ej. un spike); devuelve las cuentas movidas"""
+        def change(moves):
+            engineer = self.owner[account]
+            self._detach(account)
+            self.intensity[account] = int(intensity)
+            self._attach(account, engineer)
+        return self._apply(change)
+
+    def add_account(self, account, intensity):
+        """Cuenta nueva: va al ingeniero menos cargado"""
+        def change(moves):
+            self.intensity[account] = int(intensity)
+            engineer = self._least_loaded()
+            self._attach(account, engineer)
+            moves.append({'Cuenta': account, 'Desde': None, 'Hacia': engineer, 'Motivo': 'cuenta nueva'})
+        return self._apply(change)
+
+    def remove_account(self, account):
+        """Cuenta retirada o inactiva"""
+        def change(moves):
+            self._detach(account)
+            del self.intensity[account]
+            self.pinned.discard(account)
+        return self._apply(change)
+
+    def remove_engineer(self, engineer):
+        """Ingeniero que deja el turno: sus cuentas pasan a los menos cargados"""
+        def change(moves):
+            accounts = sorted(self.assigned[engineer], key=lambda a: (a not in self.pinned, -self.intensity[a]))
+            for account in accounts:
+                self._detach(account)
+            del self.loads[engineer], self.assigned[engineer], self.buckets[engineer]
+
+            for account in accounts:
+                target = self._least_loaded(exclude_pinned=account in self.pinned)
+                self._attach(account, target)
+                moves.append({'Cuenta': account, 'Desde': engineer, 'Hacia': target, 'Motivo': 'ingeniero sale'})
+        return self._apply(change)
+
+    def add_engineer(self, engineer):
+        """Ingeniero que se suma al turno, sin cuentas"""
+        return self._apply(lambda moves: self._add_engineer_slot(engineer))
+
+    # ---- Consultas ----
+    def gap(self):
+        return load_gap(list(self.loads.values()))
+
+    def accounts_of(self, engineer):
+        return list(self.assigned.get(engineer, {}))
+
+    # ---- Internos ----
+    def _apply(self, change):
+        """Aplica un cambio y reequilibra; devuelve la lista de cuentas movidas"""
+        tolerance = self.gap()
+        moves = []
+        change(moves)
+        self._restore(tolerance, moves)
+        return moves
+
+    def _restore(self, tolerance, moves):
+        while len(self.loads) > 1:
+            hi = max(self.loads, key=self.loads.__getitem__)
+            lo = min(self.loads, key=self.loads.__getitem__)
+            gap = self.loads[hi] - self.loads[lo]
+            if gap <= tolerance:
+                break
+            transfer = best_transfer(self.buckets[hi], self.buckets[lo], gap)
+            if transfer is None:
+                break
+            out_weight, in_weight = transfer
+            for src, dst, weight in [(hi, lo, out_weight), (lo, hi, in_weight)]:
+                if weight is None:
+                    continue
+                account = next(iter(self.buckets[src][weight]))
+                self._detach(account)
+                self._attach(account, dst)
+                moves.append({'Cuenta': account, 'Desde': src, 'Hacia': dst, 'Motivo': 'rebalanceo'})
+
+    def _add_engineer_slot(self, engineer):
+        self.loads.setdefault(engineer, 0)
+        self.assigned.setdefault(engineer, {})
+        self.buckets.setdefault(engineer, defaultdict(dict))
+
+    def _least_loaded(self, exclude_pinned=False):
+        engineers = self.loads
+        if exclude_pinned:
+            # Una tarea especial por ingeniero mientras sea posible
+            taken = {self.owner[account] for account in self.pinned if account in self.owner}
+            free = [e for e in self.loads if e not in taken]
+            engineers = free or engineers
+        return min(engineers, key=self.loads.__getitem__)
+
+    def _attach(self, account, engineer):
+        weight = self.intensity[account]
+        self.owner[account] = engineer
+        self.loads[engineer] += weight
+        self.assigned[engineer][account] = None
+        if account not in self.pinned:
+            self.buckets[engineer][weight][account] = None
+
+    def _detach(self, account):
+        engineer = self.owner.pop(account)
+        weight = self.intensity[account]
+        self.loads[engineer] -= weight
+        del self.assigned[engineer][account]
+        bucket = self.buckets[engineer].get(weight)
+        if bucket is not None:
+            bucket.pop(account, None)
+            if not bucket:
+                del self.buckets[engineer][weight]
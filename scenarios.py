@@ -0,0 +1,351 @@
+"""Escenarios what-if sobre el plan de la semana (vacaciones, cambios de intensidad), sin dependencia de Streamlit.
+
+Un escenario es un diff contra los CSV base: disponibilidad por (ingeniero,
+día) e intensidad por cuenta. WeekBaseline planifica la semana base una vez y
+guarda el estado de la rotación y la continuidad al empezar cada día; un
+escenario se replanifica desde su primer día afectado y reutiliza los días
+base en cuanto su estado vuelve a coincidir con el de la base. Los datos base
+no se copian: la disponibilidad del escenario es una matriz ingenieros × días
+nueva y sus cuentas comparten todas las columnas con las base salvo intensity.
+"""
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+
+from planner import (DAYS_OF_WEEK, DEFAULT_SEED, PARALLEL_MIN_ACCOUNTS, RotationIndex, SPECIAL_TASKS, day_offsets,
+                     load_gap, plan_owners, plan_week_day)
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+CHANGE_TYPES = {'availability': "Disponibilidad", 'intensity': "Intensidad"}
+CHANGE_COLUMNS = ['Escenario', 'Tipo', 'Objetivo', 'Día', 'Valor']
+ALL_DAYS = "all"
+YES_VALUES = {'yes', 'sí', 'si', '1', 'true'}
+NO_VALUES = {'no', '0', 'false'}
+BASELINE_NAME = "Base"
+RESERVED_NAMES = (BASELINE_NAME, 'Día', 'Tarea', 'Ingeniero')  # Columnas fijas de las tablas de compare_scenarios
+
+# =========================
+# ESCENARIOS
+# =========================
+class Scenario:
+    """Diff de un escenario contra los datos base
+
+    availability: {(ingeniero, día): disponible}; intensity: {cuenta: intensidad}.
+    """
+
+    def __init__(self, name, availability=None, intensity=None):
+        self.name = name
+        self.availability = dict(availability or {})
+        self.intensity = dict(intensity or {})
+
+    def key(self):
+        """Clave hashable del contenido (sin el nombre): dos escenarios iguales comparten resultado"""
+        return tuple(sorted(self.availability.items())), tuple(sorted(self.intensity.items()))
+
+    def apply_availability(self, engineer_names, availability):
+        """Matriz de disponibilidad del escenario (la base si no cambia nada)"""
+        if not self.availability:
+            return availability
+        rows = {name: idx for idx, name in enumerate(engineer_names)}
+        scenario = availability.copy()
+        for (engineer, day), available in self.availability.items():
+            scenario[rows[engineer], DAYS_OF_WEEK.index(day)] = available
+        return scenario
+
+    def apply_intensity(self, accounts_df):
+        """Cuentas del escenario: comparten las columnas base salvo intensity (la base si no cambia nada)"""
+        if not self.intensity:
+            return accounts_df
+        intensity = accounts_df['intensity'].to_numpy().copy()
+        positions = pd.Index(accounts_df['account']).get_indexer(list(self.intensity))
+        intensity[positions] = list(self.intensity.values())
+        scenario = accounts_df.copy(deep=False)
+        scenario['intensity'] = intensity
+        return scenario
+
+def _parse_availability(value):
+    value = value.lower()
+    if value in YES_VALUES:
+        return True
+    if value in NO_VALUES:
+        return False
+    raise ValueError(f"disponibilidad '{value}' (usar sí/no)")
+
+def scenarios_from_changes(changes_df, engineer_names, account_names):
+    """Escenarios a partir de la tabla de cambios (columnas CHANGE_COLUMNS, una fila por cambio)
+
+    Tipo es una clave de CHANGE_TYPES; Día, una clave de DAYS_OF_WEEK o ALL_DAYS
+    (vacío también es toda la semana; la intensidad siempre aplica a toda la
+    semana). Una fila sin nombre de escenario se suma al de la fila anterior.
+    Devuelve (escenarios con algún cambio, en orden de aparición; errores por fila).
+    """
+    engineers, accounts = set(engineer_names), set(account_names)
+    scenarios, errors = {}, []
+    name = None
+    rows = changes_df.reindex(columns=CHANGE_COLUMNS).astype(object)
+    for row_number, row in enumerate(rows.where(rows.notna(), None).itertuples(index=False, name=None), start=1):
+        row_name, kind, target, day, value = (str(cell).strip() if cell is not None else "" for cell in row)
+        if not kind and not target:
+            continue  # fila vacía del editor
+        name = row_name or name or "Escenario 1"
+        if name in RESERVED_NAMES:
+            name = f"{name} (escenario)"
+        scenario = scenarios.setdefault(name, Scenario(name))
+        try:
+            if kind == 'availability':
+                if target not in engineers:
+                    raise ValueError(f"ingeniero desconocido '{target}'")
+                if day not in ("", ALL_DAYS, *DAYS_OF_WEEK):
+                    raise ValueError(f"día desconocido '{day}'")
+                available = _parse_availability(value)
+                for day_key in (DAYS_OF_WEEK if day in ("", ALL_DAYS) else [day]):
+                    scenario.availability[(target, day_key)] = available
+            elif kind == 'intensity':
+                if target not in accounts or target in SPECIAL_TASKS:
+                    raise ValueError(f"cuenta desconocida '{target}'")
+                intensity = int(float(value))
+                if intensity < 0:
+                    raise ValueError("la intensidad no puede ser negativa")
+                scenario.intensity[target] = intensity
+            else:
+                raise ValueError(f"tipo de cambio desconocido '{kind}'")
+        except ValueError as e:
+            errors.append(f"Fila {row_number} ({name}): {e}")
+    return [scenario for scenario in scenarios.values() if scenario.availability or scenario.intensity], errors
+
+# =========================
+# SEMANA BASE
+# =========================
+class WeekBaseline:
+    """Plan base de la semana con el estado de entrada de cada día
+
+    Se planifica igual que plan_week, con la misma semilla. Antes de cada día
+    guarda una copia de la rotación y el previous_owners vigente, que es lo que
+    un escenario necesita para replanificar desde ese día sin rehacer los
+    anteriores; como cada día usa su propio generador (day_rng), el día
+    replanificado parte del mismo azar que en la base.
+    """
+
+    def __init__(self, accounts_df, engineer_names, availability, weighted=True, randomize=False,
+                 balance_budget=None, rotation=None, engineer_shifts=None, load_offsets=None, engineer_skills=None,
+                 previous_owners=None, seed=DEFAULT_SEED, keep_recorded=False):
+        self.accounts_df = accounts_df
+        self.engineer_names = list(engineer_names)
+        self.availability = availability
+        self.params = {
+            'weighted': weighted, 'randomize': randomize, 'balance_budget': balance_budget,
+            'engineer_shifts': engineer_shifts, 'engineer_skills': engineer_skills,
+            'seed': seed, 'keep_recorded': keep_recorded,
+        }
+        self.load_offsets = load_offsets
+        self.rotation = rotation if rotation is not None else RotationIndex()
+        self.plans = {}
+        self.entry_rotation = {}  # día -> RotationIndex al empezar el día
+        self.entry_owners = {}    # día -> previous_owners al empezar el día
+        self.entry_offsets = {}   # día -> carga de arranque (ver day_offsets)
+        self.day_tasks = {}       # día -> {tarea: ingeniero} elegidos ese día
+        for day in DAYS_OF_WEEK:
+            self.entry_rotation[day] = copy.deepcopy(self.rotation)
+            self.entry_owners[day] = previous_owners
+            self.entry_offsets[day] = day_offsets(load_offsets, day, self.plans)
+            self.plans[day] = self.plan_day(accounts_df, availability, day, self.rotation, previous_owners,
+                                            self.entry_offsets[day])
+            self.day_tasks[day] = dict(self.rotation.assignments.get(day, {}))
+            if not self.plans[day].empty:
+                previous_owners = plan_owners(self.plans[day])
+
+    def plan_day(self, accounts_df, availability, day, rotation, previous_owners, load_offsets, max_workers=None):
+        return plan_week_day(accounts_df, self.engineer_names, availability, day, rotation,
+                             previous_owners=previous_owners, load_offsets=load_offsets, max_workers=max_workers,
+                             **self.params)
+
+    def affected_days(self, scenario):
+        """Días cuyo plan puede cambiar directamente con el escenario (la rotación arrastra el resto)
+
+        Una intensidad distinta de la base afecta todos los días (las cuentas se
+        reparten a diario); una igual a la base no cuenta como cambio.
+        """
+        if scenario.intensity:
+            base = dict(zip(self.accounts_df['account'].tolist(), self.accounts_df['intensity'].tolist()))
+            if any(base.get(account) != intensity for account, intensity in scenario.intensity.items()):
+                return list(DAYS_OF_WEEK)
+        availability = scenario.apply_availability(self.engineer_names, self.availability)
+        changed = (availability != self.availability).any(axis=0)
+        return [day for day, day_changed in zip(DAYS_OF_WEEK, changed) if day_changed]
+
+    def replan(self, scenario, max_workers=None):
+        """Días replanificados del escenario: ({día: assignments_df}, {día: {tarea: ingeniero}})
+
+        Empieza en el primer día afectado con el estado base de ese día. Un día
+        no afectado cuya rotación, continuidad y carga de arranque coinciden con
+        las de la base tiene el mismo plan que la base, así que se reutiliza.
+        max_workers se pasa a plan_week_day (1 dentro de un proceso del pool).
+        """
+        affected = set(self.affected_days(scenario))
+        if not affected:
+            return {}, {}
+        start = min(DAYS_OF_WEEK.index(day) for day in affected)
+        accounts_df = scenario.apply_intensity(self.accounts_df)
+        availability = scenario.apply_availability(self.engineer_names, self.availability)
+        rotation = copy.deepcopy(self.entry_rotation[DAYS_OF_WEEK[start]])
+        previous_owners = self.entry_owners[DAYS_OF_WEEK[start]]
+        plans, special_tasks = {}, {}
+        week_plans = dict(self.plans)  # los días anteriores ya planificados, para day_offsets
+        for day in DAYS_OF_WEEK[start:]:
+            load_offsets = day_offsets(self.load_offsets, day, week_plans)
+            if (day not in affected and previous_owners == self.entry_owners[day]
+                    and load_offsets == self.entry_offsets[day]
+                    and rotation.state_key() == self.entry_rotation[day].state_key()):
+                for task, engineer in self.day_tasks[day].items():
+                    rotation.record(day, task, engineer)
+                if not self.plans[day].empty:
+                    previous_owners = plan_owners(self.plans[day])
+                continue
+            plans[day] = self.plan_day(accounts_df, availability, day, rotation, previous_owners, load_offsets,
+                                       max_workers)
+            week_plans[day] = plans[day]
+            special_tasks[day] = dict(rotation.assignments.get(day, {}))
+            if not plans[day].empty:
+                previous_owners = plan_owners(plans[day])
+        return plans, special_tasks
+
+class ScenarioResult:
+    """Plan de la semana de un escenario: los días replanificados y, el resto, los de la base"""
+
+    def __init__(self, baseline, scenario, replanned, special_tasks, seconds):
+        self.scenario = scenario
+        self.replanned = replanned
+        self.seconds = seconds
+        self.plans = {day: replanned.get(day, baseline.plans[day]) for day in DAYS_OF_WEEK}
+        self.special_tasks = {day: special_tasks.get(day, baseline.day_tasks[day]) for day in DAYS_OF_WEEK}
+
+# =========================
+# EJECUCIÓN (EN PARALELO)
+# =========================
+_worker_baseline = None
+_worker_max_workers = None
+
+def _init_worker(baseline, max_workers=None):
+    # Con fork la base llega por memoria compartida (copy-on-write); con spawn se serializa una vez por proceso
+    global _worker_baseline, _worker_max_workers
+    _worker_baseline = baseline
+    _worker_max_workers = max_workers
+
+def _replan_in_worker(scenario):
+    start = time.perf_counter()
+    replanned, special_tasks = _worker_baseline.replan(scenario, _worker_max_workers)
+    return replanned, special_tasks, time.perf_counter() - start
+
+def run_scenarios(baseline, scenarios, max_workers=None, cache=None, cache_key=None):
+    """ScenarioResult de cada escenario; con suficientes cuentas los escenarios se replanifican en procesos
+
+    Con cache (get/put, p. ej. PlanCache) los resultados se guardan por
+    (cache_key, contenido del escenario): cache_key identifica la base, y un
+    escenario que no cambió no se vuelve a planificar.
+    """
+    outputs = {}
+    pending = {}
+    for scenario in scenarios:
+        key = (cache_key, scenario.key())
+        if key in outputs or key in pending:
+            continue
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            outputs[key] = cached
+        else:
+            pending[key] = scenario
+
+    jobs = list(pending.values())
+    if len(jobs) > 1 and len(baseline.accounts_df) >= PARALLEL_MIN_ACCOUNTS and max_workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        # Cada proceso replanifica sus escenarios en serie: los turnos no abren otro pool
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(baseline, 1)) as pool:
+            computed = list(pool.map(_replan_in_worker, jobs))
+    else:
+        _init_worker(baseline, max_workers)
+        try:
+            computed = [_replan_in_worker(scenario) for scenario in jobs]
+        finally:
+            _init_worker(None)
+    for key, output in zip(pending, computed):
+        outputs[key] = output
+        if cache is not None:
+            cache.put(key, output)
+    return [ScenarioResult(baseline, scenario, *outputs[(cache_key, scenario.key())]) for scenario in scenarios]
+
+# =========================
+# COMPARACIÓN
+# =========================
+def weekly_loads(plans):
+    """Intensidad total de la semana por ingeniero (solo los que trabajaron algún día)"""
+    frames = [df[['Ingeniero', 'Intensidad Total']] for df in plans.values() if not df.empty]
+    if not frames:
+        return pd.Series(dtype='int64')
+    return pd.concat(frames).groupby('Ingeniero', sort=False)['Intensidad Total'].sum()
+
+def load_spread(plans):
+    """Dispersión de carga de la semana: brecha y desvío de los totales por ingeniero, y peor brecha diaria"""
+    loads = weekly_loads(plans)
+    daily_gaps = [load_gap(df['Intensidad Total'].tolist()) for df in plans.values() if not df.empty]
+    return {
+        'Brecha semanal': load_gap(loads.tolist()) if len(loads) else 0,
+        'Desvío': round(float(np.std(loads.to_numpy())), 2) if len(loads) else 0.0,
+        'Peor brecha diaria': max(daily_gaps, default=0),
+    }
+
+def scenario_labels(results):
+    """Nombre de columna de cada resultado: su nombre, con sufijo si choca con RESERVED_NAMES o con otro escenario"""
+    labels, used = [], set(RESERVED_NAMES)
+    for result in results:
+        label = result.scenario.name
+        if label in used:
+            label = f"{result.scenario.name} (escenario)"
+            suffix = 2
+            while label in used:
+                label = f"{result.scenario.name} (escenario {suffix})"
+                suffix += 1
+        used.add(label)
+        labels.append(label)
+    return labels
+
+def compare_scenarios(baseline, results):
+    """Tablas para comparar los escenarios con la base
+
+    Devuelve (resumen por escenario, intensidad semanal por ingeniero,
+    rotación de tareas especiales por día) con una columna por escenario,
+    titulada según scenario_labels.
+    """
+    labels = scenario_labels(results)
+    base_spread = load_spread(baseline.plans)
+    base_tasks = baseline.day_tasks
+    summary = [{'Escenario': BASELINE_NAME, 'Días replanificados': 0, **base_spread, 'Δ brecha semanal': 0,
+                'Tareas especiales cambiadas': 0, 'Tiempo (ms)': 0.0}]
+    loads = {BASELINE_NAME: weekly_loads(baseline.plans)}
+    for label, result in zip(labels, results):
+        spread = load_spread(result.plans)
+        changed_tasks = sum(
+            result.special_tasks[day].get(task) != base_tasks[day].get(task)
+            for day in DAYS_OF_WEEK for task in SPECIAL_TASKS
+        )
+        summary.append({
+            'Escenario': label, 'Días replanificados': len(result.replanned), **spread,
+            'Δ brecha semanal': spread['Brecha semanal'] - base_spread['Brecha semanal'],
+            'Tareas especiales cambiadas': changed_tasks, 'Tiempo (ms)': round(result.seconds * 1000, 1),
+        })
+        loads[label] = weekly_loads(result.plans)
+
+    loads_df = pd.DataFrame(loads).reindex(baseline.engineer_names).dropna(how='all').fillna(0).astype('int64')
+    loads_df.index.name = 'Ingeniero'
+
+    rotation_rows = []
+    for day in DAYS_OF_WEEK:
+        for task in SPECIAL_TASKS:
+            row = {'Día': day, 'Tarea': task, BASELINE_NAME: base_tasks[day].get(task)}
+            for label, result in zip(labels, results):
+                row[label] = result.special_tasks[day].get(task)
+            rotation_rows.append(row)
+    return pd.DataFrame(summary), loads_df.reset_index(), pd.DataFrame(rotation_rows)
@@ -0,0 +1,376 @@
+"""Servicio HTTP local de planificación: responsable de cada cuenta para otras herramientas (bot de guardias, ruteo de tickets).
+
+Uso: python service.py [DIRECTORIO] [--host 127.0.0.1] [--port 8502] [--workers 16] [--db history.db]
+
+DIRECTORIO tiene engineers.csv, availability.csv y accounts.csv (por defecto,
+el directorio actual). Endpoints, todos con respuesta JSON:
+
+    GET  /health
+    GET  /owner?account=ITAU[&day=monday]   responsable de la cuenta (día por defecto: hoy)
+    GET  /plan[?day=monday]                 plan del día en formato largo
+    POST /plan[?day=monday]                 planifica (o vuelve a planificar) el día y lo guarda en el historial
+    GET  /export?format=csv[&day=monday]    plan en formato largo como archivo (csv, parquet o xlsx);
+                                            con week=1, los días ya guardados de la semana
+
+El plan de un día es el mismo que muestra la app y se lee del historial
+compartido. Los GET no escriben: si el día todavía no se planificó responden
+404 y el plan se crea con POST /plan (o desde la app). Cada día se mantiene en memoria con un
+índice cuenta → ingeniero; las consultas no tocan disco salvo para comprobar,
+como mucho cada pocos segundos, si alguien guardó una versión nueva del día.
+/export se envía por bloques (sin Content-Length: la conexión se cierra al
+terminar) y guarda los bytes por versión del plan.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from data import (ACCOUNTS_CSV, AVAILABILITY_CSV, ENGINEERS_CSV, file_signature, load_accounts, load_availability,
+                  load_engineers)
+from export import (EXPORT_FORMATS, ExportCache, available_formats, file_name, rows_fingerprint,
+                    rows_long_frame)
+from history_store import DEFAULT_DB_PATH, HistoryConflictError, HistoryStore, assignment_rows, current_week
+from planner import DAYS_OF_WEEK, active_accounts, distribute_with_special_tasks, encode_availability
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+DEFAULT_WORKERS = 16
+REFRESH_S = 2.0  # Cada cuánto se comprueba si el historial tiene una versión nueva del día
+SAVE_RETRIES = 3
+
+def today():
+    return DAYS_OF_WEEK[date.today().weekday()]
+
+# =========================
+# PLANES EN MEMORIA
+# =========================
+class DayPlan:
+    """Plan guardado de un día con su índice cuenta → (ingeniero, cuenta, especial)"""
+
+    def __init__(self, week, day, version, rows):
+        self.week = week
+        self.day = day
+        self.version = version
+        self.rows = rows
+        self.owners = {account.casefold(): (engineer, account, bool(special)) for engineer, account, special in rows}
+        self.checked_at = time.monotonic()
+
+    def to_json(self):
+        return {
+            'week': self.week,
+            'day': self.day,
+            'version': self.version,
+            'assignments': [
+                {'engineer': engineer, 'account': account, 'special': bool(special)}
+                for engineer, account, special in self.rows
+            ],
+        }
+
+class PlanService:
+    """Planes diarios del equipo en memoria, sincronizados con el historial compartido
+
+    Es seguro llamarlo desde varios hilos: las consultas leen el DayPlan
+    vigente sin bloqueo y solo la (re)carga de un día toma el lock.
+    """
+
+    def __init__(self, team_dir=".", history_path=DEFAULT_DB_PATH, refresh_s=REFRESH_S):
+        self.team_dir = team_dir
+        self.refresh_s = refresh_s
+        self.history_store = HistoryStore(history_path)
+        self._plans = {}  # (semana, día) -> DayPlan
+        self._inputs = None
+        self._lock = threading.Lock()
+        self.export_cache = ExportCache()
+
+    # ---- Datos de entrada ----
+    def _paths(self):
+        return [os.path.join(self.team_dir, name) for name in (ENGINEERS_CSV, AVAILABILITY_CSV, ACCOUNTS_CSV)]
+
+    def _load_inputs(self):
+        """(ingenieros, matriz de disponibilidad, cuentas); se releen solo si cambió algún CSV"""
+        paths = self._paths()
+        signatures = tuple(file_signature(path) for path in paths)
+        if self._inputs is None or self._inputs[0] != signatures:
+            engineers_df = load_engineers(paths[0])
+            availability_df = load_availability(paths[1])
+            accounts_df = active_accounts(load_accounts(paths[2]))
+            self._inputs = (signatures, engineers_df, encode_availability(engineers_df, availability_df), accounts_df)
+        return self._inputs[1:]
+
+    # ---- Planes ----
+    def day_plan(self, day=None):
+        """DayPlan vigente del día de la semana actual (hoy por defecto), o None si no tiene plan guardado"""
+        day = day or today()
+        key = (current_week(), day)
+        plan = self._plans.get(key)
+        if plan is not None and time.monotonic() - plan.checked_at < self.refresh_s:
+            return plan
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None and time.monotonic() - plan.checked_at < self.refresh_s:
+                return plan  # otro hilo lo recargó mientras esperábamos
+            _, versions = self.history_store.load_rotation(key[0])
+            version = versions.get(day, 0)
+            if plan is not None and plan.version == version:
+                plan.checked_at = time.monotonic()
+                return plan
+            if not version:
+                self._plans.pop(key, None)
+                return None
+            plan = DayPlan(*key, version, self.history_store.day_assignments(*key))
+            self._plans[key] = plan
+            return plan
+
+    def replan(self, day=None, weighted=True, randomize=False):
+        """Vuelve a planificar el día (como un rerun de la app) y guarda el resultado"""
+        key = (current_week(), day or today())
+        with self._lock:
+            plan = self._plan_and_save(*key, weighted=weighted, randomize=randomize)
+            self._plans[key] = plan
+            return plan
+
+    def _plan_and_save(self, week, day, weighted=True, randomize=False):
+        engineers_df, availability_matrix, accounts_df = self._load_inputs()
+        available_names = engineers_df.loc[availability_matrix[:, DAYS_OF_WEEK.index(day)], 'engineer_name'].tolist()
+        engineer_skills = dict(zip(engineers_df['engineer_name'], engineers_df['skills']))
+        for _ in range(SAVE_RETRIES):
+            rotation, versions = self.history_store.load_rotation(week)
+            rows = []
+            if available_names:
+                assignments_df = distribute_with_special_tasks(
+                    accounts_df, available_names, day, rotation, weighted=weighted, randomize=randomize,
+                    engineer_skills=engineer_skills, previous_owners=self.history_store.previous_owners(week, day)
+                )
+                rows = assignment_rows(assignments_df)
+            try:
+                version = self.history_store.save_day(week, day, rotation.assignments.get(day, {}), rows,
+                                                      expected_version=versions.get(day, 0))
+            except HistoryConflictError:
+                continue  # otro proceso guardó el día: se replanifica con su rotación
+            return DayPlan(week, day, version, rows)
+        raise HistoryConflictError(f"{week}/{day}: no se pudo guardar tras {SAVE_RETRIES} intentos")
+
+    def owner(self, account, day=None):
+        """(ingeniero, cuenta, especial) responsable de account, o None; O(1) sobre el plan en memoria"""
+        plan = self.day_plan(day)
+        return plan.owners.get(account.strip().casefold()) if plan is not None else None
+
+    def week_plans(self):
+        """DayPlan de los días de la semana actual que ya tienen un plan guardado"""
+        _, versions = self.history_store.load_rotation(current_week())
+        return [self.day_plan(day) for day in DAYS_OF_WEEK if versions.get(day)]
+
+    def export_chunks(self, plans, fmt):
+        """Bytes del archivo con los planes dados, bloque a bloque (de la caché si ya se generó)"""
+        _, _, accounts_df = self._load_inputs()
+        rows_by_day = {plan.day: plan.rows for plan in plans}
+        # Las filas de cada día y las firmas de los CSV (intensidades) identifican el archivo
+        key = self.export_cache.key((rows_fingerprint(rows_by_day), self._inputs[0]), plans[0].week, fmt)
+        return self.export_cache.chunks(key, lambda: rows_long_frame(rows_by_day, accounts_df), fmt)
+
+    def warm_up(self):
+        """Carga en memoria los días ya guardados de la semana"""
+        _, versions = self.history_store.load_rotation(current_week())
+        for day in DAYS_OF_WEEK:
+            if versions.get(day):
+                self.day_plan(day)
+
+# =========================
+# HTTP
+# =========================
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer que atiende cada conexión en un pool de hilos de tamaño fijo
+
+    A diferencia de ThreadingHTTPServer no crea un hilo por conexión: con
+    mucha concurrencia las conexiones esperan en la cola del pool.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, handler, service, workers=DEFAULT_WORKERS, verbose=False):
+        super().__init__(address, handler)
+        self.service = service
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plan-http")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+class FileResponse:
+    """Respuesta que se envía por bloques en lugar de JSON"""
+
+    def __init__(self, chunks, mime, file_name):
+        self.chunks = iter(chunks)
+        self.mime = mime
+        self.file_name = file_name
+        self.first = None
+
+    def start(self):
+        """Genera el primer bloque: un error al armar el archivo todavía puede responderse como JSON"""
+        self.first = next(self.chunks, b"")
+
+class PlanRequestHandler(BaseHTTPRequestHandler):
+    server_version = "IncidentLoadBalancer/1.0"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        route = {
+            ("GET", "/health"): self._health,
+            ("GET", "/owner"): self._owner,
+            ("GET", "/plan"): self._plan,
+            ("POST", "/plan"): self._replan,
+            ("GET", "/export"): self._export,
+        }.get((method, url.path.rstrip("/") or "/"))
+        if route is None:
+            self._send_json(404, {'error': f"Ruta desconocida: {method} {url.path}"})
+            return
+        day = params.get('day', '').lower().strip() or None
+        if day is not None and day not in DAYS_OF_WEEK:
+            self._send_json(400, {'error': f"Día inválido: {day}"})
+            return
+        try:
+            status, payload = route(params, day)
+            if isinstance(payload, FileResponse):
+                payload.start()
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        if isinstance(payload, FileResponse):
+            self._send_file(status, payload)
+        else:
+            self._send_json(status, payload)
+
+    # ---- Rutas ----
+    def _health(self, params, day):
+        return 200, {'status': 'ok', 'week': current_week(), 'today': today()}
+
+    @staticmethod
+    def _no_plan(day):
+        day = day or today()
+        return 404, {'error': f"El día {day} no tiene plan: crearlo con POST /plan?day={day}",
+                     'week': current_week(), 'day': day}
+
+    def _owner(self, params, day):
+        account = params.get('account', '').strip()
+        if not account:
+            return 400, {'error': "Falta el parámetro account"}
+        plan = self.server.service.day_plan(day)
+        if plan is None:
+            return self._no_plan(day)
+        owner = plan.owners.get(account.casefold())
+        if owner is None:
+            return 404, {'error': f"Sin responsable para {account}", 'week': plan.week, 'day': plan.day}
+        engineer, account, special = owner
+        return 200, {'account': account, 'engineer': engineer, 'special': special,
+                     'week': plan.week, 'day': plan.day, 'version': plan.version}
+
+    def _plan(self, params, day):
+        plan = self.server.service.day_plan(day)
+        if plan is None:
+            return self._no_plan(day)
+        return 200, plan.to_json()
+
+    def _replan(self, params, day):
+        weighted = params.get('weighted', 'true').lower() not in ('0', 'false', 'no')
+        randomize = params.get('randomize', 'false').lower() in ('1', 'true', 'yes')
+        return 200, self.server.service.replan(day, weighted=weighted, randomize=randomize).to_json()
+
+    def _export(self, params, day):
+        fmt = params.get('format', 'csv').lower().strip()
+        if fmt not in available_formats():
+            return 400, {'error': f"Formato no disponible: {fmt}", 'formats': available_formats()}
+        service = self.server.service
+        week = params.get('week', 'false').lower() in ('1', 'true', 'yes')
+        if week:
+            plans = service.week_plans()
+            if not plans:
+                return 404, {'error': "La semana no tiene días planificados", 'week': current_week()}
+            name = file_name(fmt, plans[0].week)
+        else:
+            plans = [service.day_plan(day)]
+            if plans[0] is None:
+                return self._no_plan(day)
+            name = file_name(fmt, plans[0].week, plans[0].day)
+        return 200, FileResponse(service.export_chunks(plans, fmt), EXPORT_FORMATS[fmt]['mime'], name)
+
+    # ---- Respuesta ----
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, status, response):
+        self.send_response(status)
+        self.send_header("Content-Type", response.mime)
+        self.send_header("Content-Disposition", f'attachment; filename="{response.file_name}"')
+        self.end_headers()
+        self.wfile.write(response.first)
+        for chunk in response.chunks:
+            self.wfile.write(chunk)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, verbose=False):
+    return PooledHTTPServer((host, port), PlanRequestHandler, service, workers, verbose)
+
+# =========================
+# EJECUCIÓN
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("team", nargs="?", default=".", help="Directorio con los CSV del equipo")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Hilos que atienden conexiones")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Historial compartido con la app")
+    parser.add_argument("--verbose", action="store_true", help="Registrar cada petición en stderr")
+    args = parser.parse_args(argv)
+
+    service = PlanService(args.team, args.db)
+    start = time.perf_counter()
+    service.warm_up()
+    server = make_server(service, args.host, args.port, args.workers, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Planes en memoria en {time.perf_counter() - start:.2f}s; escuchando en http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""Fixtures compartidas: los módulos viven en la raíz del repo y los datos de ejemplo son los CSV de la raíz."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data import read_accounts, read_availability, read_engineers  # noqa: E402
+from planner import encode_availability  # noqa: E402
+
+@pytest.fixture(scope="session")
+def roster():
+    """(engineers_df, availability_df, accounts_df) de los CSV de ejemplo"""
+    return (read_engineers(os.path.join(ROOT, "engineers.csv")),
+            read_availability(os.path.join(ROOT, "availability.csv")),
+            read_accounts(os.path.join(ROOT, "accounts.csv")))
+
+@pytest.fixture(scope="session")
+def week_inputs(roster):
+    """(accounts_df, nombres de ingenieros, matriz de disponibilidad) para plan_week"""
+    engineers_df, availability_df, accounts_df = roster
+    return accounts_df, engineers_df['engineer_name'].tolist(), encode_availability(engineers_df, availability_df)
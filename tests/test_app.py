@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from diagnostics import StageTimer
+
+pytest.importorskip("streamlit")
+
+# Se ejecuta en un proceso nuevo (los módulos importados por otros tests no cuentan) e imprime un JSON
+CHILD = r"""
+import json, os, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state["fast_start"] = sys.argv[2] == "1"
+at.run()
+assert not at.exception, at.exception
+result = {
+    'toggles': {toggle.key: toggle.value for toggle in at.toggle if toggle.key and toggle.key.startswith("lazy_")},
+    'modules': [name for name in ("incident_feed", "rebalance", "scenarios") if name in sys.modules],
+    'first_paint': at.session_state['timing_history'].runs[-1].get('first_paint'),
+}
+if sys.argv[2] == "1":
+    at.toggle(key="lazy_rebalance").set_value(True).run()
+    assert not at.exception, at.exception
+    result['after_toggle'] = [name for name in ("rebalance",) if name in sys.modules]
+print(json.dumps(result))
+"""
+
+def _run_app(workdir, fast_start):
+    for name in ("accounts.csv", "availability.csv", "engineers.csv"):
+        shutil.copy(os.path.join(ROOT, name), workdir)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", CHILD, os.path.join(ROOT, "app.py"), "1" if fast_start else "0"],
+                            cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_fast_start_defers_sections_and_their_imports(tmp_path):
+    result = _run_app(str(tmp_path), fast_start=True)
+    assert {'lazy_availability', 'lazy_detail', 'lazy_history', 'lazy_rebalance'} <= set(result['toggles'])
+    assert not any(result['toggles'].values())
+    assert result['modules'] == []
+    assert result['after_toggle'] == ["rebalance"]
+    assert 0 < result['first_paint']
+
+def test_full_mode_renders_sections_eagerly(tmp_path):
+    result = _run_app(str(tmp_path), fast_start=False)
+    assert result['toggles'].keys() <= {'lazy_raw_data'}
+    assert "rebalance" in result['modules']
+
+def test_stage_timer_mark_records_elapsed_time():
+    timer = StageTimer()
+    with timer.stage("load"):
+        pass
+    timer.mark("first_paint")
+    record = timer.record()
+    assert 0 <= record['first_paint'] <= record['total_s']
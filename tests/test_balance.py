@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+import pytest
+
+from planner import engineer_loads, improve_balance, load_gap, plan_day
+
+def _random_day(seed):
+    rng = random.Random(seed)
+    n_accounts, n_engineers = rng.randint(10, 120), rng.randint(2, 9)
+    intensity = np.array([rng.randint(1, 9) for _ in range(n_accounts)], dtype=np.int64)
+    special_index = np.array([0, 1])
+    candidates = np.arange(n_engineers)
+    special_owners = np.array([rng.randrange(n_engineers), rng.randrange(n_engineers)])
+    # Orden aleatorio: deja brechas que la búsqueda local puede reducir
+    order = np.array(rng.sample(range(2, n_accounts), n_accounts - 2))
+    assignment = plan_day(intensity, special_index, special_owners, candidates, order=order)
+    movable = np.ones(n_accounts, dtype=bool)
+    movable[special_index] = False
+    return intensity, special_index, candidates, assignment, movable
+
+@pytest.mark.parametrize("seed", range(20))
+def test_improve_balance_never_increases_gap_or_moves_special_tasks(seed):
+    intensity, special_index, candidates, assignment, movable = _random_day(seed)
+    offsets = [random.Random(seed).randint(0, 6) for _ in candidates]
+    before = load_gap((engineer_loads(assignment, intensity, candidates) + offsets).tolist())
+
+    improved, report = improve_balance(assignment, intensity, candidates, movable, time_budget=0.2, offsets=offsets)
+    after = load_gap((engineer_loads(improved, intensity, candidates) + offsets).tolist())
+    assert report['gap_before'] == before
+    assert report['gap_after'] == after <= before
+    assert improved[special_index].tolist() == assignment[special_index].tolist()
+    assert (improved >= 0).all()
+
+def test_improve_balance_respects_skills_and_sticky_owners():
+    intensity, special_index, candidates, assignment, movable = _random_day(3)
+    n_accounts = len(intensity)
+    # El ingeniero 0 tiene la habilidad 1; las cuentas pares la exigen y son suyas
+    skills = [1] + [0] * (len(candidates) - 1)
+    requirements = [1 if account % 4 == 2 else 0 for account in range(n_accounts)]
+    assignment = assignment.copy()
+    assignment[[account for account in range(n_accounts) if requirements[account]]] = 0
+    sticky_owner = np.full(n_accounts, -1, dtype=np.int64)
+    sticky_owner[3::5] = assignment[3::5]
+
+    improved, _ = improve_balance(assignment, intensity, candidates, movable, time_budget=0.2,
+                                  constraints=(requirements, skills, sticky_owner))
+    assert all(improved[account] == 0 for account in range(n_accounts) if requirements[account])
+    assert improved[3::5].tolist() == assignment[3::5].tolist()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from data import read_accounts, read_availability, read_engineers
+from planner import DAYS_OF_WEEK, SPECIAL_TASKS, availability_status
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from run_benchmarks import bench_size  # noqa: E402
+from synthetic import MAX_INTENSITY, generate_roster, write_roster  # noqa: E402
+
+@pytest.mark.parametrize("distribution", ["uniform", "zipf", "bimodal"])
+def test_synthetic_roster_reads_like_the_real_csvs(tmp_path, distribution):
+    paths = write_roster(str(tmp_path), 200, 8, distribution=distribution, seed=3)
+    engineers_df = read_engineers(paths['engineers'])
+    availability_df = read_availability(paths['availability'])
+    accounts_df = read_accounts(paths['accounts'])
+
+    assert len(engineers_df) == 8
+    assert availability_status(engineers_df, availability_df).shape == (8, len(DAYS_OF_WEEK))
+    assert (availability_status(engineers_df, availability_df) >= 0).all()  # todos los días tienen dato
+    assert len(accounts_df) == 200 + len(SPECIAL_TASKS)
+    regular = accounts_df[~accounts_df['account'].isin(SPECIAL_TASKS)]
+    assert regular['intensity'].between(1, MAX_INTENSITY).all()
+
+def test_synthetic_roster_is_reproducible_per_seed():
+    first, second, other = (generate_roster(50, 4, seed=seed) for seed in (7, 7, 8))
+    for left, right in zip(first, second):
+        pd.testing.assert_frame_equal(left, right)
+    assert not first[2]['intensity'].equals(other[2]['intensity'])
+
+def test_bench_size_reports_every_stage(tmp_path):
+    results = bench_size(50, 4, "uniform", repeat=1, workdir=str(tmp_path))
+    assert [row['stage'] for row in results] == ['load_csv', 'load_snapshot_accounts', 'availability_grid',
+                                                 'special_task_selection', 'distribute_with_special_tasks']
+    assert all(row['accounts'] == 50 and 0 <= row['best_s'] <= row['median_s'] for row in results)
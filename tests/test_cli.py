@@ -0,0 +1,48 @@
+import concurrent.futures
+import os
+import shutil
+
+import pytest
+
+import planner
+from cli import find_team_dirs, main, plan_team, team_names
+from conftest import ROOT
+
+def _team(path):
+    path.mkdir(parents=True)
+    for name in ("accounts.csv", "availability.csv", "engineers.csv"):
+        shutil.copy(f"{ROOT}/{name}", path / name)
+    return path
+
+def test_plan_team_by_shift_does_not_nest_pools(tmp_path, monkeypatch):
+    shutil.copy(f"{ROOT}/accounts.csv", tmp_path / "accounts.csv")
+    shutil.copy(f"{ROOT}/availability.csv", tmp_path / "availability.csv")
+    (tmp_path / "engineers.csv").write_text(
+        "engineer_id,engineer_name,shift,active\n1,Sergio,Morning,yes\n2,Marvin,Night,yes\n3,Christopher,Night,yes\n"
+    )
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("plan_team abrió un pool dentro del worker")
+
+    monkeypatch.setattr(planner, "PARALLEL_MIN_ACCOUNTS", 0)
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", no_pool)
+    team, long_df, summary = plan_team(str(tmp_path), by_shift=True, max_workers=1)
+    assert summary['days'] > 0
+    assert set(long_df['Turno']) == {"Morning", "Night"}
+
+def test_same_basename_teams_get_distinct_outputs(tmp_path):
+    _team(tmp_path / "east" / "ops")
+    _team(tmp_path / "west" / "ops")
+    _team(tmp_path / "west" / "db")
+    team_dirs = find_team_dirs([str(tmp_path / "east"), str(tmp_path / "west"), str(tmp_path / "east" / "ops")])
+    assert len(team_dirs) == 3
+    assert sorted(team_names(team_dirs).values()) == ["db", "east-ops", "west-ops"]
+
+    output = tmp_path / "plans"
+    assert main([str(tmp_path / "east"), str(tmp_path / "west"), "-o", str(output), "--workers", "1"]) == 0
+    assert sorted(os.listdir(output)) == ["db.csv", "east-ops.csv", "west-ops.csv"]
+
+def test_team_names_fail_on_remaining_duplicates(tmp_path):
+    team_dirs = [str(tmp_path / "a" / "ops"), str(tmp_path / "b" / "ops"), str(tmp_path / "a-ops")]
+    with pytest.raises(ValueError, match="a-ops"):
+        team_names(team_dirs)
@@ -0,0 +1,61 @@
+import random
+
+import pandas as pd
+import pytest
+
+from planner import (RotationIndex, SPECIAL_TASKS, assign_constrained, distribute_with_special_tasks, plan_owners,
+                     skill_bits, unmet_requirements)
+
+def _accounts(n_accounts=40, seed=0):
+    rng = random.Random(seed)
+    rows = [{'account': f"A{idx:02d}", 'intensity': rng.randint(1, 5),
+             'skills': rng.choice(["", "", "sap", "sap, oracle", "oracle"]), 'sticky': rng.choice(["yes", "no"])}
+            for idx in range(n_accounts)]
+    rows += [{'account': task, 'intensity': 2, 'skills': "", 'sticky': "no"} for task in SPECIAL_TASKS]
+    return pd.DataFrame(rows)
+
+ENGINEER_SKILLS = {"Ana": "SAP, Oracle", "Beto": "sap", "Caro": "oracle", "Dani": ""}
+
+def test_skill_bits_feasibility():
+    engineers, accounts = skill_bits(["SAP, Oracle", "sap", " ", None], ["sap", "oracle, sap", "", "cobol"])
+    assert [engineer & account == account for engineer, account in zip(engineers, [accounts[1]] * 4)] == \
+        [True, False, False, False]
+    assert unmet_requirements(accounts, engineers).tolist() == [False, False, False, True]
+
+@pytest.mark.parametrize("seed", range(10))
+def test_accounts_go_only_to_qualified_engineers(seed):
+    accounts_df = _accounts(seed=seed)
+    plan = distribute_with_special_tasks(accounts_df, list(ENGINEER_SKILLS), "monday", RotationIndex(),
+                                         balance_budget=0.05, engineer_skills=ENGINEER_SKILLS)
+    required = dict(zip(accounts_df['account'], accounts_df['skills']))
+    for account, engineer in plan_owners(plan).items():
+        needed = {skill.strip() for skill in required[account].split(",") if skill.strip()}
+        assert needed <= {skill.strip().lower() for skill in ENGINEER_SKILLS[engineer].split(",")}
+    assert plan.attrs['constraints']['unmet_skills'] == []
+
+def test_unmet_skill_is_reported_and_still_assigned():
+    accounts_df = pd.concat([_accounts(), pd.DataFrame([{'account': "Z", 'intensity': 1, 'skills': "cobol",
+                                                          'sticky': "no"}])], ignore_index=True)
+    plan = distribute_with_special_tasks(accounts_df, list(ENGINEER_SKILLS), "monday", RotationIndex(),
+                                         engineer_skills=ENGINEER_SKILLS)
+    assert plan.attrs['constraints']['unmet_skills'] == ["Z"]
+    assert "Z" in plan_owners(plan)
+
+def test_sticky_accounts_keep_previous_owner_within_fair_share():
+    accounts_df = _accounts().assign(skills="")
+    names = list(ENGINEER_SKILLS)
+    previous_owners = {account: names[idx % len(names)] for idx, account in enumerate(accounts_df['account'])}
+    plan = distribute_with_special_tasks(accounts_df, names, "monday", RotationIndex(), engineer_skills=ENGINEER_SKILLS,
+                                         previous_owners=previous_owners)
+    owners = plan_owners(plan)
+    sticky = accounts_df.loc[accounts_df['sticky'] == 'yes', 'account'].tolist()
+    report = plan.attrs['constraints']
+    assert report['sticky_total'] == len(sticky)
+    assert report['sticky_kept'] == sum(owners[account] == previous_owners[account] for account in sticky)
+    unconstrained = plan_owners(distribute_with_special_tasks(accounts_df, names, "monday", RotationIndex()))
+    assert report['sticky_kept'] > sum(unconstrained[account] == previous_owners[account] for account in sticky)
+
+def test_preferred_owner_yields_when_over_fair_share():
+    # Todas las cuentas prefieren al ingeniero 0: se queda solo con su parte
+    owners = assign_constrained([2] * 8, [0, 0], [0, 0], [0] * 8, [0, 0], preferred=[0] * 8)
+    assert owners.count(0) == 4
@@ -0,0 +1,40 @@
+from data import account_columns, read_accounts, read_availability, read_engineers
+from planner import DEFAULT_SHIFT
+
+def test_blank_cells_are_not_read_as_none(tmp_path):
+    engineers = tmp_path / "engineers.csv"
+    engineers.write_text("engineer_id,engineer_name,shift,active,skills\n1,Ana,,,\n2, Beto ,Night,NO,sap\n")
+    availability = tmp_path / "availability.csv"
+    availability.write_text("engineer_id,day,available\n1,Monday,\n2, monday ,Yes\n")
+    accounts = tmp_path / "accounts.csv"
+    accounts.write_text("account,intensity,current spike,active,shift,skills,sticky\nA,3,,,,,\nB,,yes,no,Night,sap,yes\n")
+
+    engineers_df = read_engineers(str(engineers))
+    assert engineers_df['engineer_name'].tolist() == ["Ana", "Beto"]
+    assert engineers_df['shift'].tolist() == [DEFAULT_SHIFT, "Night"]
+    assert engineers_df['active'].tolist() == ["yes", "no"]
+    assert engineers_df['skills'].tolist() == ["", "sap"]
+
+    availability_df = read_availability(str(availability))
+    assert availability_df['day'].tolist() == ["monday", "monday"]
+    assert availability_df['available'].tolist() == ["no", "yes"]
+
+    accounts_df = read_accounts(str(accounts))
+    assert accounts_df['intensity'].tolist() == [3, 2]
+    assert accounts_df['active'].tolist() == ["yes", "no"]
+    assert accounts_df['shift'].tolist() == ["", "Night"]
+    assert accounts_df['skills'].tolist() == ["", "sap"]
+    assert not any("None" in values for values in accounts_df.astype(str).to_numpy().tolist())
+
+def test_blank_account_rows_are_dropped(tmp_path):
+    accounts = tmp_path / "accounts.csv"
+    accounts.write_text("id, Account Name ,Intensity Level,active\n1,CMF,2,yes\n2,,3,yes\n3,  ,1,yes\n4, ITAU ,5,\n")
+    accounts_df = read_accounts(str(accounts))
+    assert accounts_df['account'].tolist() == ["CMF", "ITAU"]
+    assert accounts_df['intensity'].tolist() == [2, 5]
+    assert accounts_df['active'].tolist() == ["yes", "yes"]
+
+def test_account_columns_maps_raw_headers():
+    assert account_columns([" Account Name ", "Intensity Level", "active"]) == {
+        " Account Name ": 'account', "Intensity Level": 'intensity'}
+    assert account_columns(["account", "name", "intensity"]) == {"intensity": 'intensity'}
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from diagnostics import StageTimer, TimingHistory, profile_report, profiled
+
+def test_stage_timer_accumulates_in_order():
+    timer = StageTimer()
+    for name in ("load", "plan", "load"):
+        with timer.stage(name):
+            pass
+    with pytest.raises(RuntimeError):
+        with timer.stage("render"):
+            raise RuntimeError("falla")
+    timer.note(day="monday", accounts=10)
+
+    record = timer.record()
+    assert list(record['stages']) == ["load", "plan", "render"]  # la etapa que falló también cuenta
+    assert all(seconds >= 0 for seconds in record['stages'].values())
+    assert record['total_s'] >= sum(record['stages'].values())
+    assert record['day'] == "monday" and record['accounts'] == 10
+
+def test_timing_history_keeps_last_runs():
+    history = TimingHistory(maxlen=2)
+    for ms in (1, 2, 3):
+        history.add({'timestamp': f"t{ms}", 'stages': {'plan': ms / 1000}})
+    assert [run['timestamp'] for run in history.runs] == ["t2", "t3"]
+    assert history.stage_rows() == [{'timestamp': "t2", 'run': 0, 'stage': "plan", 'ms': 2.0},
+                                    {'timestamp': "t3", 'run': 1, 'stage': "plan", 'ms': 3.0}]
+    assert json.loads(history.to_json())[-1]['timestamp'] == "t3"
+    history.clear()
+    assert history.stage_rows() == []
+
+def _busy():
+    return sum(range(1000))
+
+def test_profiled_only_when_enabled():
+    with profiled(enabled=False) as profiler:
+        assert profiler is None
+    with profiled() as profiler:
+        _busy()
+    assert "_busy" in profile_report(profiler)
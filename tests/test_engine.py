@@ -0,0 +1,48 @@
+import random
+
+import numpy as np
+import pytest
+
+from planner import SPECIAL_TASKS, assign_constrained, assign_heap, assign_linear, plan_day
+
+@pytest.mark.parametrize("seed", range(20))
+def test_heap_matches_linear_greedy(seed):
+    rng = random.Random(seed)
+    n_engineers = rng.randint(1, 12)
+    intensities = [rng.randint(1, 5) for _ in range(rng.randint(0, 200))]
+    # Cargas iniciales con empates, como las de las tareas especiales
+    sums = [rng.choice([0, 0, 2, 4]) for _ in range(n_engineers)]
+    counts = [int(s > 0) for s in sums]
+    assert assign_heap(intensities, sums, counts) == assign_linear(intensities, sums, counts)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unconstrained_assign_matches_heap(seed):
+    rng = random.Random(seed)
+    n_engineers = rng.randint(1, 8)
+    intensities = [rng.randint(1, 5) for _ in range(100)]
+    sums, counts = [0] * n_engineers, [0] * n_engineers
+    expected = assign_heap(intensities, sums, counts)
+    assert assign_constrained(intensities, sums, counts, [0] * 100, [0] * n_engineers) == expected
+
+def test_plan_day_matches_linear_greedy(week_inputs):
+    accounts_df, engineer_names, _ = week_inputs
+    names = accounts_df['account'].to_numpy()
+    intensity = accounts_df['intensity'].to_numpy(dtype=np.int64)
+    special_index = np.flatnonzero(np.isin(names, SPECIAL_TASKS))
+    candidates = np.arange(len(engineer_names))
+    owners = np.array([0, 1])
+    assignment = plan_day(intensity, special_index, owners, candidates)
+
+    # Referencia: las tareas especiales cargan a su dueño y el resto va, de mayor a menor, al menos cargado
+    sums, counts = [0] * len(candidates), [0] * len(candidates)
+    for account, owner in zip(special_index, owners):
+        sums[owner] += int(intensity[account])
+        counts[owner] += 1
+    regular = [account for account in range(len(names)) if account not in special_index]
+    order = sorted(regular, key=lambda account: -intensity[account])
+    expected = assign_linear([int(intensity[account]) for account in order], sums, counts)
+    assert assignment[special_index].tolist() == owners.tolist()
+    loads = np.bincount(assignment, weights=intensity, minlength=len(candidates))
+    expected_loads = np.bincount(np.array(expected), weights=intensity[order], minlength=len(candidates))
+    expected_loads[owners] += intensity[special_index]
+    assert loads.tolist() == expected_loads.tolist()
@@ -0,0 +1,87 @@
+import io
+
+import pandas as pd
+import pytest
+
+import export
+from export import ExportCache, available_formats, export_bytes, plan_fingerprint, write_export
+from planner import plan_long_frame, plan_week
+
+@pytest.fixture(scope="module")
+def long_df(week_inputs):
+    accounts_df = week_inputs[0]
+    plans, _ = plan_week(*week_inputs)
+    return plan_long_frame(plans, accounts_df)
+
+def _read(data, fmt):
+    if fmt == 'csv':
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig")
+    if fmt == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    sheets = pd.read_excel(io.BytesIO(data), sheet_name=None)
+    return pd.concat(sheets.values(), ignore_index=True)
+
+def _check_round_trip(long_df, data, fmt):
+    restored = _read(data, fmt)
+    assert list(restored.columns) == list(long_df.columns)
+    pd.testing.assert_frame_equal(restored.astype(long_df.dtypes.to_dict()), long_df.reset_index(drop=True),
+                                  check_dtype=fmt == 'parquet')
+
+@pytest.mark.parametrize("fmt", ['csv', 'parquet'])
+def test_round_trip(long_df, fmt):
+    if fmt not in available_formats():
+        pytest.skip(f"{fmt} no disponible")
+    # Bloques chicos: el archivo se arma por partes
+    _check_round_trip(long_df, export_bytes(long_df, fmt, chunk_rows=7), fmt)
+
+@pytest.mark.parametrize("engine", ['xlsxwriter', 'openpyxl'])
+def test_xlsx_round_trip(long_df, engine, monkeypatch):
+    pytest.importorskip(engine)
+    pytest.importorskip("openpyxl")  # pandas lee XLSX con openpyxl
+    monkeypatch.setattr(export, "HAS_XLSXWRITER", engine == 'xlsxwriter')
+    monkeypatch.setattr(export, "HAS_OPENPYXL", True)
+    data = export_bytes(long_df, 'xlsx', chunk_rows=7)
+    assert list(pd.read_excel(io.BytesIO(data), sheet_name=None)) == list(dict.fromkeys(long_df['Día']))
+    _check_round_trip(long_df, data, 'xlsx')
+
+def test_write_export_to_path_matches_bytes(long_df, tmp_path):
+    path = tmp_path / "plan.csv"
+    write_export(long_df, str(path), 'csv')
+    assert path.read_bytes() == export_bytes(long_df, 'csv')
+
+def test_export_cache_builds_once(long_df, week_inputs):
+    plans, _ = plan_week(*week_inputs)
+    cache = ExportCache()
+    key = cache.key(plan_fingerprint(plans), "week", 'csv')
+    builds = []
+
+    def build():
+        builds.append(1)
+        return long_df
+
+    assert cache.get_or_build(key, build, 'csv') == cache.get_or_build(key, build, 'csv') == export_bytes(long_df, 'csv')
+    assert len(builds) == 1 and cache.stats()['hits'] == 1
+
+def test_spool_serves_file_from_disk_then_cache(long_df):
+    cache = ExportCache()
+    key = ExportCache.key("plan", "week", 'csv')
+    built = []
+
+    def build():
+        built.append(1)
+        return long_df
+
+    with cache.spool(key, build, 'csv') as fh:
+        assert isinstance(fh, io.BufferedReader)
+        assert fh.read() == export_bytes(long_df, 'csv')
+    with cache.spool(key, build, 'csv') as fh:
+        assert fh.read() == export_bytes(long_df, 'csv')
+    assert built == [1]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+def test_spool_skips_cache_for_large_files(long_df):
+    cache = ExportCache(max_entry_bytes=1)
+    key = ExportCache.key("plan", "week", 'csv')
+    with cache.spool(key, lambda: long_df, 'csv') as fh:
+        assert fh.read() == export_bytes(long_df, 'csv')
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,30 @@
+import pytest
+
+from history_store import HistoryConflictError, HistoryStore
+
+WEEK = "2026-W42"
+ROWS_A = [("Ana", "ITAU", False), ("Beto", "EoS Report", True)]
+ROWS_B = [("Beto", "ITAU", False), ("Ana", "EoS Report", True)]
+
+def test_version_conflict_keeps_the_first_write(tmp_path):
+    first, second = HistoryStore(str(tmp_path / "history.db")), HistoryStore(str(tmp_path / "history.db"))
+    _, versions = first.load_rotation(WEEK)
+    _, stale_versions = second.load_rotation(WEEK)
+
+    assert first.save_day(WEEK, "monday", {"EoS Report": "Beto"}, ROWS_A, versions.get("monday", 0)) == 1
+    with pytest.raises(HistoryConflictError):
+        second.save_day(WEEK, "monday", {"EoS Report": "Ana"}, ROWS_B, stale_versions.get("monday", 0))
+
+    rotation, versions = second.load_rotation(WEEK)
+    assert versions == {"monday": 1}
+    assert rotation.assignments["monday"] == {"EoS Report": "Beto"}
+    assert second.day_assignments(WEEK, "monday") == [("Ana", "ITAU", 0), ("Beto", "EoS Report", 1)]
+
+    # Releída la versión vigente, el segundo escritor sí guarda
+    assert second.save_day(WEEK, "monday", {"EoS Report": "Ana"}, ROWS_B, versions["monday"]) == 2
+
+def test_unchanged_plan_does_not_bump_version(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.save_day(WEEK, "tuesday", {"EoS Report": "Beto"}, ROWS_A, 0) == 1
+    assert store.save_day(WEEK, "tuesday", {"EoS Report": "Beto"}, ROWS_A, 1) == 1
+    assert store.previous_owners(WEEK, "wednesday") == {"ITAU": "Ana"}
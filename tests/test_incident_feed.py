@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from incident_feed import IncidentRates, live_intensity
+from planner import SPECIAL_TASKS
+
+NOW = 1_800_000_000.0  # múltiplo de 60: el bucket de NOW empieza en NOW
+
+def test_ring_buffer_counts_only_the_window():
+    rates = IncidentRates(window_s=600, bucket_s=60)
+    rates.add("A", NOW - 60, count=2, now=NOW)
+    rates.add("A", NOW, now=NOW)
+    rates.add("B", NOW - 601, now=NOW)  # fuera de la ventana
+    assert rates.rates(now=NOW) == {"A": 18.0}  # 3 incidentes en 10 minutos
+
+    # Al avanzar, los buckets que salen de la ventana se vacían
+    assert rates.rates(now=NOW + 540) == {"A": 6.0}
+    assert rates.rates(now=NOW + 600) == {"A": 0.0}
+    assert rates.events == 3
+
+def test_ring_buffer_grows_with_accounts():
+    rates = IncidentRates(window_s=120, bucket_s=60)
+    for i in range(40):
+        rates.add(f"A{i}", NOW, count=i, now=NOW)
+    observed = rates.rates(now=NOW)
+    assert len(observed) == 40
+    assert observed["A39"] == 39 * 30.0
+
+def test_far_future_event_is_dropped_without_clearing_window():
+    rates = IncidentRates(window_s=600, bucket_s=60, max_future_s=300)
+    rates.add("A", NOW - 120, count=4, now=NOW)
+    rates.add("A", NOW + 10 * 86400, count=5, now=NOW)
+    assert rates.dropped == 5
+    assert rates.rates(now=NOW) == {"A": 24.0}
+
+def test_near_future_event_counts_as_now():
+    rates = IncidentRates(window_s=600, bucket_s=60, max_future_s=300)
+    rates.add("A", NOW - 540, now=NOW)
+    rates.add("A", NOW + 200, now=NOW)
+    assert rates.dropped == 0
+    assert rates.current == int(NOW // 60)
+    assert rates.rates(now=NOW) == {"A": 12.0}
+
+@pytest.fixture
+def accounts_df():
+    return pd.DataFrame({'account': ["A", "B", "C", SPECIAL_TASKS[0]], 'intensity': [5, 5, 2, 2]})
+
+def test_live_intensity_maps_rates_to_levels(accounts_df):
+    live_df = live_intensity(accounts_df, {"A": 0.5, "B": 6.0, SPECIAL_TASKS[0]: 50.0}, levels=(1.0, 3.0, 6.0))
+    # A: por debajo del primer nivel; B: alcanza los tres; C no se vio y la tarea especial no cambia
+    assert live_df['intensity'].tolist() == [1, 4, 2, 2]
+    assert accounts_df['intensity'].tolist() == [5, 5, 2, 2]
+
+def test_live_intensity_without_rates_keeps_csv(accounts_df):
+    pd.testing.assert_frame_equal(live_intensity(accounts_df, {}), accounts_df)
@@ -0,0 +1,31 @@
+from plan_cache import PlanCache
+
+def test_hits_misses_and_lru_eviction():
+    cache = PlanCache(max_entries=2)
+    first, second, third = (PlanCache.key("datos", day, (), weighted=True) for day in ("monday", "tuesday", "friday"))
+    assert cache.get(first) is None
+    cache.put(first, {'plan': 1})
+    cache.put(second, {'plan': 2})
+    assert cache.get(first) == {'plan': 1}  # first pasa a ser el más reciente
+    cache.put(third, {'plan': 3})           # sale second, el menos usado
+
+    assert cache.get(second) is None
+    assert cache.get(third) == {'plan': 3}
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'evictions': 1, 'size': 2, 'max_entries': 2, 'hit_rate': 0.5}
+
+def test_key_depends_on_every_input():
+    base = PlanCache.key("datos", "monday", (("monday", ()),), weighted=True, seed=1)
+    assert PlanCache.key("datos", "monday", (("monday", ()),), seed=1, weighted=True) == base
+    assert PlanCache.key("otros", "monday", (("monday", ()),), weighted=True, seed=1) != base
+    assert PlanCache.key("datos", "tuesday", (("monday", ()),), weighted=True, seed=1) != base
+    assert PlanCache.key("datos", "monday", (), weighted=True, seed=1) != base
+    assert PlanCache.key("datos", "monday", (("monday", ()),), weighted=True, seed=2) != base
+
+def test_clear_keeps_counters():
+    cache = PlanCache()
+    key = PlanCache.key("datos", "monday", ())
+    cache.put(key, {})
+    cache.get(key)
+    cache.clear()
+    assert cache.get(key) is None
+    assert cache.stats()['size'] == 0 and cache.stats()['hits'] == 1
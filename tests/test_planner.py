@@ -0,0 +1,230 @@
+import random
+import subprocess
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import planner
+from conftest import ROOT
+from data import read_engineers
+from planner import (DAYS_OF_WEEK, DEFAULT_SHIFT, SPECIAL_TASK_INTENSITY, RollingLoads, RotationIndex, SPECIAL_TASKS,
+                     active_accounts, assignment_accounts, availability_status, distribute_best_of,
+                     distribute_by_shift, distribute_with_special_tasks, encode_accounts, encode_availability,
+                     plan_long_frame, plan_owners, plan_week, plan_week_day, select_special_owners, shift_coverage)
+from rebalance import IncrementalBalancer
+
+def test_blank_engineer_shift_gets_default_partition(roster):
+    _, _, accounts_df = roster
+    plan = distribute_by_shift(accounts_df, ["Ana", "Beto", "Caro", "Dani"], [" Morning ", None, "morning", np.nan],
+                               "monday", RotationIndex())
+    assert sorted(plan['Turno'].unique()) == sorted(["Morning", DEFAULT_SHIFT])
+    assert sorted(plan.loc[plan['Turno'] == DEFAULT_SHIFT, 'Ingeniero']) == ["Beto", "Dani"]
+    regular = set(accounts_df['account']) - set(SPECIAL_TASKS)
+    assert set(plan_owners(plan)) == regular
+
+def test_engineers_without_shift_column(tmp_path, roster):
+    _, _, accounts_df = roster
+    path = tmp_path / "engineers.csv"
+    path.write_text("engineer_id,engineer_name,active\n1,Ana,yes\n2,Beto,yes\n")
+    engineers_df = read_engineers(str(path))
+    assert engineers_df['shift'].tolist() == [DEFAULT_SHIFT, DEFAULT_SHIFT]
+    plans, _ = plan_week(accounts_df, engineers_df['engineer_name'].tolist(), np.ones((2, 7), dtype=bool),
+                         engineer_shifts=engineers_df['shift'].tolist())
+    assert all(plan['Turno'].eq(DEFAULT_SHIFT).all() for plan in plans.values())
+
+def test_shift_coverage_normalizes_both_sides():
+    accounts_df = pd.DataFrame({'account': ["A", "B", "C"], 'shift': [" morning , Night", "", None]})
+    coverage = shift_coverage(accounts_df, ["Morning ", "NIGHT", None])
+    assert coverage.tolist() == [[True, True, False], [True, True, True], [True, True, True]]
+
+def test_inactive_accounts_are_not_planned():
+    accounts_df = pd.DataFrame({'account': ["A", "B", "C", SPECIAL_TASKS[0]], 'intensity': [3, 2, 1, 2],
+                                'active': ["yes", "no", " NO ", "no"]})
+    plans, _ = plan_week(active_accounts(accounts_df), ["Ana", "Beto"], np.ones((2, 7), dtype=bool))
+    assert set(plan_owners(plans["monday"])) == {"A"}
+    assert any(f"**{SPECIAL_TASKS[0]}**" in accounts for accounts in plans["monday"]['Lista Cuentas'])
+
+def test_rebalancer_refuses_by_shift_plans(roster):
+    _, _, accounts_df = roster
+    plan = distribute_by_shift(accounts_df, ["Ana", "Beto"], ["Morning", "Night"], "monday", RotationIndex())
+    with pytest.raises(ValueError, match="turno"):
+        IncrementalBalancer.from_plan(plan, accounts_df)
+
+def test_plan_week_keeps_saved_special_owners(week_inputs):
+    accounts_df, engineer_names, availability = week_inputs
+    _, fresh = plan_week(*week_inputs)
+    task = SPECIAL_TASKS[0]
+    # Responsable guardado para el martes distinto del que elegiría plan_week
+    available = [name for name, free in zip(engineer_names, availability[:, 1]) if free]
+    saved = next(name for name in available if name not in fresh.assignments["tuesday"].values())
+    stored = RotationIndex()
+    stored.record("tuesday", task, saved)
+
+    plans, rotation = plan_week(accounts_df, engineer_names, availability, rotation=stored, keep_recorded=True)
+    assert rotation.assignments["tuesday"][task] == saved
+    tuesday = plans["tuesday"].set_index('Ingeniero')['Lista Cuentas']
+    assert f"**{task}**" in tuesday[saved]
+
+def test_rolling_loads_add_planned_days():
+    history = pd.DataFrame({'day': [-2, -1, -5], 'engineer': ["Ana", "Beto", "Ana"], 'intensity': [6, 2, 50]})
+    loads = RollingLoads(history, window_days=2, weight=1.0)
+    assert loads.offsets("monday", {}) == {"Ana": 2, "Beto": -2}
+    # El martes la ventana pierde el día -2 y suma el lunes ya planificado
+    monday = pd.DataFrame({'Ingeniero': ["Ana", "Beto"], 'Intensidad Total': [1, 5]})
+    assert loads.offsets("tuesday", {"monday": monday}) == {"Beto": 2, "Ana": -2}
+
+def test_plan_week_updates_offsets_per_day(week_inputs):
+    accounts_df, engineer_names, availability = week_inputs
+    empty = pd.DataFrame({'day': pd.Series([], dtype='int64'), 'engineer': [], 'intensity': []})
+    loads = RollingLoads(empty, window_days=7)
+    plans, _ = plan_week(accounts_df, engineer_names, availability, load_offsets=loads)
+    # Cada día arranca con la carga de los días anteriores de la semana, no con una foto fija del lunes
+    rotation, previous_owners = RotationIndex(), None
+    for day in DAYS_OF_WEEK:
+        offsets = loads.offsets(day, plans)
+        assert (day == "monday") == (offsets == {})
+        expected = plan_week_day(accounts_df, engineer_names, availability, day, rotation, load_offsets=offsets,
+                                 previous_owners=previous_owners)
+        pd.testing.assert_frame_equal(plans[day], expected)
+        previous_owners = plan_owners(expected) if not expected.empty else previous_owners
+
+def test_core_imports_without_streamlit():
+    code = "import sys, cli, data, planner; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+def test_encode_accounts_adds_missing_and_repeated_special_tasks():
+    accounts_df = pd.DataFrame({'account': ["A", SPECIAL_TASKS[0], "B", SPECIAL_TASKS[0]], 'intensity': [3, 9, 1, 9]})
+    names, intensity, special_index = encode_accounts(accounts_df)
+    assert names.tolist() == ["A", SPECIAL_TASKS[0], "B"] + SPECIAL_TASKS[1:]
+    assert names[special_index].tolist() == SPECIAL_TASKS
+    assert intensity.tolist() == [3, SPECIAL_TASK_INTENSITY, 1] + [SPECIAL_TASK_INTENSITY] * (len(SPECIAL_TASKS) - 1)
+
+def test_day_plan_assigns_every_account_once(roster):
+    engineers_df, _, accounts_df = roster
+    names = engineers_df['engineer_name'].tolist()
+    plan = distribute_with_special_tasks(accounts_df, names, "monday", RotationIndex())
+    listed = [account for accounts in plan['Lista Cuentas'] for account in accounts]
+    assert sorted(account.strip('*') for account in listed) == sorted(set(accounts_df['account']) | set(SPECIAL_TASKS))
+    assert {account for account in listed if account.startswith('**')} == {f"**{task}**" for task in SPECIAL_TASKS}
+    intensity = dict(zip(accounts_df['account'], accounts_df['intensity']))
+    for accounts, total in zip(plan['Lista Cuentas'], plan['Intensidad Total']):
+        assert total == sum(SPECIAL_TASK_INTENSITY if account.startswith('**') else intensity[account]
+                            for account in accounts)
+    assert plan['Total Cuentas'].sum() == len(listed)
+
+def _scan(assignments):
+    """Contadores de RotationIndex recalculados recorriendo todo el historial"""
+    task_counts, seen = Counter(), Counter()
+    for tasks in assignments.values():
+        for task, engineer in tasks.items():
+            task_counts[engineer] += 1
+            seen[(task, engineer)] += 1
+    return task_counts, seen
+
+def test_rotation_index_matches_full_scan():
+    rng = random.Random(0)
+    rotation, engineers = RotationIndex(), ["Ana", "Beto", "Caro"]
+    for step in range(200):
+        period = f"2026-10-{rng.randint(1, 20):02d}"
+        if rng.random() < 0.2:
+            rotation.clear_period(period)
+        else:
+            rotation.record(period, rng.choice(SPECIAL_TASKS), rng.choice(engineers))
+        assert (rotation.task_counts, rotation.seen) == _scan(rotation.assignments)
+
+def test_rotation_state_key_excludes_replanned_period():
+    rotation = RotationIndex()
+    rotation.record("monday", SPECIAL_TASKS[0], "Ana")
+    before = rotation.state_key()
+    rotation.record("tuesday", SPECIAL_TASKS[0], "Beto")
+    assert rotation.state_key(exclude_period="tuesday") == before
+    rotation.record("tuesday", SPECIAL_TASKS[0], "Caro")
+    assert rotation.state_key(exclude_period="tuesday") == before != rotation.state_key()
+
+def test_special_owners_rotate_before_repeating():
+    rotation, names = RotationIndex(), ["Ana", "Beto", "Caro", "Dani"]
+    candidates = np.arange(len(names))
+    for day in DAYS_OF_WEEK[:2]:
+        select_special_owners(candidates, names, day, rotation, rng=random.Random(day))
+    # Dos días, dos tareas, cuatro ingenieros: nadie repite tarea ni acumula dos
+    assert all(count == 1 for count in rotation.task_counts.values())
+    assert len(rotation.task_counts) == 4
+    # Replanificar un día reemplaza lo registrado en lugar de sumarlo
+    select_special_owners(candidates, names, DAYS_OF_WEEK[1], rotation, rng=random.Random(1))
+    assert sum(rotation.task_counts.values()) == 2 * len(SPECIAL_TASKS)
+
+def test_availability_status_matches_row_scan(roster):
+    engineers_df, availability_df, _ = roster
+    status = availability_status(engineers_df, availability_df)
+    assert status.shape == (len(engineers_df), len(DAYS_OF_WEEK))
+    for row, engineer_id in enumerate(engineers_df['engineer_id']):
+        for col, day in enumerate(DAYS_OF_WEEK):
+            rows = availability_df[(availability_df['engineer_id'] == engineer_id) & (availability_df['day'] == day)]
+            expected = -1 if rows.empty else int(rows['available'].iloc[0] == 'yes')
+            assert status[row, col] == expected
+
+def test_availability_status_first_row_wins_and_gaps_are_unknown():
+    engineers_df = pd.DataFrame({'engineer_id': [2, 1, 3], 'engineer_name': ["Beto", "Ana", "Caro"],
+                                 'active': ["yes", "yes", "no"]})
+    availability_df = pd.DataFrame({'engineer_id': [1, 1, 2, 3, 9],
+                                    'day': ["monday", "monday", "sunday", "monday", "monday"],
+                                    'available': ["no", "yes", "yes", "yes", "yes"]})
+    status = availability_status(engineers_df, availability_df)
+    assert status[:, 0].tolist() == [-1, 0, 1]   # en el orden de engineers_df; el 9 no está en el roster
+    assert status[:, -1].tolist() == [1, -1, -1]
+    # Caro está disponible el lunes pero inactiva: no se planifica
+    assert encode_availability(engineers_df, availability_df)[:, 0].tolist() == [False, False, False]
+
+def test_assignment_accounts_one_row_per_account():
+    accounts_df = pd.DataFrame({'account': ["A", "B", "C"], 'intensity': [3, 1, 2]})
+    plan = pd.DataFrame({'Turno': ["Morning", "Night"], 'Ingeniero': ["Ana", "Beto"],
+                         'Lista Cuentas': [[f"**{SPECIAL_TASKS[0]}**", "B", "A"], ["C"]]})
+    long_df = assignment_accounts(plan, accounts_df)
+    assert long_df.to_dict('records') == [
+        {'Turno': "Morning", 'Ingeniero': "Ana", 'Cuenta': SPECIAL_TASKS[0], 'Especial': True,
+         'Intensidad': SPECIAL_TASK_INTENSITY},
+        {'Turno': "Morning", 'Ingeniero': "Ana", 'Cuenta': "B", 'Especial': False, 'Intensidad': 1},
+        {'Turno': "Morning", 'Ingeniero': "Ana", 'Cuenta': "A", 'Especial': False, 'Intensidad': 3},
+        {'Turno': "Night", 'Ingeniero': "Beto", 'Cuenta': "C", 'Especial': False, 'Intensidad': 2},
+    ]
+    # Una página del plan (un subconjunto de filas) da las mismas filas de esos ingenieros
+    page = assignment_accounts(plan.iloc[1:], accounts_df)
+    assert page.to_dict('records') == long_df.iloc[3:].to_dict('records')
+    assert list(assignment_accounts(pd.DataFrame(), accounts_df).columns) == ['Cuenta', 'Especial', 'Intensidad']
+
+def test_plan_long_frame_matches_day_plans(week_inputs):
+    accounts_df = week_inputs[0]
+    plans, _ = plan_week(*week_inputs)
+    long_df = plan_long_frame(plans, accounts_df)
+    assert list(long_df.columns) == ['Día', 'Ingeniero', 'Cuenta', 'Especial', 'Intensidad']
+    for day, plan in plans.items():
+        day_rows = long_df[long_df['Día'] == day]
+        assert len(day_rows) == plan['Total Cuentas'].sum()
+        totals = day_rows.groupby('Ingeniero')['Intensidad'].sum()
+        assert totals.to_dict() == dict(zip(plan['Ingeniero'], plan['Intensidad Total']))
+
+def _best_of(roster, **kwargs):
+    engineers_df, _, accounts_df = roster
+    rotation = RotationIndex()
+    plan = distribute_best_of(accounts_df, engineers_df['engineer_name'].tolist(), "monday", rotation, **kwargs)
+    return plan, rotation
+
+def test_best_of_is_reproducible_from_winning_seed(roster):
+    plan, rotation = _best_of(roster, n_candidates=6, seed=100)
+    assert sorted(plan.attrs['candidates']) == list(range(100, 106))
+    assert plan.attrs['score'] == min(plan.attrs['candidates'].values())
+    assert plan.attrs['candidates'][plan.attrs['seed']] == plan.attrs['score']
+
+    again, again_rotation = _best_of(roster, n_candidates=1, seed=plan.attrs['seed'])
+    pd.testing.assert_frame_equal(again, plan)
+    assert again_rotation.assignments == rotation.assignments
+
+def test_best_of_in_processes_matches_serial(roster, monkeypatch):
+    serial, _ = _best_of(roster, n_candidates=3, seed=7, max_workers=1)
+    monkeypatch.setattr(planner, "PARALLEL_MIN_ACCOUNTS", 0)
+    parallel, _ = _best_of(roster, n_candidates=3, seed=7, max_workers=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert parallel.attrs['candidates'] == serial.attrs['candidates']
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from planner import best_transfer
+from rebalance import IncrementalBalancer
+
+def _random_balancer(seed, n_accounts=60, n_engineers=5):
+    rng = random.Random(seed)
+    engineers = [f"E{i}" for i in range(n_engineers)]
+    intensities = {f"A{i}": rng.randint(1, 6) for i in range(n_accounts)}
+    owners = {account: rng.choice(engineers) for account in intensities}
+    pinned = ["A0", "A1"]
+    return IncrementalBalancer(owners, intensities, pinned, engineers=engineers), rng
+
+def _check_consistent(balancer):
+    """Cargas, dueños y buckets coinciden con las cuentas asignadas"""
+    assert set(balancer.owner) == set(balancer.intensity)
+    for engineer, accounts in balancer.assigned.items():
+        assert balancer.loads[engineer] == sum(balancer.intensity[account] for account in accounts)
+        assert all(balancer.owner[account] == engineer for account in accounts)
+        movable = {account: balancer.intensity[account] for account in accounts if account not in balancer.pinned}
+        in_buckets = {account: weight for weight, bucket in balancer.buckets[engineer].items() for account in bucket}
+        assert in_buckets == movable
+        assert all(balancer.buckets[engineer].values())  # sin buckets vacíos
+
+def _check_gap(balancer, tolerance):
+    """La brecha vuelve a la de antes del cambio, salvo que ya no haya transferencia que la reduzca"""
+    if balancer.gap() <= tolerance:
+        return
+    hi = max(balancer.loads, key=balancer.loads.__getitem__)
+    lo = min(balancer.loads, key=balancer.loads.__getitem__)
+    assert best_transfer(balancer.buckets[hi], balancer.buckets[lo], balancer.gap()) is None
+
+def _replay(owners, moves):
+    """Dueños después de aplicar moves, verificando que cada uno parte de donde estaba la cuenta"""
+    owners = dict(owners)
+    for move in moves:
+        assert owners.get(move['Cuenta']) == move['Desde']
+        assert move['Hacia'] != move['Desde']
+        owners[move['Cuenta']] = move['Hacia']
+    return owners
+
+def _apply(balancer, method, *args):
+    before, tolerance = dict(balancer.owner), balancer.gap()
+    moves = getattr(balancer, method)(*args)
+    _check_consistent(balancer)
+    _check_gap(balancer, tolerance)
+    after = _replay(before, moves)
+    assert {account: owner for account, owner in after.items() if account in balancer.owner} == balancer.owner
+    return moves
+
+@pytest.mark.parametrize("seed", range(10))
+def test_changes_keep_loads_consistent_and_gap_bounded(seed):
+    balancer, rng = _random_balancer(seed)
+    _check_consistent(balancer)
+    for step in range(30):
+        change = rng.choice(["intensity", "account_in", "account_out", "engineer_out", "engineer_in"])
+        if change == "intensity":
+            _apply(balancer, "set_intensity", rng.choice(sorted(balancer.owner)), rng.randint(1, 12))
+        elif change == "account_in":
+            _apply(balancer, "add_account", f"N{seed}-{step}", rng.randint(1, 6))
+        elif change == "account_out" and len(balancer.owner) > 10:
+            _apply(balancer, "remove_account", rng.choice(sorted(balancer.owner)))
+        elif change == "engineer_out" and len(balancer.loads) > 2:
+            _apply(balancer, "remove_engineer", rng.choice(sorted(balancer.loads)))
+        elif change == "engineer_in":
+            _apply(balancer, "add_engineer", f"X{seed}-{step}")
+
+def test_spike_moves_accounts_until_gap_restored():
+    owners = {"A": "Ana", "B": "Ana", "C": "Beto", "D": "Beto"}
+    balancer = IncrementalBalancer(owners, {"A": 2, "B": 2, "C": 2, "D": 2})
+    moves = _apply(balancer, "set_intensity", "A", 6)
+    assert balancer.gap() == 0
+    assert moves == [{'Cuenta': "B", 'Desde': "Ana", 'Hacia': "Beto", 'Motivo': 'rebalanceo'}]
+    assert balancer.loads == {"Ana": 6, "Beto": 6}
+
+def test_removed_engineer_hands_over_every_account():
+    owners = {"T": "Ana", "A": "Ana", "B": "Ana", "C": "Beto", "D": "Caro"}
+    balancer = IncrementalBalancer(owners, {"T": 2, "A": 3, "B": 1, "C": 3, "D": 3}, pinned=["T"])
+    moves = _apply(balancer, "remove_engineer", "Ana")
+    handed = [move for move in moves if move['Motivo'] == 'ingeniero sale']
+    assert sorted(move['Cuenta'] for move in handed) == ["A", "B", "T"]
+    assert all(move['Desde'] == "Ana" for move in handed)
+    assert "Ana" not in balancer.loads and "Ana" not in balancer.owner.values()
+    assert sum(balancer.loads.values()) == 12
+
+def test_new_account_goes_to_least_loaded():
+    balancer = IncrementalBalancer({"A": "Ana", "B": "Beto"}, {"A": 5, "B": 1})
+    moves = _apply(balancer, "add_account", "C", 2)
+    assert moves[0] == {'Cuenta': "C", 'Desde': None, 'Hacia': "Beto", 'Motivo': 'cuenta nueva'}
+    assert balancer.owner["C"] == "Beto"
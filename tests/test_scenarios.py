@@ -0,0 +1,60 @@
+import pandas as pd
+
+from planner import DAYS_OF_WEEK, plan_week
+from scenarios import Scenario, WeekBaseline, compare_scenarios, run_scenarios, scenarios_from_changes
+
+def test_plan_week_is_reproducible(week_inputs):
+    first_plans, first_rotation = plan_week(*week_inputs)
+    second_plans, second_rotation = plan_week(*week_inputs)
+    assert first_rotation.assignments == second_rotation.assignments
+    for day in DAYS_OF_WEEK:
+        pd.testing.assert_frame_equal(first_plans[day], second_plans[day])
+
+def test_baseline_matches_plan_week(week_inputs):
+    baseline = WeekBaseline(*week_inputs)
+    plans, rotation = plan_week(*week_inputs)
+    assert baseline.rotation.assignments == rotation.assignments
+    for day in DAYS_OF_WEEK:
+        pd.testing.assert_frame_equal(baseline.plans[day], plans[day])
+
+def test_noop_scenario_has_no_diffs(week_inputs):
+    accounts_df, engineer_names, availability = week_inputs
+    baseline = WeekBaseline(*week_inputs)
+    account, intensity = accounts_df['account'].iloc[0], int(accounts_df['intensity'].iloc[0])
+    engineer = engineer_names[0]
+    noop = Scenario("sin cambios", availability={(engineer, day): bool(availability[0, i])
+                                                 for i, day in enumerate(DAYS_OF_WEEK)},
+                    intensity={account: intensity})
+    assert baseline.affected_days(noop) == []
+
+    results = run_scenarios(baseline, [noop], max_workers=1)
+    summary_df, _, _ = compare_scenarios(baseline, results)
+    assert results[0].replanned == {}
+    assert summary_df.set_index('Escenario').loc["sin cambios", 'Tareas especiales cambiadas'] == 0
+
+def test_scenario_matches_full_replan(week_inputs):
+    accounts_df, engineer_names, availability = week_inputs
+    baseline = WeekBaseline(*week_inputs)
+    engineer = engineer_names[1]
+    scenario = Scenario("vacaciones", availability={(engineer, day): False for day in DAYS_OF_WEEK[2:5]},
+                        intensity={accounts_df['account'].iloc[1]: 25})
+    result = run_scenarios(baseline, [scenario], max_workers=1)[0]
+    plans, rotation = plan_week(scenario.apply_intensity(accounts_df), engineer_names,
+                                scenario.apply_availability(engineer_names, availability))
+    for day in DAYS_OF_WEEK:
+        pd.testing.assert_frame_equal(result.plans[day], plans[day])
+        assert result.special_tasks[day] == rotation.assignments.get(day, {})
+
+def test_reserved_scenario_names_do_not_overwrite_columns(week_inputs):
+    accounts_df, engineer_names, _ = week_inputs
+    baseline = WeekBaseline(*week_inputs)
+    scenarios = [Scenario(name, intensity={accounts_df['account'].iloc[0]: 30}) for name in ("Día", "Tarea", "Día")]
+    summary_df, loads_df, rotation_df = compare_scenarios(baseline, run_scenarios(baseline, scenarios, max_workers=1))
+    assert rotation_df['Día'].isin(DAYS_OF_WEEK).all()
+    assert len(rotation_df.columns) == len(set(rotation_df.columns)) == 3 + len(scenarios)
+    assert summary_df['Escenario'].tolist()[1:] == ["Día (escenario)", "Tarea (escenario)", "Día (escenario 2)"]
+
+    changes = pd.DataFrame([["Tarea", "intensity", accounts_df['account'].iloc[0], "", "3"]],
+                           columns=['Escenario', 'Tipo', 'Objetivo', 'Día', 'Valor'])
+    parsed, errors = scenarios_from_changes(changes, engineer_names, accounts_df['account'].tolist())
+    assert not errors and parsed[0].name == "Tarea (escenario)"
@@ -0,0 +1,41 @@
+import json
+import shutil
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from conftest import ROOT
+from service import PlanService, current_week, make_server
+
+@pytest.fixture
+def service_url(tmp_path):
+    for name in ("engineers.csv", "availability.csv", "accounts.csv"):
+        shutil.copy(f"{ROOT}/{name}", tmp_path / name)
+    service = PlanService(str(tmp_path), str(tmp_path / "history.db"))
+    server = make_server(service, port=0, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", service
+    server.shutdown()
+    server.server_close()
+
+def _request(url, method="GET"):
+    try:
+        with urlopen(Request(url, method=method), timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_get_does_not_plan_and_post_does(service_url):
+    url, service = service_url
+    for path in ("/owner?account=ITAU&day=monday", "/plan?day=monday", "/export?day=monday"):
+        status, body = _request(url + path)
+        assert status == 404 and "POST /plan" in body['error']
+    assert service.history_store.load_rotation(current_week())[1] == {}
+
+    status, plan = _request(f"{url}/plan?day=monday", method="POST")
+    assert status == 200 and plan['version'] == 1
+    status, owner = _request(f"{url}/owner?account=itau&day=monday")
+    assert status == 200 and owner['account'] == "ITAU" and owner['version'] == 1
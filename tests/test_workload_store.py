@@ -0,0 +1,42 @@
+from datetime import date
+
+from workload_store import WorkloadStore
+
+def test_compact_if_stale_keeps_latest_batch(tmp_path):
+    store = WorkloadStore(str(tmp_path))
+    monday, tuesday = date(2026, 10, 12), date(2026, 10, 13)
+    for intensity in (1, 2, 3):
+        store.record_day(monday, {"Ana": intensity, "Beto": 10})
+    store.record_day(tuesday, {"Ana": 5})
+    before = store.rolling_load(date(2026, 10, 14)).to_dict('records')
+
+    assert store.stale_batches() == 2
+    assert not store.compact_if_stale(threshold=3)
+    assert store.compact_if_stale(threshold=2)
+    assert store.stale_batches() == 0
+    assert store.rolling_load(date(2026, 10, 14)).to_dict('records') == before
+    assert before == [{'engineer': "Ana", 'total': 8, 'days': 2}, {'engineer': "Beto", 'total': 10, 'days': 1}]
+
+def test_rolling_load_window_boundaries(tmp_path):
+    store = WorkloadStore(str(tmp_path))
+    end = date(2026, 10, 15)
+    store.record_day(date(2026, 10, 12), {"Ana": 4})   # end - 3: primer día de la ventana
+    store.record_day(date(2026, 10, 11), {"Ana": 100})  # end - 4: fuera de la ventana
+    store.record_day(end, {"Ana": 100})                 # end: no se incluye
+    assert store.rolling_load(end, window_days=3).to_dict('records') == [{'engineer': "Ana", 'total': 4, 'days': 1}]
+
+def test_replan_replaces_earlier_batch_for_date(tmp_path):
+    store = WorkloadStore(str(tmp_path))
+    monday = date(2026, 10, 12)
+    store.record_day(monday, {"Ana": 7, "Beto": 3})
+    store.record_day(monday, {"Beto": 5})
+    assert store.rolling_load(date(2026, 10, 13)).to_dict('records') == [{'engineer': "Beto", 'total': 5, 'days': 1}]
+    loads = store.daily_loads(monday, date(2026, 10, 13))
+    assert loads.to_dict('records') == [{'date': monday, 'engineer': "Beto", 'intensity': 5}]
+
+def test_week_history_counts_days_from_monday(tmp_path):
+    store = WorkloadStore(str(tmp_path))
+    store.record_day(date(2026, 10, 9), {"Ana": 2})    # viernes previo a la semana 2026-W42
+    store.record_day(date(2026, 10, 12), {"Ana": 9})   # lunes de la semana: fuera del historial
+    history = store.week_history("2026-W42", window_days=7)
+    assert history.to_dict('records') == [{'day': -3, 'engineer': "Ana", 'intensity': 2}]
@@ -0,0 +1,202 @@
+"""Historial columnar de carga diaria por ingeniero (NumPy en disco, solo se agrega al final).
+
+Cada plan guardado agrega un lote: una fila (ingeniero, intensidad) por
+ingeniero en las columnas de filas y un registro (fecha, fila inicial, filas)
+en la tabla de lotes. Replanificar un día agrega otro lote que reemplaza al
+anterior para esa fecha; compact() descarta los lotes reemplazados
+(compact_if_stale lo hace al abrir el almacén, pasado un umbral). Las
+consultas leen las columnas con np.memmap y solo tocan las filas de la ventana.
+"""
+import os
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from planner import DAYS_OF_WEEK, DEFAULT_WINDOW_DAYS
+
+# =========================
+# CONFIGURACIÓN
+# =========================
+DEFAULT_WORKLOAD_DIR = ".workload"
+ROW_COLUMNS = ("engineer", "intensity")
+BATCH_FIELDS = 3  # fecha (ordinal), fila inicial, número de filas
+DTYPE = np.dtype("<i4")
+COMPACT_STALE_BATCHES = 64  # Lotes reemplazados a partir de los cuales conviene compactar
+
+def plan_date(week, day):
+    """Fecha de un día de la semana ISO de current_week (p. ej. '2026-W42', 'monday')"""
+    year, week_number = week.split("-W")
+    return date.fromisocalendar(int(year), int(week_number), DAYS_OF_WEEK.index(day) + 1)
+
+# =========================
+# ALMACÉN
+# =========================
+class WorkloadStore:
+    """Intensidad total por ingeniero y día, con agregados de ventana móvil
+
+    Las escrituras se serializan con un lock (un proceso escritor, varias
+    sesiones). Si una escritura se corta a medias, las filas sin lote que las
+    referencie se ignoran.
+    """
+
+    def __init__(self, path=DEFAULT_WORKLOAD_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._names = []
+        self._codes = {}
+        self._names_size = 0
+
+    # ---- Archivos ----
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.i4")
+
+    def _column(self, name):
+        """Columna como memmap de solo lectura (array vacío si todavía no hay datos)"""
+        path = self._file(name)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < DTYPE.itemsize:
+            return np.zeros(0, dtype=DTYPE)
+        return np.memmap(path, dtype=DTYPE, mode="r", shape=(size // DTYPE.itemsize,))
+
+    def _batches(self):
+        """Lotes completos como matriz (lotes × 3): fecha, fila inicial, filas"""
+        raw = self._column("batches")
+        batches = np.asarray(raw[:len(raw) - len(raw) % BATCH_FIELDS]).reshape(-1, BATCH_FIELDS)
+        n_rows = min(len(self._column(name)) for name in ROW_COLUMNS)
+        return batches[batches[:, 1] + batches[:, 2] <= n_rows]
+
+    def _refresh_names(self):
+        """Relee el diccionario de ingenieros si creció"""
+        path = os.path.join(self.path, "engineers.txt")
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size != self._names_size:
+            with open(path, encoding="utf-8") as fh:
+                self._names = fh.read().splitlines()
+            self._codes = {name: code for code, name in enumerate(self._names)}
+            self._names_size = size
+
+    def _encode(self, engineers):
+        """Códigos de los ingenieros, agregando al diccionario los que no estaban"""
+        self._refresh_names()
+        new = [name for name in dict.fromkeys(engineers) if name not in self._codes]
+        if new:
+            with open(os.path.join(self.path, "engineers.txt"), "a", encoding="utf-8") as fh:
+                fh.write("".join(f"{name}\n" for name in new))
+            self._refresh_names()
+        return np.array([self._codes[name] for name in engineers], dtype=DTYPE)
+
+    # ---- Escritura ----
+    def record_day(self, day_date, loads):
+        """Agrega la carga de un día ({ingeniero: intensidad total}); reemplaza lo registrado para esa fecha"""
+        engineers = list(loads)
+        with self._lock:
+            codes = self._encode(engineers)
+            start = min(len(self._column(name)) for name in ROW_COLUMNS)
+            columns = {'engineer': codes, 'intensity': np.array([loads[name] for name in engineers], dtype=DTYPE)}
+            for name in ROW_COLUMNS:
+                with open(self._file(name), "r+b" if os.path.exists(self._file(name)) else "wb") as fh:
+                    fh.seek(start * DTYPE.itemsize)  # pisa filas huérfanas de una escritura cortada
+                    fh.write(columns[name].tobytes())
+                    fh.truncate()
+            with open(self._file("batches"), "ab") as fh:
+                fh.write(np.array([day_date.toordinal(), start, len(engineers)], dtype=DTYPE).tobytes())
+
+    def compact(self):
+        """Reescribe las columnas conservando solo el último lote de cada fecha"""
+        with self._lock:
+            batches = self._latest_batches(self._batches())
+            rows = {name: self._column(name) for name in ROW_COLUMNS}
+            new_columns = {name: [] for name in ROW_COLUMNS}
+            new_batches, start = [], 0
+            for day_ordinal, first, n_rows in batches:
+                for name in ROW_COLUMNS:
+                    new_columns[name].append(np.asarray(rows[name][first:first + n_rows]))
+                new_batches.append((day_ordinal, start, n_rows))
+                start += n_rows
+            del rows
+            for name in ROW_COLUMNS:
+                values = np.concatenate(new_columns[name]) if new_columns[name] else np.zeros(0, dtype=DTYPE)
+                self._replace(name, values.astype(DTYPE))
+            self._replace("batches", np.array(new_batches, dtype=DTYPE).reshape(-1))
+
+    def stale_batches(self):
+        """Lotes reemplazados por uno más nuevo de la misma fecha (lo que compact() descarta)"""
+        batches = self._batches()
+        return len(batches) - len(self._latest_batches(batches))
+
+    def compact_if_stale(self, threshold=COMPACT_STALE_BATCHES):
+        """Compacta si hay al menos threshold lotes reemplazados; devuelve si compactó"""
+        if self.stale_batches() < threshold:
+            return False
+        self.compact()
+        return True
+
+    def _replace(self, name, values):
+        tmp = f"{self._file(name)}.{os.getpid()}.tmp"
+        values.tofile(tmp)
+        os.replace(tmp, self._file(name))
+
+    # ---- Consultas ----
+    @staticmethod
+    def _latest_batches(batches):
+        """El último lote de cada fecha, ordenados por fecha"""
+        if not len(batches):
+            return batches
+        # El orden de escritura desempata: el lote más nuevo de una fecha es el último
+        order = np.lexsort((np.arange(len(batches)), batches[:, 0]))
+        ordered = batches[order]
+        last = np.append(ordered[1:, 0] != ordered[:-1, 0], True)
+        return ordered[last]
+
+    def _window_rows(self, start_date, end_date):
+        """(fechas, códigos, intensidades) de las filas vigentes con start_date <= fecha < end_date"""
+        batches = self._latest_batches(self._batches())
+        in_window = (batches[:, 0] >= start_date.toordinal()) & (batches[:, 0] < end_date.toordinal())
+        batches = batches[in_window]
+        engineers, intensity = self._column("engineer"), self._column("intensity")
+        slices = [slice(int(first), int(first + n_rows)) for _, first, n_rows in batches]
+        if not slices:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return (
+            np.repeat(batches[:, 0].astype(np.int64), batches[:, 2]),
+            np.concatenate([engineers[rows] for rows in slices]).astype(np.int64),
+            np.concatenate([intensity[rows] for rows in slices]).astype(np.int64),
+        )
+
+    def rolling_load(self, end_date, window_days=DEFAULT_WINDOW_DAYS):
+        """Carga por ingeniero en los window_days días anteriores a end_date (sin incluirlo)
+
+        Devuelve un DataFrame con engineer, total (intensidad acumulada) y days (días con plan).
+        """
+        _, codes, intensity = self._window_rows(end_date - timedelta(days=window_days), end_date)
+        self._refresh_names()
+        totals = np.bincount(codes, weights=intensity, minlength=len(self._names)).astype(np.int64)
+        days = np.bincount(codes, minlength=len(self._names))
+        present = np.flatnonzero(days)
+        return pd.DataFrame({
+            'engineer': [self._names[code] for code in present],
+            'total': totals[present],
+            'days': days[present],
+        })
+
+    def daily_loads(self, start_date, end_date):
+        """Formato largo (date, engineer, intensity) de las fechas en [start_date, end_date)"""
+        dates, codes, intensity = self._window_rows(start_date, end_date)
+        self._refresh_names()
+        return pd.DataFrame({
+            'date': [date.fromordinal(int(ordinal)) for ordinal in dates],
+            'engineer': [self._names[code] for code in codes],
+            'intensity': intensity,
+        })
+
+    def week_history(self, week, window_days=DEFAULT_WINDOW_DAYS):
+        """Cargas de los window_days días previos al lunes de week, con day contado desde el lunes (ver RollingLoads)"""
+        monday = plan_date(week, DAYS_OF_WEEK[0])
+        loads = self.daily_loads(monday - timedelta(days=window_days), monday)
+        days = [(day_date - monday).days for day_date in loads['date']]
+        return pd.DataFrame({'day': pd.Series(days, dtype='int64'), 'engineer': loads['engineer'],
+                             'intensity': loads['intensity']})